@@ -0,0 +1,58 @@
+"""Count numpy buffer allocations made by GRPTBL.parse.
+
+Compares the default view mode with a range set that forces a copy on every
+lookup, which is how range_starting_at_address behaved before.
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tests"))
+
+from synthetic import GRPTBL_BASE, build_office
+
+from officedata.image_tools import DataRangeSet
+from officedata.odd import GRPTBL
+
+
+class CopyingRangeSet(DataRangeSet):
+    def range_starting_at_address(self, target_address, length=0, copy=False):
+        return super().range_starting_at_address(target_address, length, copy=True)
+
+
+def measure(label, range_set, repeat=20):
+    numpy_buffers = tracemalloc.DomainFilter(True, np.lib.tracemalloc_domain)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot().filter_traces([numpy_buffers])
+    grptbl = GRPTBL.parse(GRPTBL_BASE, range_set)
+    after = tracemalloc.take_snapshot().filter_traces([numpy_buffers])
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, "traceback")
+    count = sum(stat.count_diff for stat in stats)
+    size = sum(stat.size_diff for stat in stats)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        GRPTBL.parse(GRPTBL_BASE, range_set)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    print(f"{label:>6}: {count:6d} numpy buffers retained, {size:9,d} bytes, "
+          f"{elapsed*1000:6.2f} ms per parse ({len(grptbl.svc_table.groups)} service groups)")
+
+
+def main():
+    office = build_office(n_svc_groups=1000, n_trunk_groups=500)
+    ranges = office.range_set().ranges
+
+    measure("copy", CopyingRangeSet(ranges))
+    measure("view", DataRangeSet(ranges))
+
+
+if __name__ == "__main__":
+    main()
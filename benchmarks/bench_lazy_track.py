@@ -0,0 +1,71 @@
+"""Time one-off lookups with the lazy track loader against the eager loader.
+
+Writes a synthetic office padded with random data to 150 blocks, then times
+a cold start (load, then one OE lookup or one service group lookup) with
+`load_track` and with `LazyTrack`, and the same lookups on a warm loader.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tests"))
+
+from synthetic import build_office
+
+from officedata.image_tools import LazyTrack, load_track
+from officedata.office import Office
+
+REPEATS = 20
+PADDING_BASE = 0o1000000
+
+
+def lookup_oe(office):
+    return office.sptbl.spn_head.lookup_oe("000100")
+
+
+def lookup_group(office):
+    return office.lazy_grptbl.service_group(65)
+
+
+def best_of(fn):
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    office = build_office(n_svc_groups=300, n_trunk_groups=400, n_spn_heads=63)
+    rng = np.random.default_rng(0)
+    office.put(PADDING_BASE, rng.integers(0, 0x10000, 95000).tolist())
+
+    with tempfile.TemporaryDirectory() as directory:
+        block_numbers = office.write_track(directory)
+        end_block = block_numbers[-1] + 1
+        print(f"{len(block_numbers)} blocks")
+
+        loaders = (("eager", lambda: load_track(directory, start_block=167, end_block=end_block)),
+                   ("lazy", lambda: LazyTrack(directory, start_block=167, end_block=end_block)))
+
+        for label, loader in loaders:
+            print(f"{label:>6} load only:     {best_of(loader)*1000:7.2f} ms")
+            for name, lookup in (("oe", lookup_oe), ("group", lookup_group)):
+                cold = best_of(lambda lookup=lookup, loader=loader: lookup(Office(loader())))
+                warm_office = Office(loader())
+                lookup(warm_office)
+                warm = best_of(lambda lookup=lookup, office=warm_office: lookup(office))
+                print(f"{label:>6} {name:>5} cold: {cold*1000:7.2f} ms, warm: {warm*1e6:7.1f} us")
+
+        lazy = LazyTrack(directory, start_block=167, end_block=end_block)
+        lookup_oe(Office(lazy))
+        print(f"blocks read for one OE lookup: {lazy.blocks_read}")
+
+
+if __name__ == "__main__":
+    main()
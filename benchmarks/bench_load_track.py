@@ -0,0 +1,68 @@
+"""Compare the chunked struct block reader with the bulk uint16 reader.
+
+Writes 150 synthetic blocks (the size of the translation area, blocks
+167-316) to a temporary directory and loads them with both readers.
+"""
+
+import os
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tests"))
+
+from synthetic import random_track
+
+from officedata.image_tools import load_block, load_track
+
+
+def legacy_load_block(filename):
+    read_len = 50
+    words = []
+    with open(filename, "rb") as f:
+        while True:
+            data = f.read(2*read_len)
+            if(len(data) == 0):
+                break
+            successful_len = len(data)//2
+            words.extend(struct.unpack(f'>{successful_len}H', data))
+    return np.array(words)
+
+
+def measure(label, loader, filenames, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        blocks = [loader(filename) for filename in filenames]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    blocks = [loader(filename) for filename in filenames]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    resident = sum(block.nbytes for block in blocks)
+    print(f"{label:>8}: {best*1000:7.2f} ms  dtype {blocks[0].dtype}  "
+          f"array bytes {resident:>9,d}  traced peak {peak:>9,d}")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        random_track(directory, n_blocks=150)
+        filenames = [os.path.join(directory, f"{n:04d}.bin") for n in range(167, 317)]
+
+        measure("legacy", legacy_load_block, filenames)
+        measure("bulk", load_block, filenames)
+
+        start = time.perf_counter()
+        load_track(directory, start_block=167, end_block=317)
+        print(f"load_track: {(time.perf_counter() - start)*1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
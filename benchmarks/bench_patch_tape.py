@@ -0,0 +1,86 @@
+"""Time patch_tape.py's indexed patch engine, serial and with a process pool,
+against the original nested loop.
+
+Writes 150 random blocks (blocks 167-316) and patches a random sample of
+their words with patch_track, with four jobs, and with the original loop
+over blocks x patches x destinations and its per-word struct writes.
+"""
+
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tests"))
+
+from synthetic import random_track
+
+from officedata.image_tools import load_track
+from patch_tape import MemoryPatch, compute_block_crc, find_block_destinations, load_block_data, patch_track
+
+
+def legacy_patch_track(track_directory, patches):
+    for block_n in range(358):
+        block_filename = os.path.join(track_directory, f"{block_n:04d}.bin")
+        try:
+            with open(block_filename, 'rb') as f:
+                block_data = load_block_data(f)
+        except FileNotFoundError:
+            continue
+
+        block_dests = find_block_destinations(block_data)
+        found_patches = []
+        for patch in patches:
+            for memory_block in block_dests:
+                if(patch.location >= memory_block.location and
+                   patch.location < (memory_block.location + memory_block.length) and
+                   block_n >= patch.min_block and
+                   block_n < patch.max_block):
+                    found_patches.append((patch, memory_block))
+        if(len(found_patches) == 0):
+            continue
+
+        new_block_data = block_data.copy()
+        for patch, memory_block in found_patches:
+            offset_in_block = patch.location - memory_block.location + memory_block.offset_in_block
+            if(block_data[offset_in_block] == patch.old_value):
+                new_block_data[offset_in_block] = patch.new_value
+        new_block_data[-2] = compute_block_crc(new_block_data)
+        with open(os.path.join(track_directory, f"{block_n:04d}_patched.bin"), 'wb') as f:
+            f.writelines(struct.pack('>H', word) for word in new_block_data)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        random_track(directory)
+        data = load_track(directory, start_block=167, end_block=317)
+        addresses = [address for data_range in data.ranges
+                     for address in range(data_range.start_address, data_range.start_address + data_range.length)]
+
+        for n_patches in (100, 1000, 20000):
+            sample = random.Random(n_patches).sample(addresses, n_patches)
+            words, _ = data.words_at(sample)
+            patches = [MemoryPatch(address, int(word), int(word) ^ 1) for address, word in zip(sample, words)]
+
+            for label, patcher in (
+                    ("indexed", lambda patches=patches: patch_track(directory, patches, verbose=False)),
+                    ("jobs=4", lambda patches=patches: patch_track(directory, patches, verbose=False, jobs=4)),
+                    ("legacy", lambda patches=patches: legacy_patch_track(directory, patches))):
+                if label == "legacy" and n_patches > 1000:
+                    print(f"{label:>8}: {n_patches:6d} patches, skipped")
+                    continue
+                start = time.perf_counter()
+                patcher()
+                elapsed = time.perf_counter() - start
+                print(f"{label:>8}: {n_patches:6d} patches, {elapsed*1000:9.1f} ms")
+
+            for name in os.listdir(directory):
+                if name.endswith("_patched.bin"):
+                    os.remove(os.path.join(directory, name))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Scaling of DataRangeSet construction and address lookup.
+
+Builds synthetic range sets of increasing size and compares the sorted
+index with the linear scan and pairwise overlap check it replaced.
+"""
+
+import random
+import time
+
+import numpy as np
+
+from officedata.image_tools import DataRange, DataRangeSet
+
+
+def legacy_find_range(ranges, target_address):
+    for data_range in ranges:
+        if((target_address >= data_range.start_address) and
+           (target_address < data_range.start_address + data_range.length)):
+            return data_range
+    raise ValueError
+
+
+def legacy_overlap_check(ranges):
+    for range in ranges:
+        for test_range in ranges:
+            assert not (test_range.start_address < range.start_address < test_range.start_address + test_range.length)
+            assert not (test_range.start_address < (range.start_address + range.length) < test_range.start_address + test_range.length)
+
+
+def synthetic_ranges(n_ranges, seed=0):
+    rnd = random.Random(seed)
+    ranges = []
+    address = 0
+    for _ in range(n_ranges):
+        length = rnd.randint(1, 60)
+        ranges.append(DataRange(address, np.zeros(length, dtype=np.uint16)))
+        address += length + rnd.randint(0, 3)
+    rnd.shuffle(ranges)
+    return ranges, address
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    print(f"{'ranges':>7} {'build':>10} {'lookup/op':>11} {'legacy lookup/op':>17} {'legacy build':>13}")
+    for n_ranges in (100, 1_000, 10_000, 50_000):
+        ranges, top = synthetic_ranges(n_ranges)
+        build = timed(DataRangeSet, ranges)
+        range_set = DataRangeSet(ranges)
+
+        targets = [random.randrange(top) for _ in range(2000)]
+
+        def lookups(find, targets=targets):
+            for target in targets:
+                try:
+                    find(target)
+                except ValueError:
+                    pass
+
+        lookup = timed(lookups, range_set._find_range) / len(targets)
+        legacy_lookup = timed(lookups, lambda t, ranges=ranges: legacy_find_range(ranges, t)) / len(targets)
+
+        if n_ranges <= 1_000:
+            legacy_build = f"{timed(legacy_overlap_check, ranges)*1000:10.1f} ms"
+        else:
+            legacy_build = "skipped"
+
+        print(f"{n_ranges:>7} {build*1000:>7.1f} ms {lookup*1e6:>8.2f} us {legacy_lookup*1e6:>14.2f} us {legacy_build:>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Measure the memory retained per parsed table entry on a whole-office decode.
+
+Decodes every service and trunk group, every service member list and every
+assigned scan point subtranslator entry of a large synthetic office, keeping
+the records alive, and reports the bytes retained per record.
+"""
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tests"))
+
+from synthetic import GRPTBL_BASE, MEMLST_BASE, SPTBL_BASE, build_office
+
+from officedata.image_tools import MemoryImage
+from officedata.odd import GRPTBL, MEMLST, MEMLST_SVC_GROUP, SPTBL
+
+
+def decode_groups(data):
+    grptbl = GRPTBL.parse(GRPTBL_BASE, data)
+    return list(grptbl.svc_table.groups) + list(grptbl.trunk_table_low_entries) + list(grptbl.trunk_table_high_entries)
+
+
+def decode_members(data):
+    grptbl = GRPTBL.parse(GRPTBL_BASE, data)
+    memlst = MEMLST.parse(data.range_starting_at_address(MEMLST_BASE))
+    members = []
+    for entry in grptbl.svc_table.groups:
+        address = memlst.memlist_svc.member_list_address + entry.member_list_index
+        members.extend(MEMLST_SVC_GROUP.parse(entry.highest_member, data.range_starting_at_address(address)).members)
+    return members
+
+
+def decode_subtranslators(data):
+    spn_head = SPTBL.find(SPTBL_BASE, data).spn_head
+    entries = []
+    for w_index in range(127):
+        if spn_head.sub_types[w_index] in (2, 3):
+            entries.extend(spn_head._lookup_entry(w_index, x_index) for x_index in range(64))
+    return entries
+
+
+def measure(label, decode, data):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    records = decode(data)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    print(f"{label:>15}: {len(records):7,d} records, {size:12,d} bytes, {size / len(records):7.1f} bytes per record")
+
+
+def main():
+    data = MemoryImage.from_range_set(build_office(n_svc_groups=300, n_trunk_groups=400, n_spn_heads=63).range_set())
+
+    measure("groups", decode_groups, data)
+    measure("members", decode_members, data)
+    measure("subtranslators", decode_subtranslators, data)
+
+
+if __name__ == "__main__":
+    main()
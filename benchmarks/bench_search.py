@@ -0,0 +1,45 @@
+"""Time the memory image searches over the full 20-bit address space.
+
+Fills every word of a MemoryImage with random data and times a masked value
+search, a four word sequence search and a pointer scan with the chunked numpy
+searches, against a Python loop over the words for the masked search.
+"""
+
+import time
+
+import numpy as np
+
+from officedata.image_tools import ADDRESS_SPACE, MemoryImage
+from officedata.search import find_masked, find_pointers, find_sequence
+
+REPEATS = 10
+
+
+def best_of(search):
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        n_matches = sum(len(matches) for matches in search())
+        times.append(time.perf_counter() - start)
+    return min(times), n_matches
+
+
+def main():
+    rng = np.random.default_rng(0)
+    words = rng.integers(0, 1 << 16, ADDRESS_SPACE, dtype=np.uint16)
+    image = MemoryImage(words, np.ones(ADDRESS_SPACE, dtype=np.bool_))
+    sequence = [int(word) for word in words[0o421410:0o421414]]
+
+    for label, search in (("masked", lambda: find_masked(image, 0o1234, 0o7777)),
+                          ("sequence", lambda: find_sequence(image, sequence)),
+                          ("pointers", lambda: find_pointers(image, 0o600000, 0o610000))):
+        elapsed, n_matches = best_of(search)
+        print(f"{label:>8}: {elapsed*1000:7.2f} ms, {n_matches} matches")
+
+    start = time.perf_counter()
+    n_matches = sum(1 for word in words.tolist() if word & 0o7777 == 0o1234)
+    print(f"{'loop':>8}: {(time.perf_counter() - start)*1000:7.2f} ms, {n_matches} matches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Time lookups through `odd serve` against running the CLI cold for each one.
+
+Writes a synthetic office track, then times:
+  - `odd scanpoints --oe` as a new process, with and without the table cache;
+  - the same lookup sent to a running `odd serve`, one request at a time;
+  - throughput with one and four clients, pipelining their requests.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tests"))
+
+from synthetic import build_office
+
+from officedata.server import QueryClient
+
+CLI = [sys.executable, "-c", "from officedata.cli import main; main()"]
+COLD_RUNS = 5
+REQUESTS = 2000
+
+
+def cold_cli(directory, *options):
+    times = []
+    for _ in range(COLD_RUNS):
+        start = time.perf_counter()
+        subprocess.run(CLI + ["scanpoints", "--oe", "000100", "--track-directory", directory, *options],
+                       check=True, capture_output=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def throughput(socket_path, n_clients):
+    numbers = [f"{n:06o}" for n in range(0o100, 0o300)]
+    requests = [{"op": "lookup", "numbers": [numbers[n % len(numbers)]]} for n in range(REQUESTS)]
+
+    def run(_):
+        with QueryClient(socket_path) as client:
+            client.query_many(requests)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_clients) as executor:
+        list(executor.map(run, range(n_clients)))
+    return n_clients * REQUESTS / (time.perf_counter() - start)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        build_office(n_svc_groups=300, n_trunk_groups=400, n_spn_heads=63).write_track(directory)
+        os.environ["ODD_CACHE_DIR"] = os.path.join(directory, "cache")
+
+        print(f"cold CLI, no cache:   {cold_cli(directory, '--no-cache')*1000:8.1f} ms per lookup")
+        print(f"cold CLI, warm cache: {cold_cli(directory)*1000:8.1f} ms per lookup")
+
+        socket_path = os.path.join(directory, "odd.sock")
+        server = subprocess.Popen(CLI + ["serve", "--socket", socket_path, "--track-directory", directory],
+                                  stderr=subprocess.DEVNULL)
+        try:
+            while not os.path.exists(socket_path):
+                time.sleep(0.05)
+
+            with QueryClient(socket_path) as client:
+                request = {"op": "lookup", "kind": "oe", "numbers": ["000100"]}
+                times = []
+                for _ in range(REQUESTS):
+                    start = time.perf_counter()
+                    client.query(request)
+                    times.append(time.perf_counter() - start)
+            print(f"server, one request:  {statistics.median(times)*1000:8.3f} ms median, "
+                  f"{sorted(times)[int(len(times) * 0.99)]*1000:.3f} ms p99")
+
+            for n_clients in (1, 4):
+                print(f"server, {n_clients} client(s):  {throughput(socket_path, n_clients):8.0f} requests/s")
+        finally:
+            server.terminate()
+            server.wait()
+        assert not os.path.exists(socket_path)
+
+
+if __name__ == "__main__":
+    main()
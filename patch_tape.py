@@ -1,13 +1,17 @@
 #!/usr/bin/env python
 
-import struct
 import sys
 import os
 import argparse
 import textwrap
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import repeat
 
-import fastcrc
+import numpy as np
+
+from officedata.catalog import BlockCatalog
+from officedata.image_tools import block_crc, block_fragments, read_block
 
 @dataclass
 class MemoryPatch:
@@ -37,6 +41,13 @@ help_string = textwrap.dedent('''
     Lines starting with # are ignored.
 
     Patched blocks are written to [block_number]_patched.bin. Originals are left in place.
+
+    Patch destinations are found from the track's block catalog, so only
+    blocks that a patch falls in are read. The catalog is rebuilt if any
+    block file has changed since it was written.
+
+    A block whose CRC or expected old values do not match is not written.
+    The other blocks are still patched, and the errors are listed at the end.
     ''')
 
 
@@ -46,8 +57,8 @@ def parse_patch_file(patch_file):
     '''
     patches = []
 
-    for line in f:
-        if(line.startswith("#")):
+    for line in patch_file:
+        if(line.startswith("#") or not line.strip()):
             continue
 
         splits = line.split(',')
@@ -65,6 +76,9 @@ def parse_patch_file(patch_file):
         if(len(splits) >= 5):
             patch.max_block = int(splits[4])
 
+        if(len(splits) >= 6):
+            patch.comment = ",".join(splits[5:]).strip()
+
         patches.append(patch)
 
     return patches
@@ -72,27 +86,16 @@ def parse_patch_file(patch_file):
 
 def load_block_data(block_file):
     '''
+    Return the words of an open tape block file as a native uint16 array.
     '''
-    read_len = 50
-    words_list = []
-    while True:
-        data = block_file.read(2*read_len)
-        if(len(data) == 0):
-            break
-        successful_len = len(data)//2
-
-        unpacked_data = struct.unpack(f'>{successful_len}H', data)
-
-        for word in unpacked_data:
-            words_list.append(word)
-
-    return words_list
+    return read_block(block_file)
 
 def write_block(filename, block_data):
-
+    '''
+    Write a block as big-endian words in a single write.
+    '''
     with open(filename, 'wb') as f:
-        for word in block_data:
-            f.write(struct.pack('>H', word))
+        f.write(np.asarray(block_data, dtype='>u2').tobytes())
 
 
 def find_block_destinations(block_data):
@@ -100,39 +103,251 @@ def find_block_destinations(block_data):
     Return a list of MemoryBlock objects with destination locations and lengths for each block of
     data in the tape block.
     '''
-    next_header = 2
+    return [MemoryBlock(location=location, length=length, offset_in_block=offset_in_block)
+            for location, length, offset_in_block in block_fragments(block_data)]
 
-    block_infos = []
 
-    while(next_header < 828):
-        length = (block_data[next_header] & 0xfff0) >> 4
-        location =  ((block_data[next_header] & 0xf) << 16) + block_data[next_header + 1]
-        if(length == 0):
-            break
+def catalog_destinations(catalog, block_n):
+    '''
+    Return a list of MemoryBlock objects for a block from a BlockCatalog,
+    without reading the block.
+    '''
+    return [MemoryBlock(location=int(entry['start_address']), length=int(entry['length']),
+                        offset_in_block=int(entry['offset_in_block']))
+            for entry in catalog.block_ranges(block_n)]
 
 
-        block_info = MemoryBlock(location=location, length=length,
-                                 offset_in_block=next_header + 2)
-        block_infos.append(block_info)
+def compute_block_crc(block_data):
+    return block_crc(block_data)
 
-        next_header += length + 2
 
-    return block_infos
+class PatchError(Exception):
+    pass
 
 
-def compute_block_crc(block_data):
+class PatchIndex:
+    '''
+    Patches sorted by location, so the patches falling in a block's memory
+    ranges are found with a binary search per range. Patches to the same
+    location keep their patch file order.
+    '''
 
-    crc_data = b''.join([x.to_bytes(2, byteorder='little') for x in block_data[1:-2]])
+    def __init__(self, patches):
+        self.patches = list(patches)
+        locations = np.array([patch.location for patch in self.patches], dtype=np.int64)
+        self.order = np.argsort(locations, kind='stable')
+        self.locations = locations[self.order]
+        self.old_values = np.array([patch.old_value for patch in self.patches], dtype=np.int64)[self.order]
+        self.new_values = np.array([patch.new_value for patch in self.patches], dtype=np.int64)[self.order]
+        self.min_blocks = np.array([patch.min_block for patch in self.patches], dtype=np.int64)[self.order]
+        self.max_blocks = np.array([patch.max_block for patch in self.patches], dtype=np.int64)[self.order]
+
+        for values in (self.old_values, self.new_values):
+            if ((values < 0) | (values > 0xffff)).any():
+                raise ValueError("Patch values must fit in a 16 bit word")
+
+    def __len__(self):
+        return len(self.patches)
+
+    def find(self, block_n, block_dests):
+        '''
+        Return the sorted positions of the patches that apply to a block, and
+        each patch's offset in the block.
+        '''
+        positions = []
+        offsets = []
+        for memory_block in block_dests:
+            start, end = np.searchsorted(self.locations, [memory_block.location,
+                                                          memory_block.location + memory_block.length])
+            in_range = np.arange(start, end)
+            positions.append(in_range)
+            offsets.append(self.locations[in_range] - memory_block.location + memory_block.offset_in_block)
+
+        positions = np.concatenate(positions + [np.zeros(0, dtype=np.int64)]).astype(np.int64)
+        offsets = np.concatenate(offsets + [np.zeros(0, dtype=np.int64)]).astype(np.int64)
+        in_blocks = (block_n >= self.min_blocks[positions]) & (block_n < self.max_blocks[positions])
+        return positions[in_blocks], offsets[in_blocks]
+
+
+def patch_block(block_n, block_data, index, messages=None, block_dests=None):
+    '''
+    Apply the patches in `index` that fall in a block. Returns the patched
+    block with a new CRC, or None if no patch applies. Raises PatchError if
+    the block CRC or a patch's old value does not match. Progress messages
+    are appended to `messages` if a list is given. The block's destinations
+    are read from its headers unless given.
+    '''
+    if block_dests is None:
+        block_dests = find_block_destinations(block_data)
+    positions, offsets = index.find(block_n, block_dests)
+    if(len(positions) == 0):
+        return None
 
-    crc_value = fastcrc.crc16.arc(crc_data)
-    return crc_value
+    if messages is not None:
+        for location in index.locations[positions]:
+            messages.append(f"Found patch destination {location:o}, tape block {block_n}")
 
+    prepatch_crc_value = compute_block_crc(block_data)
+    block_data_crc = block_data[-2]
+    if(prepatch_crc_value != block_data_crc):
+        raise PatchError(f"Pre-patching computed CRC {prepatch_crc_value:06o} does not match block CRC {block_data_crc:06o}")
 
+    existing_values = block_data[offsets]
+    old_values = index.old_values[positions]
+    new_values = index.new_values[positions]
 
-def find_patch(word_n, patches):
-    return list(filter(lambda x: x[0] == word_n, patches))
+    if messages is not None:
+        for location, existing_value, old_value, new_value in zip(index.locations[positions], existing_values,
+                                                                  old_values, new_values):
+            messages.append(f"Location {location:06o}, existing memory value {existing_value:06o}, expected old value "
+                            f"{old_value:06o}, new memory value {new_value:06o}")
 
-if __name__ == '__main__':
+    mismatched = np.flatnonzero(existing_values != old_values)
+    if(len(mismatched) > 0):
+        location = index.locations[positions[mismatched[0]]]
+        raise PatchError(f"Old value at {location:06o} does not match expected old value")
+
+    new_block_data = block_data.copy()
+    new_block_data[offsets] = new_values
+    new_block_data[-2] = compute_block_crc(new_block_data)
+    return new_block_data
+
+
+@dataclass
+class BlockResult:
+    block_n: int
+    found: bool = True
+    patched: bool = False
+    crc_ok: bool = True
+    error: str | None = None
+    messages: list[str] = field(default_factory=list)
+
+
+def write_block_atomic(filename, block_data):
+    '''
+    Write a block to a temporary file and rename it into place, so a block
+    file is never left partly written.
+    '''
+    temporary = f"{filename}.{os.getpid()}.tmp"
+    try:
+        write_block(temporary, block_data)
+        os.replace(temporary, filename)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+def patch_block_file(track_directory, block_n, index, verbose=True, block_dests=None):
+    '''
+    Patch one block file, writing [block_number]_patched.bin if any patch
+    applies. Errors are returned in the result rather than raised, so one
+    bad block does not stop the others.
+    '''
+    result = BlockResult(block_n)
+    messages = result.messages if verbose else None
+    block_filename = os.path.join(track_directory, f"{block_n:04d}.bin")
+
+    try:
+        with open(block_filename, 'rb') as f:
+            block_data = load_block_data(f)
+    except FileNotFoundError:
+        result.found = False
+        if verbose:
+            result.messages.append(f"Block file {block_filename} not found, skipping")
+        return result
+
+    result.crc_ok = compute_block_crc(block_data) == block_data[-2]
+    try:
+        new_block_data = patch_block(block_n, block_data, index, messages, block_dests)
+    except PatchError as e:
+        result.error = f"Block {block_n}: {e}"
+        return result
+
+    if new_block_data is not None:
+        write_block_atomic(os.path.join(track_directory, f"{block_n:04d}_patched.bin"), new_block_data)
+        result.patched = True
+    return result
+
+
+_worker_index = None
+
+
+def _init_worker(index):
+    global _worker_index
+    _worker_index = index
+
+
+def _patch_block_file_worker(track_directory, block_n, verbose, block_dests):
+    return patch_block_file(track_directory, block_n, _worker_index, verbose, block_dests)
+
+
+def catalog_results(track_directory, catalog, block_numbers, index, verbose=True):
+    '''
+    Resolve patch destinations from a BlockCatalog. Returns a BlockResult for
+    each block that needs no patching, and the destinations of the blocks
+    that do.
+    '''
+    results = {}
+    to_patch = {}
+    ranges = catalog.ranges
+    starts = ranges['start_address'].astype(np.int64)
+    in_range = np.searchsorted(index.locations, starts) < np.searchsorted(index.locations, starts + ranges['length'])
+    candidates = set(ranges['block'][in_range].tolist())
+
+    for block_n in block_numbers:
+        entry = catalog.block(block_n)
+        if entry is None:
+            result = results[block_n] = BlockResult(block_n, found=False)
+            if verbose:
+                block_filename = os.path.join(track_directory, f"{block_n:04d}.bin")
+                result.messages.append(f"Block file {block_filename} not found, skipping")
+            continue
+
+        block_dests = catalog_destinations(catalog, block_n) if block_n in candidates else []
+        if(not block_dests or len(index.find(block_n, block_dests)[0]) == 0):
+            results[block_n] = BlockResult(block_n, crc_ok=bool(entry['stored_crc'] == entry['computed_crc']))
+        else:
+            to_patch[block_n] = block_dests
+    return results, to_patch
+
+
+def patch_track(track_directory, patches, start_block=0, end_block=358, verbose=True, jobs=1, catalog=None):
+    '''
+    Patch every block file of a track, writing [block_number]_patched.bin for
+    each block that changed. With `jobs` above one the blocks are shared
+    out to a process pool. Given a current BlockCatalog of the track, only
+    the blocks that a patch falls in are read. Returns a BlockResult per
+    block, in block order, so the outcome does not depend on the number of
+    jobs.
+    '''
+    index = PatchIndex(patches)
+    block_numbers = range(start_block, end_block)
+
+    if catalog is not None:
+        results, to_patch = catalog_results(track_directory, catalog, block_numbers, index, verbose)
+    else:
+        results, to_patch = {}, dict.fromkeys(block_numbers)
+
+    if jobs > 1 and len(to_patch) > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(index,)) as executor:
+            patched = list(executor.map(_patch_block_file_worker, repeat(track_directory), to_patch,
+                                        repeat(verbose), to_patch.values(), chunksize=8))
+    else:
+        patched = [patch_block_file(track_directory, block_n, index, verbose, block_dests)
+                   for block_n, block_dests in to_patch.items()]
+
+    results.update((result.block_n, result) for result in patched)
+    results = [results[block_n] for block_n in block_numbers]
+
+    if verbose:
+        for result in results:
+            for message in result.messages:
+                print(message)
+    return results
+
+
+def main(argv=None):
 
     parser = argparse.ArgumentParser(formatter_class=argparse.RawDescriptionHelpFormatter,
                                     description=help_string)
@@ -140,8 +355,12 @@ if __name__ == '__main__':
     parser.add_argument("track_directory",
                         help="Directory containing the data for a specific track")
     parser.add_argument("patch_filename", help="File with list of words to patch")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Number of processes to patch blocks with (default 1)")
+    parser.add_argument("--no-catalog", action="store_true",
+                        help="Read every block instead of using the track's block catalog")
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     with open(args.patch_filename) as f:
         patches = parse_patch_file(f)
@@ -150,51 +369,23 @@ if __name__ == '__main__':
         print("No patches provided, exiting")
         sys.exit(0)
 
-    for block_n in range(0, 358):
-        block_filename = os.path.join(args.track_directory, "{:04d}.bin".format(block_n))
+    catalog = None
+    if not args.no_catalog:
+        catalog = BlockCatalog.load_or_build(args.track_directory, 0, 358, jobs=args.jobs)
 
-        try:
-            with open(block_filename, 'rb') as f:
-                block_data = load_block_data(f)
-        except FileNotFoundError:
-            print(f"Block file {block_filename} not found, skipping")
-            continue
+    results = patch_track(args.track_directory, patches, jobs=args.jobs, catalog=catalog)
 
-        block_dests = find_block_destinations(block_data)
+    for result in results:
+        if not result.crc_ok and result.error is None:
+            print(f"Warning: block {result.block_n} CRC does not match")
 
-        found_patches = []
-        for patch in patches:
-            for memory_block in block_dests:
-                if(patch.location >= memory_block.location and
-                   patch.location < (memory_block.location + memory_block.length) and
-                   block_n >= patch.min_block and
-                   block_n < patch.max_block):
-                    print(f"Found patch destination {patch.location:o}, tape block {block_n}")
-                    found_patches.append((patch, memory_block))
-
-        if(len(found_patches) == 0):
-            continue
+    errors = [result.error for result in results if result.error]
+    for error in errors:
+        print(error)
+    if errors:
+        print(f"{len(errors)} blocks not patched")
+        sys.exit(1)
 
-        prepatch_crc_value = compute_block_crc(block_data)
-        block_data_crc = block_data[-2]
-        if(prepatch_crc_value != block_data_crc):
-            print(f"Pre-patching computed CRC {prepatch_crc_value:06o} does not match block CRC {block_data_crc:06o}, quitting")
-            sys.exit(0)
-
-        new_block_data = block_data.copy()
-        for patch, memory_block in found_patches:
-            offset_in_block = patch.location - memory_block.location + memory_block.offset_in_block
-            existing_value = block_data[offset_in_block]
-            print(f"Location {patch.location:06o}, existing memory value {existing_value:06o}, expected old value "
-                  f"{patch.old_value:06o}, new memory value {patch.new_value:06o}")
-            if(existing_value == patch.old_value):
-                new_block_data[offset_in_block] = patch.new_value
-            else:
-                print("Old value does not match expected old value, quitting.")
-                sys.exit(0)
-
-        new_crc = compute_block_crc(new_block_data)
-        new_block_data[-2] = new_crc
-        patched_filename = os.path.join(args.track_directory ,f"{block_n:04d}_patched.bin")
-        write_block(patched_filename, new_block_data)
 
+if __name__ == '__main__':
+    main()
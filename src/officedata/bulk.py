@@ -0,0 +1,184 @@
+"""
+Vectorized decoders that walk whole office tables at once.
+
+Each decoder gathers the words it needs with `words_at` and extracts the
+fields with numpy, producing one structured array row per table entry
+instead of one Python object per entry.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import numpy.typing as npt
+
+from .figures import (SERVICE_GROUP_SCHEMA, SERVICE_MEMBER_LIST_HEADER_SCHEMA, TRUNK_GROUP_SCHEMA,
+                      TRUNK_MEMBER_SCHEMA)
+from .image_tools import DataRangeSet, MemoryImage
+
+if TYPE_CHECKING:
+    from .odd import GRPTBL, MEMLST
+
+SERVICE_MEMBER_DTYPE = np.dtype([
+    ("group", np.int32),
+    ("member", np.int32),
+    ("format", np.int8),
+    ("loaded", np.bool_),
+    ("address", np.int32),      # address of the member's first word
+    ("ten", np.int32),          # format 1
+    ("scanpoint", np.int32),    # format 2
+    ("dta", np.int32),          # format 2
+    ("ckt_code", np.int32),     # format 2
+])
+
+TRUNK_GROUP_DTYPE = np.dtype([
+    ("grp_num", np.int32),
+    ("mbr", np.bool_),
+    ("exists", np.bool_),
+    ("highest_member", np.int32),
+    ("sel_status_block_index", np.int32),
+    ("member_list_index", np.int32),
+    ("circuit_code", np.int32),
+    ("memory_address", np.int32),
+])
+
+TRUNK_MEMBER_DTYPE = np.dtype([
+    ("table", np.int8),         # 0 for the low trunk table, 1 for the high
+    ("group", np.int32),
+    ("member", np.int32),
+    ("loaded", np.bool_),
+    ("address", np.int32),
+    ("spn", np.int32),
+    ("ckt_code", np.int32),
+    ("dta", np.int32),
+])
+
+TRUNK_TABLES = ("low", "high")
+
+
+def _words(data: DataRangeSet | MemoryImage, addresses: npt.NDArray[np.int64]) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.bool_]]:
+    words, loaded = data.words_at(addresses)
+    return words.astype(np.int64), loaded
+
+
+def _member_index(counts: npt.NDArray[np.int64]) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    """For per-group member counts, return each member's group row and member number."""
+    rows = np.repeat(np.arange(len(counts)), counts)
+    starts = np.cumsum(counts) - counts
+    return rows, np.arange(len(rows)) - starts[rows]
+
+
+def decode_service_members(data: DataRangeSet | MemoryImage, grptbl: GRPTBL, memlst: MEMLST) -> npt.NDArray:
+    """
+    Decode the member lists (Figure 15C) of every existing service group in
+    one pass. Format 1 members carry a TEN, format 2 members a scan point,
+    DTA and circuit code; groups of other formats have no member rows.
+    Fields that do not apply are -1.
+    """
+    n_groups = grptbl.svc_table.group_count
+    entry_addresses = grptbl.svc_table.table_address + 4*np.arange(n_groups)
+    entry_words, entry_loaded = _words(data, entry_addresses[:, np.newaxis] + np.arange(4))
+
+    entries = SERVICE_GROUP_SCHEMA.decode_many(entry_words)
+
+    exists = entry_loaded.all(axis=1) & entries["exists"]
+    group_numbers = (64 + np.arange(n_groups))[exists]
+    highest_member = entries["highest_member"][exists].astype(np.int64)
+    header_addresses = memlst.memlist_svc.member_list_address + entries["member_list_index"][exists].astype(np.int64)
+
+    headers, header_loaded = _words(data, header_addresses)
+    header_fields = SERVICE_MEMBER_LIST_HEADER_SCHEMA.decode_many(headers[:, np.newaxis])
+    group_format = np.where(header_loaded, header_fields["group_format"], -1)
+    n_members = np.where((group_format == 1) | (group_format == 2), header_fields["n_members"], 0)
+
+    rows, member = _member_index(n_members)
+    header = header_addresses[rows]
+    member_format = group_format[rows]
+    is_ten = member_format == 1
+
+    # Format 1 holds one TEN word per member. Format 2 packs two scan point
+    # bytes per word, followed by one DTA/circuit code word per member.
+    scanpoint_address = header + member//2 + 1
+    dta_address = header + member + 1 + (highest_member[rows] + 1)//2
+    ten_words, ten_loaded = _words(data, header + member + 1)
+    scanpoint_words, scanpoint_loaded = _words(data, scanpoint_address)
+    dta_words, dta_loaded = _words(data, dta_address)
+
+    members = np.empty(len(rows), dtype=SERVICE_MEMBER_DTYPE)
+    members["group"] = group_numbers[rows]
+    members["member"] = member
+    members["format"] = member_format
+    members["loaded"] = np.where(is_ten, ten_loaded, scanpoint_loaded & dta_loaded)
+    members["address"] = np.where(is_ten, header + member + 1, scanpoint_address)
+    members["ten"] = np.where(is_ten, ten_words & 0xfff, -1)
+    members["scanpoint"] = np.where(is_ten, -1, np.where(member % 2 == 0, scanpoint_words & 0xff, scanpoint_words >> 8))
+    members["dta"] = np.where(is_ten, -1, dta_words & 0x7ff)
+    members["ckt_code"] = np.where(is_ten, -1, dta_words >> 11)
+    return members
+
+
+def decode_trunk_group_words(words: npt.NDArray[np.uint16], first_group: int, table_address: int) -> npt.NDArray:
+    """
+    Decode a trunk group table (Figure 12D) given as an (N, 8) array of
+    entries, usually a strided view of the loaded words.
+    """
+    fields = TRUNK_GROUP_SCHEMA.decode_many(words)
+    groups = np.empty(len(words), dtype=TRUNK_GROUP_DTYPE)
+    groups["grp_num"] = first_group + np.arange(len(words))
+    for name in TRUNK_GROUP_SCHEMA.names:
+        groups[name] = fields[name]
+    groups["memory_address"] = table_address + 8*np.arange(len(words))
+    return groups
+
+
+def decode_trunk_groups(data: DataRangeSet | MemoryImage, table_address: int, count: int, first_group: int) -> npt.NDArray:
+    """Fetch a trunk group table as one (count, 8) view and decode it."""
+    if count == 0:
+        return np.empty(0, dtype=TRUNK_GROUP_DTYPE)
+    words = data.range_starting_at_address(table_address, 8*count).words.reshape(count, 8)
+    return decode_trunk_group_words(words, first_group, table_address)
+
+
+def decode_trunk_members(data: DataRangeSet | MemoryImage, groups: npt.NDArray, member_list_address: int,
+                         table: int = 0) -> npt.NDArray:
+    """
+    Decode the trunk circuit member lists of every existing group in `groups`.
+    Each member is two words after the list header: the scan point number,
+    then the circuit code and DTA.
+    """
+    groups = groups[groups["exists"]]
+    counts = groups["highest_member"].astype(np.int64) + 1
+    rows, member = _member_index(counts)
+
+    header = member_list_address + groups["member_list_index"].astype(np.int64)[rows]
+    address = header + 2*member + 1
+    words, loaded = _words(data, np.stack([address, address + 1], axis=-1))
+    fields = TRUNK_MEMBER_SCHEMA.decode_many(words)
+
+    members = np.empty(len(rows), dtype=TRUNK_MEMBER_DTYPE)
+    members["table"] = table
+    members["group"] = groups["grp_num"][rows]
+    members["member"] = member
+    members["loaded"] = loaded.all(axis=1)
+    members["address"] = address
+    for name in TRUNK_MEMBER_SCHEMA.names:
+        members[name] = fields[name]
+    return members
+
+
+def decode_office_trunks(data: DataRangeSet | MemoryImage, grptbl: GRPTBL, memlst: MEMLST) -> tuple[dict[str, npt.NDArray], npt.NDArray]:
+    """
+    Decode both trunk group tables and all their member lists. Returns the
+    groups keyed by table name (see TRUNK_TABLES), and the members of both
+    tables with their table number.
+    """
+    tables = ((grptbl.trunk_table_low_address, grptbl.trunk_table_low_entry_count, memlst.memlist_trunks_low),
+              (grptbl.trunk_table_high_address, grptbl.trunk_table_high_entry_count, memlst.memlist_trunks_high))
+    groups_by_table = {}
+    all_members = []
+    for table, (address, count, memlist_entry) in enumerate(tables):
+        groups = decode_trunk_groups(data, address, count, 128)
+        groups_by_table[TRUNK_TABLES[table]] = groups
+        all_members.append(decode_trunk_members(data, groups, memlist_entry.member_list_address, table))
+    return groups_by_table, np.concatenate(all_members)
@@ -0,0 +1,193 @@
+"""
+Persistent cache of decoded office tables.
+
+Decoded tables are pickled under a cache directory, keyed by a hash of the
+source files' contents. A stat index maps each file's size and mtime to its
+content hash, so unchanged files are not read again; a file that is touched
+but not changed still hits the cache once it has been rehashed.
+
+References to the office data itself are not stored: they are pickled as a
+persistent id and reattached to the freshly loaded data when an entry is read.
+"""
+
+import hashlib
+import io
+import json
+import os
+import pickle
+import re
+from dataclasses import asdict, dataclass
+
+BLOCK_FILE_PATTERN = re.compile(r"^(\d{4})(_patched)?\.bin$")
+CACHE_VERSION = 3
+
+
+def default_cache_directory() -> str:
+    if "ODD_CACHE_DIR" in os.environ:
+        return os.environ["ODD_CACHE_DIR"]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "officedata")
+
+
+def track_files(base_filename, start_block=0, end_block=358) -> list[str]:
+    """
+    Block files of a track in the block range, including the
+    NNNN_patched.bin files written by patch_tape.py.
+    """
+    try:
+        names = os.listdir(base_filename)
+    except FileNotFoundError:
+        return []
+
+    files = []
+    for name in sorted(names):
+        match = BLOCK_FILE_PATTERN.match(name)
+        if match and start_block <= int(match.group(1)) < end_block:
+            files.append(os.path.join(base_filename, name))
+    return files
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    files_hashed: int = 0
+
+    def __str__(self):
+        return f"hits: {self.hits:d}, misses: {self.misses:d}, files hashed: {self.files_hashed:d}"
+
+
+class _TablePickler(pickle.Pickler):
+    def __init__(self, file, data):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._data = data
+
+    def persistent_id(self, obj):
+        if obj is self._data:
+            return "data"
+        return None
+
+
+class _TableUnpickler(pickle.Unpickler):
+    def __init__(self, file, data):
+        super().__init__(file)
+        self._data = data
+
+    def persistent_load(self, pid):
+        if pid == "data":
+            return self._data
+        raise pickle.UnpicklingError(f"Unknown persistent id {pid}")
+
+
+class TableCache:
+    """Content-hash keyed store of decoded tables."""
+
+    def __init__(self, directory: str | None = None):
+        self.directory = directory or default_cache_directory()
+        self.stats = CacheStats()
+        self._stat_index = None
+
+    def _path(self, *names) -> str:
+        return os.path.join(self.directory, *names)
+
+    def _load_stat_index(self) -> dict:
+        if self._stat_index is None:
+            self._stat_index = self.read_json("stat_index.json", {})
+        return self._stat_index
+
+    def _file_hash(self, filename: str) -> str:
+        """Content hash of a file, reusing the stored hash while size and mtime are unchanged."""
+        stat = os.stat(filename)
+        signature = f"{stat.st_size}:{stat.st_mtime_ns}"
+        stat_index = self._load_stat_index()
+        path = os.path.abspath(filename)
+
+        entry = stat_index.get(path)
+        if entry and entry[0] == signature:
+            return entry[1]
+
+        with open(filename, "rb") as f:
+            content_hash = hashlib.sha256(f.read()).hexdigest()
+        self.stats.files_hashed += 1
+        stat_index[path] = [signature, content_hash]
+        return content_hash
+
+    def file_hashes(self, filenames: list[str]) -> list[str]:
+        """Content hashes of files, rehashing only files whose size or mtime changed."""
+        hashes = [self._file_hash(filename) for filename in filenames]
+        if self._stat_index is not None:
+            self.write_json("stat_index.json", self._stat_index)
+        return hashes
+
+    def source_key(self, filenames: list[str]) -> str:
+        """Key for a set of source files: a hash of their names and content hashes."""
+        key = hashlib.sha256(f"v{CACHE_VERSION}".encode())
+        for filename, content_hash in zip(filenames, self.file_hashes(filenames)):
+            key.update(os.path.basename(filename).encode())
+            key.update(content_hash.encode())
+        return key.hexdigest()
+
+    def load(self, key: str, name: str, build, data=None):
+        """
+        Return the cached table `name` for `key`, calling `build()` and storing
+        the result on a miss. `data` is the office data the tables refer to.
+        """
+        filename = self._path("tables", key, f"{name}.pickle")
+        try:
+            with open(filename, "rb") as f:
+                value = _TableUnpickler(f, data).load()
+            self.stats.hits += 1
+            self._record_stats(hits=1)
+            return value
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError, AttributeError):
+            pass
+
+        self.stats.misses += 1
+        self._record_stats(misses=1)
+        value = build()
+
+        buffer = io.BytesIO()
+        _TablePickler(buffer, data).dump(value)
+        self._write_bytes(filename, buffer.getvalue())
+        return value
+
+    def _write_bytes(self, filename: str, content: bytes):
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        temporary = f"{filename}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(content)
+        os.replace(temporary, filename)
+
+    def read_json(self, name: str, default=None):
+        """Read a JSON file from the cache directory, or return `default`."""
+        try:
+            with open(self._path(name)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return default
+
+    def write_json(self, name: str, value):
+        self._write_bytes(self._path(name), json.dumps(value).encode())
+
+    def _record_stats(self, hits=0, misses=0):
+        totals = self.total_stats()
+        totals.hits += hits
+        totals.misses += misses
+        self.write_json("stats.json", asdict(totals))
+
+    def total_stats(self) -> CacheStats:
+        """Hit and miss counts accumulated over every run using this directory."""
+        try:
+            with open(self._path("stats.json")) as f:
+                return CacheStats(**json.load(f))
+        except (FileNotFoundError, ValueError, TypeError):
+            return CacheStats()
+
+    def clear(self):
+        """Remove every cached table and the statistics."""
+        for root, directories, files in os.walk(self.directory, topdown=False):
+            for name in files:
+                os.remove(os.path.join(root, name))
+            for name in directories:
+                os.rmdir(os.path.join(root, name))
+        self._stat_index = None
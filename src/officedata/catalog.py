@@ -0,0 +1,192 @@
+"""
+Block catalog: where every address range of a track lives.
+
+The catalog is built by reading each block file of a track once, and holds
+one entry per block (file stamp and CRCs) and one per address range (block,
+start address, length and offset in the block). It is saved under the
+table cache directory, keyed by the track directory's path, and reused while
+the block files' sizes and mtimes are unchanged, so listing blocks or finding
+the blocks that hold an address reads no block files. Nothing is written
+into the track directory.
+"""
+
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import numpy.typing as npt
+
+from .cache import default_cache_directory
+from .image_tools import block_crcs, block_filename, block_fragments, load_block
+
+CATALOG_DIRECTORY = "catalogs"
+
+BLOCK_DTYPE = np.dtype([
+    ("block", np.int32),
+    ("size", np.int64),
+    ("mtime_ns", np.int64),
+    ("stored_crc", np.int32),
+    ("computed_crc", np.int32),
+])
+
+RANGE_DTYPE = np.dtype([
+    ("block", np.int32),
+    ("start_address", np.int32),
+    ("length", np.int32),
+    ("offset_in_block", np.int32),
+])
+
+
+def catalog_filename(base_filename) -> str:
+    """The catalog file of a track directory, under the table cache directory."""
+    key = hashlib.sha256(os.path.abspath(base_filename).encode()).hexdigest()
+    return os.path.join(default_cache_directory(), CATALOG_DIRECTORY, f"{key}.npz")
+
+
+def _stamps(base_filename, start_block: int, end_block: int) -> dict[int, tuple[int, int]]:
+    """Size and mtime of each block file that exists in the block range."""
+    stamps = {}
+    for block_n in range(start_block, end_block):
+        try:
+            stat = os.stat(block_filename(base_filename, block_n))
+        except FileNotFoundError:
+            continue
+        stamps[block_n] = (stat.st_size, stat.st_mtime_ns)
+    return stamps
+
+
+def catalog_blocks(filenames: list[str], block_numbers: list[int]) -> tuple[npt.NDArray, npt.NDArray]:
+    """Read block files and return their block and range entries."""
+    stats = [os.stat(filename) for filename in filenames]
+    data = [load_block(filename) for filename in filenames]
+
+    blocks = np.empty(len(filenames), dtype=BLOCK_DTYPE)
+    blocks["block"] = block_numbers
+    blocks["size"] = [stat.st_size for stat in stats]
+    blocks["mtime_ns"] = [stat.st_mtime_ns for stat in stats]
+    blocks["stored_crc"] = [int(block_data[-2]) for block_data in data]
+    blocks["computed_crc"] = block_crcs(data)
+
+    fragments = [(block_n, start_address, length, offset_in_block)
+                 for block_n, block_data in zip(block_numbers, data)
+                 for start_address, length, offset_in_block in block_fragments(block_data)]
+    ranges = np.array(fragments, dtype=RANGE_DTYPE) if fragments else np.empty(0, dtype=RANGE_DTYPE)
+    return blocks, ranges
+
+
+def _catalog_blocks_parallel(filenames: list[str], block_numbers: list[int], jobs: int) -> tuple[npt.NDArray, npt.NDArray]:
+    chunk = -(-len(filenames) // jobs)
+    chunks = [(filenames[n:n + chunk], block_numbers[n:n + chunk]) for n in range(0, len(filenames), chunk)]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = list(executor.map(catalog_blocks, *zip(*chunks)))
+    return (np.concatenate([blocks for blocks, _ in results]),
+            np.concatenate([ranges for _, ranges in results]))
+
+
+class BlockCatalog:
+    """Block and range entries of a track, with lookups by block and address."""
+
+    def __init__(self, start_block: int, end_block: int, blocks: npt.NDArray, ranges: npt.NDArray):
+        self.start_block = start_block
+        self.end_block = end_block
+        self.blocks = np.sort(blocks, order="block")
+        self.ranges = ranges[np.lexsort((ranges["offset_in_block"], ranges["block"]))]
+        self._block_positions = {int(block_n): n for n, block_n in enumerate(self.blocks["block"])}
+
+        # Ranges in address order, for address lookups
+        self._by_address = np.argsort(self.ranges["start_address"], kind="stable")
+        self._starts = self.ranges["start_address"][self._by_address].astype(np.int64)
+        ends = self._starts + self.ranges["length"][self._by_address]
+        self._reach = np.maximum.accumulate(ends) if len(ends) else ends
+        self._ends = ends
+
+    @classmethod
+    def build(cls, base_filename, start_block=0, end_block=358, jobs=1) -> "BlockCatalog":
+        """Read every block file of a track, with `jobs` processes if above one."""
+        block_numbers = list(_stamps(base_filename, start_block, end_block))
+        filenames = [block_filename(base_filename, block_n) for block_n in block_numbers]
+        if jobs > 1 and len(filenames) > 1:
+            blocks, ranges = _catalog_blocks_parallel(filenames, block_numbers, jobs)
+        else:
+            blocks, ranges = catalog_blocks(filenames, block_numbers)
+        return cls(start_block, end_block, blocks, ranges)
+
+    def save(self, filename: str):
+        """Write the catalog as a .npz file, replacing any existing one in one step."""
+        os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+        temporary = f"{filename}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            np.savez(f, block_range=np.array([self.start_block, self.end_block]), blocks=self.blocks,
+                     ranges=self.ranges)
+        os.replace(temporary, filename)
+
+    @classmethod
+    def load(cls, filename: str) -> "BlockCatalog":
+        with np.load(filename, allow_pickle=False) as catalog:
+            if catalog["blocks"].dtype != BLOCK_DTYPE or catalog["ranges"].dtype != RANGE_DTYPE:
+                raise ValueError(f"{filename} is not a block catalog")
+            start_block, end_block = catalog["block_range"].tolist()
+            return cls(start_block, end_block, catalog["blocks"], catalog["ranges"])
+
+    @classmethod
+    def load_or_build(cls, base_filename, start_block=0, end_block=358, jobs=1,
+                      filename: str | None = None, rebuild=False) -> "BlockCatalog":
+        """
+        Load the track's catalog if it is current, otherwise build it and save
+        it. The catalog is kept at `catalog_filename` unless `filename` is
+        given. A catalog that cannot be saved is still returned.
+        """
+        filename = filename or catalog_filename(base_filename)
+        if not rebuild:
+            try:
+                catalog = cls.load(filename)
+            except (FileNotFoundError, ValueError, KeyError):
+                catalog = None
+            if catalog and catalog.start_block <= start_block and end_block <= catalog.end_block and \
+                    catalog.is_current(base_filename):
+                return catalog
+
+        catalog = cls.build(base_filename, start_block, end_block, jobs)
+        try:
+            catalog.save(filename)
+        except OSError:
+            pass
+        return catalog
+
+    def is_current(self, base_filename) -> bool:
+        """Whether the track's block files are the ones catalogued."""
+        stamps = _stamps(base_filename, self.start_block, self.end_block)
+        return stamps == {int(block["block"]): (int(block["size"]), int(block["mtime_ns"])) for block in self.blocks}
+
+    def __len__(self):
+        return len(self.blocks)
+
+    def block_numbers(self) -> list[int]:
+        return self.blocks["block"].tolist()
+
+    def block(self, block_n: int):
+        """The block entry of a block, or None if the block file is missing."""
+        n = self._block_positions.get(block_n)
+        return None if n is None else self.blocks[n]
+
+    def block_ranges(self, block_n: int) -> npt.NDArray:
+        """The range entries of a block, in block order."""
+        start, end = np.searchsorted(self.ranges["block"], [block_n, block_n + 1])
+        return self.ranges[start:end]
+
+    def corrupt_blocks(self) -> list[int]:
+        return self.blocks["block"][self.blocks["stored_crc"] != self.blocks["computed_crc"]].tolist()
+
+    def locate(self, address: int) -> npt.NDArray:
+        """
+        Every range entry holding an address, in block order. An address can
+        be loaded by more than one block.
+        """
+        n = int(np.searchsorted(self._starts, address, side="right"))
+        # Ranges that start at or before the address and might reach it
+        first = int(np.searchsorted(self._reach[:n], address, side="right"))
+        candidates = np.arange(first, n)
+        holding = candidates[self._ends[candidates] > address]
+        found = self.ranges[self._by_address[holding]]
+        return found[np.argsort(found["block"], kind="stable")]
@@ -1,90 +1,601 @@
 
+import json
+import re
+import sys
+from collections.abc import Iterable
 from typing import Annotated
+
+import numpy as np
 import typer
 
-from .image_tools import load_track
-from .odd import GRPTBL, MEMLST, MEMLST_SVC_GROUP, SPTBL
-from .display import display_svc_circuits
+from .cache import TableCache
+from .catalog import BlockCatalog
+from .crawl import TableGraph
+from .display import (batch_records, display_search, display_svc_circuits, display_tables, display_trunk_entries,
+                      display_xref, search_records, spn_dump_records, svc_member_records, table_records,
+                      trunk_member_records, write_records, xref_records)
+from .image_tools import ADDRESS_SPACE
+from .odd import MEMLST_SVC_GROUP, SPN_HEAD_TABLE, SPN_HEAD_WORDS
+from .office import END_BLOCK, START_BLOCK, TRACK_DIRECTORY, Office
+from .office_image import read_office_image_header, write_office_image
+from .search import WORD_MASK, as_memory_image, find_masked, find_pointers, find_sequence, first_matches
+from .server import QueryClient, default_socket_path
+from .server import serve as serve_queries
+from .verify import verify_track
+from .xref import CrossReference
 
 main = typer.Typer()
 
+ImageOption = Annotated[str | None, typer.Option("--image", help="Office image (.odi) written by `odd convert`")]
+TrackOption = Annotated[str, typer.Option("--track-directory", help="Directory holding the track's block files")]
+NoCacheOption = Annotated[bool, typer.Option("--no-cache", help="Decode every table instead of using the table cache")]
+LazyOption = Annotated[bool, typer.Option("--lazy", help="Read track blocks only as they are used")]
+CoalesceOption = Annotated[bool, typer.Option("--coalesce", help="Merge adjacent track block fragments into extents")]
+GraphOption = Annotated[str | None, typer.Option("--graph", help="Table graph written by `odd tables --save`")]
+
+
+def load_office(image: str | None = None, track_directory: str = TRACK_DIRECTORY, no_cache: bool = False,
+                lazy: bool = False, prefer_patched: bool = False, coalesce: bool = False,
+                graph: str | None = None) -> Office:
+    """
+    Load the translation area from an office image, or from the track blocks.
+    With `coalesce`, the number of fragments merged is reported on stderr. A
+    saved table `graph` is used instead of crawling the office's tables.
+    """
+    if coalesce and (lazy or image):
+        raise typer.BadParameter("--coalesce applies only to track blocks loaded without --lazy")
+    cache = None if no_cache else TableCache()
+    office = Office.load(track_directory, START_BLOCK, END_BLOCK, image=image, cache=cache, lazy=lazy,
+                         coalesce=coalesce, prefer_patched=prefer_patched)
+    if graph:
+        try:
+            office.use_graph(TableGraph.load(graph))
+        except (OSError, ValueError) as e:
+            raise typer.BadParameter(f"--graph {graph}: {e}")
+    if coalesce:
+        extents = len(office.data.ranges)
+        print(f"Coalesced {office.data.merged_fragments + extents} fragments into {extents} extents "
+              f"({office.data.merged_fragments} merged)", file=sys.stderr)
+    return office
+
+
+def head_index_error(kind: str, number: str) -> str | None:
+    """Why a six octal digit OE or TEN cannot be looked up in the SPN head table, or None if it can."""
+    w_indices, _ = (SPN_HEAD_TABLE.oe_indices if kind == "oe" else SPN_HEAD_TABLE.ten_indices)([number])
+    if int(w_indices[0]) >= SPN_HEAD_WORDS:
+        return f"{kind.upper()} {number} is beyond the {SPN_HEAD_WORDS:d} word head table"
+    return None
+
+
+def parse_batch(lines: Iterable[str], default_kind: str = "oe") -> list[tuple[str, str]]:
+    """
+    Parse batch lookup lines. Each line holds a six octal digit number,
+    optionally preceded by `oe` or `ten` and a comma or space. Blank lines and
+    lines starting with # are skipped. Every line is checked before any
+    lookup is made; all errors are reported together.
+    """
+    entries = []
+    errors = []
+    for line_n, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        fields = line.replace(",", " ").split()
+        kind = fields[0].lower() if len(fields) == 2 else default_kind
+        number = fields[-1]
+        if len(fields) > 2 or kind not in ("oe", "ten"):
+            errors.append(f"line {line_n}: cannot parse {line!r}")
+            continue
+        if not re.fullmatch(r"[0-7]{6}", number):
+            errors.append(f"line {line_n}: {kind.upper()} must be six octal digits")
+            continue
+        error = head_index_error(kind, number)
+        if error:
+            errors.append(f"line {line_n}: {error}")
+            continue
+        entries.append((kind, number))
+
+    if errors:
+        shown = errors[:10] + ([f"... {len(errors) - 10} more"] if len(errors) > 10 else [])
+        raise typer.BadParameter("; ".join(shown))
+    return entries
+
+
 @main.command()
 def scanpoints(
     oe: Annotated[str | None, typer.Option(help="Six octal digit OE number")] = None,
     ten: Annotated[str | None, typer.Option(help="Six octal digit TEN number")] = None,
+    batch: Annotated[typer.FileText | None, typer.Option(help="File of OE/TEN numbers, one per line, or - for stdin")] = None,
+    batch_kind: Annotated[str, typer.Option(help="Kind of unprefixed batch numbers: oe or ten")] = "oe",
+    output_format: Annotated[str, typer.Option("--format", help="Batch output format: csv or jsonl")] = "csv",
+    image: ImageOption = None,
+    track_directory: TrackOption = TRACK_DIRECTORY,
+    no_cache: NoCacheOption = False,
+    lazy: LazyOption = False,
+    coalesce: CoalesceOption = False,
+    graph: GraphOption = None,
 ):
     """Lookup entries in the scan point table (Figure 2.)"""
 
+    if batch is not None:
+        if output_format not in ("csv", "jsonl"):
+            raise typer.BadParameter("Format must be csv or jsonl")
+        if batch_kind not in ("oe", "ten"):
+            raise typer.BadParameter("Batch kind must be oe or ten")
+        entries = parse_batch(batch, batch_kind)
+
+        spn_head = load_office(image, track_directory, no_cache, lazy, coalesce=coalesce, graph=graph).sptbl.spn_head
+        write_records(batch_records(spn_head, entries), output_format, sys.stdout)
+        return
+
     # Eventually assert that one of several possible address formats is provided.
     if oe is None and ten is None:
-        raise typer.BadParameter("Either OE or TEN must be specified")
+        raise typer.BadParameter("Either OE, TEN or a batch file must be specified")
 
-    if oe and len(oe) != 6:
+    if oe and not re.fullmatch(r"[0-7]{6}", oe):
         raise typer.BadParameter("OE must be six octal digits")
 
-    if ten and len(ten) != 6:
+    if ten and not re.fullmatch(r"[0-7]{6}", ten):
         raise typer.BadParameter("TEN must be six octal digits")
 
-    if oe:
-        try:
-            int(oe, base=8)
-        except ValueError:
-            raise typer.BadParameter("OE must be six octal digits")
+    error = head_index_error("oe", oe) if oe else head_index_error("ten", ten)
+    if error:
+        raise typer.BadParameter(error)
+
+    sptbl = load_office(image, track_directory, no_cache, lazy, coalesce=coalesce, graph=graph).sptbl
+
+    try:
+        if oe:
+            print(sptbl.spn_head.lookup_oe(oe))
+        elif ten:
+            print(sptbl.spn_head.lookup_ten(ten))
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
 
-    if ten:
-        try:
-            int(ten, base=8)
-        except ValueError:
-            raise typer.BadParameter("TEN must be six octal digits")
 
-    base_filename = "TapeData/1/"
-    data = load_track(base_filename, start_block=167, end_block=317)
+@main.command("spn-dump")
+def spn_dump(
+    output_format: Annotated[str, typer.Option("--format", help="Output format: csv or jsonl")] = "csv",
+    include_unassigned: Annotated[bool, typer.Option(help="Also list the slots of unassigned head table words")] = False,
+    image: ImageOption = None,
+    track_directory: TrackOption = TRACK_DIRECTORY,
+    no_cache: NoCacheOption = False,
+    graph: GraphOption = None,
+):
+    """List every entry of the scan point number translator (Figures 2A, 2B and 2C.)"""
+
+    if output_format not in ("csv", "jsonl"):
+        raise typer.BadParameter("Format must be csv or jsonl")
 
-    SPTBL_base = 0o421443
-    sptbl = SPTBL.find(SPTBL_base, data)
+    spn_head = load_office(image, track_directory, no_cache, graph=graph).sptbl.spn_head
+    columns = spn_head.enumerate_entries(include_unassigned=include_unassigned)
+    write_records(spn_dump_records(columns), output_format, sys.stdout)
 
-    if oe:
-        print(sptbl.spn_head.lookup_oe(oe))
-    elif ten:
-        print(sptbl.spn_head.lookup_oe(ten))
 
 @main.command()
-def grptable(group_number: int):
+def grptable(group_number: int, image: ImageOption = None, track_directory: TrackOption = TRACK_DIRECTORY,
+             no_cache: NoCacheOption = False, lazy: LazyOption = False, coalesce: CoalesceOption = False,
+             graph: GraphOption = None):
     """Look up a service circuit group in the member list table (Figure 15.)"""
 
-    base_filename = "TapeData/1/"
-    data = load_track(base_filename, start_block=167, end_block=317)
+    office = load_office(image, track_directory, no_cache, lazy, coalesce=coalesce, graph=graph)
+    data = office.data
+    memlist = office.memlst
+    grptbl = office.lazy_grptbl
+
+    try:
+        entry = grptbl.service_group(group_number)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+    print(entry)
 
-    MEMLST_base = 0o421424
-    memlist = MEMLST.parse(data.range_starting_at_address(MEMLST_base))
+    # TODO: Move this out of the CLI handling code.
+    memlist_grp: MEMLST_SVC_GROUP = MEMLST_SVC_GROUP.parse(entry.highest_member,
+                                data.range_starting_at_address(memlist.memlist_svc.member_list_address + entry.member_list_index))
 
-    grptable_base = 0o421410
+    print(memlist_grp)
+    for memlist_entry in memlist_grp.members:
+        print(memlist_entry)
 
-    grptbl = GRPTBL.parse(grptable_base, data)
+@main.command("svc-report")
+def svc_report(
+    group: Annotated[int | None, typer.Option(help="Only list this service group")] = None,
+    output_format: Annotated[str, typer.Option("--format", help="Output format: text, csv or jsonl")] = "text",
+    image: ImageOption = None,
+    track_directory: TrackOption = TRACK_DIRECTORY,
+    no_cache: NoCacheOption = False,
+    graph: GraphOption = None,
+):
+    """List the members of every service circuit group (Figures 12C and 15C.)"""
+
+    if output_format not in ("text", "csv", "jsonl"):
+        raise typer.BadParameter("Format must be text, csv or jsonl")
+
+    members = load_office(image, track_directory, no_cache, graph=graph).service_members
+    if group is not None:
+        members = members[members["group"] == group]
+
+    if output_format == "text":
+        display_svc_circuits(members)
+    else:
+        write_records(svc_member_records(members), output_format, sys.stdout)
+
+@main.command()
+def trunks(
+    group: Annotated[int | None, typer.Option(help="Only list this trunk group")] = None,
+    output_format: Annotated[str, typer.Option("--format", help="Output format: text, csv or jsonl")] = "text",
+    image: ImageOption = None,
+    track_directory: TrackOption = TRACK_DIRECTORY,
+    no_cache: NoCacheOption = False,
+    graph: GraphOption = None,
+):
+    """List every trunk group and its circuit members (Figure 12D.)"""
+
+    if output_format not in ("text", "csv", "jsonl"):
+        raise typer.BadParameter("Format must be text, csv or jsonl")
+
+    trunk_groups, trunk_members = load_office(image, track_directory, no_cache, graph=graph).trunks
+    if group is not None:
+        trunk_groups = {table: groups[groups["grp_num"] == group] for table, groups in trunk_groups.items()}
+        trunk_members = trunk_members[trunk_members["group"] == group]
+
+    if output_format == "text":
+        display_trunk_entries(trunk_groups, trunk_members)
+    else:
+        write_records(trunk_member_records(trunk_members), output_format, sys.stdout)
+
+def parse_scanpoint(scanpoint: str) -> int:
+    """Pack a scan point given as "scanner row column", e.g. "05 12 03"."""
+    fields = scanpoint.replace(",", " ").split()
+    try:
+        scanner, row, col = (int(field) for field in fields)
+    except ValueError:
+        raise typer.BadParameter("Scan point must be three numbers: scanner, row and column")
+    if not (0 <= scanner < 16 and 0 <= row < 32 and 0 <= col < 16):
+        raise typer.BadParameter("Scan point scanner, row or column out of range")
+    return (scanner << 9) | (row << 4) | col
+
+
+@main.command()
+def xref(
+    scanpoint: Annotated[str | None, typer.Option(
+        help='Scan point, as "scanner row column", of line translator entries and trunk members')] = None,
+    svc_scanpoint: Annotated[str | None, typer.Option(help="Octal service member scan point byte")] = None,
+    univ_scanpoint: Annotated[str | None, typer.Option(
+        help="Octal universal translator tone or supervisory scan point")] = None,
+    ten: Annotated[str | None, typer.Option(help="Octal TEN")] = None,
+    dta: Annotated[int | None, typer.Option(help="DTA number")] = None,
+    output_format: Annotated[str, typer.Option("--format", help="Output format: text, csv or jsonl")] = "text",
+    index: Annotated[str | None, typer.Option(help="Query an index written by --save instead of the office")] = None,
+    save: Annotated[str | None, typer.Option(help="Write the index to this file")] = None,
+    image: ImageOption = None,
+    track_directory: TrackOption = TRACK_DIRECTORY,
+    no_cache: NoCacheOption = False,
+    graph: GraphOption = None,
+):
+    """Find the members and translator entries that use a scan point, TEN or DTA."""
 
-    for entry in grptbl.svc_table.groups:
-        if entry.grp_num != group_number:
+    if output_format not in ("text", "csv", "jsonl"):
+        raise typer.BadParameter("Format must be text, csv or jsonl")
+
+    queries = []
+    if scanpoint is not None:
+        queries.append(("scanpoint", parse_scanpoint(scanpoint)))
+    for kind, value, name, bits in (("svc_scanpoint", svc_scanpoint, "Service scan point", 8),
+                                    ("univ_scanpoint", univ_scanpoint, "Universal scan point", 9)):
+        if value is None:
             continue
-        print(entry)
+        try:
+            number = int(value, base=8)
+        except ValueError:
+            raise typer.BadParameter(f"{name} must be octal")
+        if not 0 <= number < 1 << bits:
+            raise typer.BadParameter(f"{name} must fit in {bits:d} bits")
+        queries.append((kind, number))
+    if ten is not None:
+        try:
+            queries.append(("ten", int(ten, base=8)))
+        except ValueError:
+            raise typer.BadParameter("TEN must be octal")
+    if dta is not None:
+        queries.append(("dta", dta))
+    if not queries and save is None:
+        raise typer.BadParameter("Specify a scan point, TEN or DTA to look up, or --save")
 
-        # TODO: Move this out of the CLI handling code.
-        memlist_grp: MEMLST_SVC_GROUP = MEMLST_SVC_GROUP.parse(entry.highest_member,
-                                    data.range_starting_at_address(memlist.memlist_svc.member_list_address + entry.member_list_index))
+    if index:
+        cross_reference = CrossReference.load(index)
+    else:
+        cross_reference = load_office(image, track_directory, no_cache, graph=graph).xref
+    if save:
+        cross_reference.save(save)
+        print(f"Wrote {len(cross_reference)} entries to {save}", file=sys.stderr)
+
+    entries = np.concatenate([cross_reference.lookup(kind, value) for kind, value in queries] +
+                             [cross_reference.entries[:0]])
+    if output_format == "text":
+        display_xref(entries)
+    else:
+        write_records(xref_records(entries), output_format, sys.stdout)
+
+
+def parse_address(address: str) -> int:
+    """Parse an octal memory address."""
+    try:
+        value = int(address, base=8)
+    except ValueError:
+        raise typer.BadParameter("Address must be octal")
+    if not 0 <= value < 1 << 20:
+        raise typer.BadParameter("Address must fit in 20 bits")
+    return value
 
-        print(memlist_grp)
-        for memlist_entry in memlist_grp.members:
-            print(memlist_entry)
 
 @main.command()
-def blocks():
+def blocks(
+    address: Annotated[str | None, typer.Option(help="Only list the blocks that load this octal address")] = None,
+    jobs: Annotated[int, typer.Option("--jobs", "-j", help="Number of processes to catalog blocks with")] = 1,
+    rebuild: Annotated[bool, typer.Option("--rebuild", help="Rebuild the track's block catalog")] = False,
+    image: ImageOption = None,
+    track_directory: TrackOption = TRACK_DIRECTORY,
+):
+    """
+    List the address ranges loaded by each block. Track blocks are listed
+    from the track's block catalog, kept in the table cache directory and
+    rebuilt when a block changes.
+    """
+
+    target = parse_address(address) if address is not None else None
 
-    base_filename = "TapeData/1/"
+    if image:
+        header = read_office_image_header(image)
+        block_ranges = {}
+        for start_address, length, block_n, offset_in_block in header.ranges:
+            block_ranges.setdefault(block_n, []).append((start_address, length, offset_in_block))
+        block_numbers = range(header.start_block, header.end_block)
+        corrupt = {status.block for status in header.blocks if not status.crc_ok}
+    else:
+        catalog = BlockCatalog.load_or_build(track_directory, START_BLOCK, END_BLOCK, jobs=jobs, rebuild=rebuild)
+        entries = catalog.locate(target) if target is not None else catalog.ranges
+        block_ranges = {}
+        for entry in entries:
+            block_ranges.setdefault(int(entry["block"]), []).append(
+                (int(entry["start_address"]), int(entry["length"]), int(entry["offset_in_block"])))
+        block_numbers = range(START_BLOCK, END_BLOCK)
+        corrupt = set(catalog.corrupt_blocks())
 
-    for block_n in range(167, 317):
-        data = load_track(base_filename, start_block=block_n, end_block=block_n + 1)
-        if data and len(data.ranges) > 0:
-            print(f"Block {block_n}: 0o{data.ranges[0].start_address:o} - 0o{data.ranges[0].start_address + data.ranges[0].length:o} ")
-        else:
+    found = False
+    for block_n in block_numbers:
+        ranges = sorted(block_ranges.get(block_n, []), key=lambda r: r[2])
+        if target is not None:
+            ranges = [r for r in ranges if r[0] <= target < r[0] + r[1]]
+            if not ranges:
+                continue
+        elif not ranges:
             print(f"Block {block_n} no data")
+            continue
+
+        found = True
+        crc = " CRC mismatch" if block_n in corrupt else ""
+        for start_address, length, offset_in_block in ranges:
+            print(f"Block {block_n}: 0o{start_address:o} - 0o{start_address + length:o} "
+                  f"at word {offset_in_block}{crc}")
+
+    if target is not None and not found:
+        print(f"Address 0o{target:o} is not loaded by any block", file=sys.stderr)
+        raise typer.Exit(1)
+
+
+def parse_word(word: str, name: str = "Word") -> int:
+    """Parse an octal 16-bit word."""
+    try:
+        value = int(word, base=8)
+    except ValueError:
+        raise typer.BadParameter(f"{name} must be octal")
+    if not 0 <= value <= WORD_MASK:
+        raise typer.BadParameter(f"{name} must fit in 16 bits")
+    return value
+
+
+def parse_address_range(address_range: str) -> tuple[int, int]:
+    """Parse an octal address range "START-END", end exclusive, or a single address."""
+    start, _, end = address_range.partition("-")
+    start = parse_address(start)
+    end = parse_address(end) if end else start + 1
+    if end <= start:
+        raise typer.BadParameter("Address range end must be above its start")
+    return start, end
+
+
+@main.command()
+def search(
+    value: Annotated[str | None, typer.Option(help="Octal word to find, compared under --mask")] = None,
+    sequence: Annotated[str | None, typer.Option(
+        help='Octal words to find in a row, compared under --mask; "?" matches any word')] = None,
+    pointers_to: Annotated[str | None, typer.Option(
+        help='Find word pairs pointing into this octal address range, as "START-END" or one address')] = None,
+    mask: Annotated[str, typer.Option(help="Octal mask of the word bits to compare")] = f"{WORD_MASK:o}",
+    start: Annotated[str, typer.Option(help="First octal address to search")] = "0",
+    end: Annotated[str | None, typer.Option(help="Octal address to stop searching at")] = None,
+    limit: Annotated[int | None, typer.Option(min=0, help="Stop after this many matches")] = None,
+    output_format: Annotated[str, typer.Option("--format", help="Output format: text, csv or jsonl")] = "text",
+    image: ImageOption = None,
+    track_directory: TrackOption = TRACK_DIRECTORY,
+    coalesce: CoalesceOption = False,
+):
+    """
+    Search the loaded memory for a word under a mask, a sequence of words, or
+    pointers into an address range. Matches are written as they are found.
+    A search reads every block, so it does not take --lazy.
+    """
+
+    if output_format not in ("text", "csv", "jsonl"):
+        raise typer.BadParameter("Format must be text, csv or jsonl")
+    if [value, sequence, pointers_to].count(None) != 2:
+        raise typer.BadParameter("Specify one of --value, --sequence or --pointers-to")
+
+    mask_value = parse_word(mask, "Mask")
+    search_start = parse_address(start)
+    search_end = parse_address(end) if end is not None else ADDRESS_SPACE
+    memory = as_memory_image(load_office(image, track_directory, no_cache=True, coalesce=coalesce).data)
+
+    if value is not None:
+        chunks = find_masked(memory, parse_word(value, "Value"), mask_value, search_start, search_end)
+    elif sequence is not None:
+        words = [None if word == "?" else parse_word(word) for word in sequence.split()]
+        if not words:
+            raise typer.BadParameter("Sequence must have at least one word")
+        chunks = find_sequence(memory, words, mask_value, search_start, search_end)
+    else:
+        low, high = parse_address_range(pointers_to)
+        chunks = find_pointers(memory, low, high, search_start, search_end)
+
+    chunks = first_matches(chunks, limit)
+    if output_format == "text":
+        display_search(chunks)
+    else:
+        write_records(search_records(chunks), output_format, sys.stdout)
+
+
+@main.command()
+def tables(
+    output_format: Annotated[str, typer.Option("--format", help="Output format: text, csv or jsonl")] = "text",
+    graph: Annotated[str | None, typer.Option(help="List a table graph written by --save instead of the office")] = None,
+    save: Annotated[str | None, typer.Option(help="Write the table graph to this JSON file")] = None,
+    image: ImageOption = None,
+    track_directory: TrackOption = TRACK_DIRECTORY,
+    no_cache: NoCacheOption = False,
+):
+    """List the tables found by following pointers from the master table index."""
+
+    if output_format not in ("text", "csv", "jsonl"):
+        raise typer.BadParameter("Format must be text, csv or jsonl")
+
+    table_graph = TableGraph.load(graph) if graph else load_office(image, track_directory, no_cache).table_graph
+    if save:
+        table_graph.save(save)
+        print(f"Wrote {len(table_graph)} tables to {save}", file=sys.stderr)
+
+    if output_format == "text":
+        display_tables(table_graph)
+    else:
+        write_records(table_records(table_graph), output_format, sys.stdout)
+
+
+@main.command()
+def convert(
+    output: Annotated[str, typer.Argument(help="Office image file to write")],
+    track_directory: TrackOption = TRACK_DIRECTORY,
+    start_block: int = START_BLOCK,
+    end_block: int = END_BLOCK,
+):
+    """Write the blocks of a track to an office image (.odi) file."""
+
+    header = write_office_image(output, track_directory, start_block=start_block, end_block=end_block)
+
+    bad_blocks = [status.block for status in header.blocks if not status.crc_ok]
+    print(f"Wrote {len(header.ranges)} ranges from {len(header.blocks)} blocks to {output}")
+    if bad_blocks:
+        print(f"CRC mismatch in blocks: {', '.join(str(block_n) for block_n in bad_blocks)}")
+
+
+@main.command()
+def verify(
+    track_directory: TrackOption = TRACK_DIRECTORY,
+    start_block: int = START_BLOCK,
+    end_block: int = END_BLOCK,
+    jobs: Annotated[int, typer.Option("--jobs", "-j", help="Number of processes to check blocks with")] = 1,
+    output_format: Annotated[str, typer.Option("--format", help="Output format: text or jsonl")] = "text",
+    no_cache: NoCacheOption = False,
+):
+    """Check the CRC of every block of a track and list the address ranges of corrupt blocks."""
+
+    if output_format not in ("text", "jsonl"):
+        raise typer.BadParameter("Format must be text or jsonl")
+
+    statuses = verify_track(track_directory, start_block, end_block, jobs=jobs,
+                            cache=None if no_cache else TableCache())
+    corrupt = [status for status in statuses if not status.crc_ok]
+
+    if output_format == "jsonl":
+        records = ({"block": status.block, "crc_ok": status.crc_ok, "stored_crc": f"{status.stored_crc:06o}",
+                    "computed_crc": f"{status.computed_crc:06o}",
+                    "ranges": [[f"{start:o}", f"{start + length:o}"] for start, length in status.ranges]}
+                   for status in statuses)
+        write_records(records, "jsonl", sys.stdout)
+    else:
+        for status in corrupt:
+            ranges = ", ".join(f"0o{start:o}-0o{start + length:o}" for start, length in status.ranges)
+            print(f"Block {status.block}: CRC mismatch, stored {status.stored_crc:06o} "
+                  f"computed {status.computed_crc:06o}; ranges {ranges or 'none'}")
+        print(f"{len(statuses)} blocks checked, {len(corrupt)} corrupt")
+
+    if corrupt:
+        raise typer.Exit(1)
+
+
+SocketOption = Annotated[str | None, typer.Option("--socket", help="Unix socket of the query server")]
+
+
+@main.command()
+def serve(
+    socket_path: SocketOption = None,
+    image: ImageOption = None,
+    track_directory: TrackOption = TRACK_DIRECTORY,
+    no_cache: NoCacheOption = False,
+    prefer_patched: Annotated[bool, typer.Option(help="Load NNNN_patched.bin files in place of their blocks")] = False,
+    graph: GraphOption = None,
+):
+    """
+    Load the office once and answer queries over a Unix socket until
+    interrupted. A "reload" request picks up changed block files.
+    """
+
+    socket_path = socket_path or default_socket_path()
+    office = load_office(image, track_directory, no_cache, prefer_patched=prefer_patched, graph=graph)
+    print(f"Listening on {socket_path}", file=sys.stderr)
+    try:
+        serve_queries(office, socket_path)
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(e, file=sys.stderr)
+        raise typer.Exit(1)
+
+
+@main.command()
+def client(
+    requests: Annotated[list[str] | None, typer.Argument(help="JSON requests; read one per line from stdin if none")] = None,
+    socket_path: SocketOption = None,
+):
+    """Send JSON requests to a running `odd serve` and print each response as a JSON line."""
+
+    lines = requests or [line for line in sys.stdin if line.strip()]
+    try:
+        parsed = [json.loads(line) for line in lines]
+    except ValueError as e:
+        raise typer.BadParameter(f"Request is not valid JSON: {e}")
+
+    try:
+        with QueryClient(socket_path) as query_client:
+            responses = query_client.query_many(parsed)
+    except OSError as e:
+        print(f"Cannot reach the query server: {e}", file=sys.stderr)
+        raise typer.Exit(1)
+
+    for response in responses:
+        print(json.dumps(response))
+    if not all(response.get("ok") for response in responses):
+        raise typer.Exit(1)
+
+
+@main.command()
+def cache(clear: Annotated[bool, typer.Option(help="Remove every cached table")] = False):
+    """Show the decoded table cache statistics."""
 
+    table_cache = TableCache()
+    if clear:
+        table_cache.clear()
+        print(f"Cleared {table_cache.directory}")
+        return
 
+    print(f"Cache directory: {table_cache.directory}")
+    print(table_cache.total_stats())
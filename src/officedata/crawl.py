@@ -0,0 +1,231 @@
+"""
+Table graph: the office data tables found by following pointers from the
+master table index.
+
+The crawler starts at the master table index and follows every three word
+GRPTBL_entry/MEMLST_entry-style header to the table it points to, then the
+SPN head table's words to their subtranslators. Each table's words are read
+once; a pointer to an address already visited only adds an edge. The graph
+holds every table's address, extent and header count, and can be saved as
+JSON and loaded again without reading the office data. A saved graph is
+checked against the master table index with `check_graph` before its
+addresses are used.
+"""
+
+import json
+from dataclasses import asdict, dataclass, field
+
+from .image_tools import DataRangeSet, MemoryImage
+from .odd import GRPTBL_SLOT, MASTER_TABLE_INDEX, MEMLST_SLOT, SPTBL_SLOT, GRPTBL_entry
+
+GRAPH_VERSION = 1
+MASTER_TABLE_NAME = "master_table_index"
+
+# Tables pointed to by each master table run, in slot order: (name, words per
+# counted entry, extra words). PBX group entries are not decoded, so one word
+# per group is assumed. A MEMLST header counts its member list words minus one.
+HEADER_TABLES = (
+    ("grptbl", GRPTBL_SLOT, (("pbx_groups", 1, 0), ("svc_groups", 4, 0),
+                             ("trunk_groups_low", 8, 0), ("trunk_groups_high", 8, 0))),
+    ("memlst", MEMLST_SLOT, (("memlst_pbx", 1, 1), ("memlst_svc", 1, 1),
+                             ("memlst_trunks_low", 1, 1), ("memlst_trunks_high", 1, 1))),
+    ("sptbl", SPTBL_SLOT, (("spn_head", 1, 0),)),
+)
+
+# Subtranslators by SPN head sub type, with their length in words (Figures 2A-2C)
+SUBTRANSLATORS = {1: ("misc_subtranslator", 64), 2: ("univ_subtranslator", 128), 3: ("line_subtranslator", 128)}
+
+
+@dataclass
+class TableNode:
+    name: str
+    address: int
+    length: int
+    # Count field of the header that points to the table
+    count: int
+    # Whether every word of the table's extent is loaded
+    loaded: bool
+
+    @property
+    def end(self) -> int:
+        return self.address + self.length
+
+
+@dataclass
+class TableEdge:
+    source: str
+    # Address of the header or word holding the pointer
+    pointer_address: int
+    target: str
+
+
+@dataclass
+class TableGraph:
+    """The tables found by `crawl` and the pointers between them."""
+    tables: list[TableNode] = field(default_factory=list)
+    edges: list[TableEdge] = field(default_factory=list)
+
+    def __post_init__(self):
+        self._by_name = {table.name: table for table in self.tables}
+
+    def add_table(self, table: TableNode):
+        self.tables.append(table)
+        self._by_name[table.name] = table
+
+    def __len__(self):
+        return len(self.tables)
+
+    def __contains__(self, name: str):
+        return name in self._by_name
+
+    def table(self, name: str) -> TableNode:
+        if name not in self._by_name:
+            raise ValueError(f"No table named {name} in the table graph")
+        return self._by_name[name]
+
+    def tables_at(self, address: int) -> list[TableNode]:
+        """Every table whose extent holds an address. Tables nest inside the master table index."""
+        return [table for table in self.tables if table.address <= address < table.end]
+
+    def sources(self, name: str) -> list[TableEdge]:
+        """The pointers to a table."""
+        return [edge for edge in self.edges if edge.target == name]
+
+    def targets(self, name: str) -> list[TableNode]:
+        """The tables a table points to, in pointer order."""
+        return [self._by_name[edge.target] for edge in self.edges if edge.source == name]
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "version": GRAPH_VERSION,
+            "tables": [asdict(table) for table in self.tables],
+            "edges": [asdict(edge) for edge in self.edges],
+        })
+
+    @classmethod
+    def from_json(cls, data: str | bytes) -> "TableGraph":
+        graph = json.loads(data)
+        if graph.get("version") != GRAPH_VERSION:
+            raise ValueError("Unsupported table graph version")
+        return cls(tables=[TableNode(**table) for table in graph["tables"]],
+                   edges=[TableEdge(**edge) for edge in graph["edges"]])
+
+    def save(self, filename: str):
+        with open(filename, "w") as f:
+            f.write(self.to_json())
+
+    @classmethod
+    def load(cls, filename: str) -> "TableGraph":
+        with open(filename) as f:
+            return cls.from_json(f.read())
+
+
+class _Crawler:
+    def __init__(self, data: DataRangeSet | MemoryImage):
+        self.data = data
+        self.graph = TableGraph()
+        # Table address to the name it was first visited as
+        self.visited: dict[int, str] = {}
+
+    def visit(self, name: str, address: int, length: int, count: int, source: str | None = None,
+              pointer_address: int | None = None, memoize: bool = True):
+        """
+        Add a table and return its words, or None if they are not loaded. A
+        table at an address already visited only gets an edge, and None is
+        returned.
+        """
+        if memoize and address in self.visited:
+            self.graph.edges.append(TableEdge(source, pointer_address, self.visited[address]))
+            return None
+        if memoize:
+            self.visited[address] = name
+        if source is not None:
+            self.graph.edges.append(TableEdge(source, pointer_address, name))
+
+        try:
+            words = self.data.range_starting_at_address(address, length).words if length else []
+        except ValueError:
+            words = None
+        self.graph.add_table(TableNode(name, address, length, count, words is not None))
+        return words
+
+    def follow(self, source: str, pointer_address: int, entry: GRPTBL_entry, name: str, entry_words: int,
+               extra_words: int):
+        """Follow a three word header to the table it points to. Null headers are skipped."""
+        if entry.pointer == 0 and entry.n_entries == 0:
+            return None
+        return self.visit(name, entry.pointer, entry.n_entries * entry_words + extra_words, entry.n_entries,
+                          source, pointer_address)
+
+    def subtranslators(self, spn_head: TableNode, head_words):
+        for w_index, word in enumerate(int(word) for word in head_words):
+            sub_type = word >> 14
+            if sub_type == 0:
+                continue
+            kind, length = SUBTRANSLATORS.get(sub_type, ("unknown_subtranslator", 0))
+            self.visit(f"{kind}_{w_index:03d}", spn_head.address + w_index + (word & 0x3ff), length, 64,
+                       spn_head.name, spn_head.address + w_index)
+
+
+def crawl(data: DataRangeSet | MemoryImage, master: MASTER_TABLE_INDEX | None = None) -> TableGraph:
+    """
+    Find the office's tables by following pointers from the master table
+    index. Slots of the index not used by the GRPTBL, MEMLST or SPTBL are
+    followed too, as `master_slot_N` tables.
+    """
+    if master is None:
+        master = MASTER_TABLE_INDEX.parse(data)
+    crawler = _Crawler(data)
+    n_slots = len(master.entries)
+    crawler.visit(MASTER_TABLE_NAME, master.address, 3 * n_slots, n_slots, memoize=False)
+
+    claimed = set()
+    for table_name, first_slot, targets in HEADER_TABLES:
+        slot_address = master.slot_address(first_slot)
+        # The header tables are runs of master table slots, so they are not memoized by address.
+        crawler.visit(table_name, slot_address, 3 * len(targets), len(targets), MASTER_TABLE_NAME, slot_address,
+                      memoize=False)
+        for slot, (name, entry_words, extra_words) in enumerate(targets, start=first_slot):
+            claimed.add(slot)
+            words = crawler.follow(table_name, master.slot_address(slot), master.entries[slot], name, entry_words,
+                                   extra_words)
+            if name == "spn_head" and words is not None:
+                crawler.subtranslators(crawler.graph.table(name), words)
+
+    for slot, entry in enumerate(master.entries):
+        if slot not in claimed:
+            crawler.follow(MASTER_TABLE_NAME, master.slot_address(slot), entry, f"master_slot_{slot}", 1, 0)
+
+    return crawler.graph
+
+
+def check_graph(graph: TableGraph, data: DataRangeSet | MemoryImage):
+    """
+    Check that a saved graph describes the office data: the master table index
+    must be loaded at the graph's address for it, and each of its slots must
+    point to the address, with the header count, the graph has for that slot.
+    Raises ValueError if not.
+    """
+    if MASTER_TABLE_NAME not in graph:
+        raise ValueError("Table graph has no master table index")
+    node = graph.table(MASTER_TABLE_NAME)
+    try:
+        master = MASTER_TABLE_INDEX.parse(data, node.address, node.count)
+    except ValueError:
+        raise ValueError(f"Table graph's master table index at 0o{node.address:o} is not loaded")
+
+    header_tables = {name for name, _, _ in HEADER_TABLES}
+    pointers = {edge.pointer_address: edge for edge in graph.edges
+                if edge.source != MASTER_TABLE_NAME or edge.target not in header_tables}
+    for slot, entry in enumerate(master.entries):
+        edge = pointers.get(master.slot_address(slot))
+        if edge is None:
+            matches = entry.pointer == 0 and entry.n_entries == 0
+        else:
+            table = graph.table(edge.target)
+            # A table reached again through another header keeps the first header's count.
+            first = graph.sources(edge.target)[0] is edge
+            matches = table.address == entry.pointer and (table.count == entry.n_entries or not first)
+        if not matches:
+            raise ValueError(f"Table graph does not match the master table index slot {slot} "
+                             f"at 0o{master.slot_address(slot):o}")
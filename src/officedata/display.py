@@ -1,97 +1,265 @@
 """"Functions to create useful displays of the office data tree"""
 
 
-from .odd import SERVICE_GROUP_entry, SERVICE_GROUP_TABLE
-from .image_tools import decode_scanpoint, decode_dta
+import csv
+import json
+from collections.abc import Iterable, Iterator
+from typing import TextIO
 
+import numpy as np
 
-def display_svc_circuits(svc_table: SERVICE_GROUP_TABLE):
+from .bulk import TRUNK_TABLES
+from .image_tools import decode_dta, decode_scanpoint
+from .odd import SPN_HEAD_TABLE, SUBTRANSLATOR_COLUMNS
+from .xref import KINDS, SOURCES
 
-    for group_n, svc_group in enumerate(svc_table.entries):
-        pass
 
-        #entry_address = svc_table.table_address + svc_group.member_list_index + group_n//2 + 1
-        #svc_data = svc_table.range.subset_at_address(entry_address, )
+def format_scanpoint(scanpoint_field: int) -> str:
+    return "{:02d} {:02d} {:02d}".format(*decode_scanpoint(scanpoint_field))
 
-def __display_svc_circuits(svc_entries):
 
-    for group_n, svc_group in svc_entries.items():
+def subtranslator_records(columns: SUBTRANSLATOR_COLUMNS, keys: dict[str, list]) -> Iterator[dict]:
+    """
+    Yield one record per row of a bulk scan point lookup. `keys` holds
+    leading columns, such as the requested OE numbers. Fields that do not
+    apply to a row are None.
+    """
+    names = list(keys)
+    key_values = list(zip(*keys.values()))
+    for n in range(len(columns)):
+        record = dict(zip(names, key_values[n]))
+        sub_type = int(columns.sub_type[n])
+        if sub_type == 0:
+            record["status"] = "unassigned"
+        elif not columns.loaded[n]:
+            record["status"] = "not loaded"
+        else:
+            record["status"] = "ok"
+        record["sub_type"] = sub_type
+        record["address"] = f"{columns.address[n]:o}" if columns.address[n] >= 0 else None
 
-        if(not svc_group.exists):
-            continue
-        member_list_range = range_starting_at_address(memlist_entry_svc.pointer +
-                                                      svc_group.member_list_index, data)
-        print("GROUP {:3d} N members: {:d}, N spares: {:d}".format(group_n,
-                                                                   (member_list_range.words[0] >> 7) & 0x7f,
-                                                                   member_list_range.words[0] & 0x7f))
-        print(f"Start address: 0o{member_list_range.start_address:o}, End address: 0o{member_list_range.end_address:o}")
-        print(f"Header byte: 0o{member_list_range.words[0]:o}")
+        for field in ("word0", "word1", "ten"):
+            value = int(getattr(columns, field)[n])
+            record[field] = f"{value:o}" if value >= 0 else None
+        for field in ("u_type", "grp_number", "mem_number", "tone_scanpoint", "supv_scanpoint", "terminal", "group"):
+            value = int(getattr(columns, field)[n])
+            record[field] = value if value >= 0 else None
+        record["scanpoint"] = format_scanpoint(int(columns.scanpoint[n])) if columns.scanpoint[n] >= 0 else None
+        yield record
 
-        group_format = member_list_range.words[0] >> 14
 
-        for member_n in range(0, svc_group.highest_member + 1):
-            offset = memlist_entry_svc.pointer + svc_group.member_list_index + member_n//2 + 1
+def batch_records(spn_head: SPN_HEAD_TABLE, entries: list[tuple[str, str]]) -> Iterator[dict]:
+    """
+    Look up every batch entry in bulk, one lookup per kind, and yield the
+    records in input order as they are formatted.
+    """
+    kinds = np.array([kind for kind, _ in entries])
+    numbers = np.array([number for _, number in entries])
 
-            svc_data = range_starting_at_address(offset, data)
-            if(member_n % 2 == 1):
-                svcnbr = svc_data.words[0] >> 8
-            else:
-                svcnbr = svc_data.words[0] & 0xff
+    record_iterators = {}
+    for kind, lookup in (("oe", spn_head.lookup_oe_many), ("ten", spn_head.lookup_ten_many)):
+        selected = numbers[kinds == kind]
+        if len(selected) > 0:
+            keys = {"kind": [kind] * len(selected), "number": selected.tolist()}
+            record_iterators[kind] = subtranslator_records(lookup(selected), keys)
 
-            if group_format == 0:
-                print("Group {:d} Member {:d} PBX Hunt addr {:o}".format(group_n, member_n, offset))
+    for kind in kinds:
+        yield next(record_iterators[kind])
 
-            elif group_format == 2:
 
-                high_offset = memlist_entry_svc.pointer + svc_group.member_list_index + math.ceil((svc_group.highest_member + 1)/2) + member_n + 1
-                svc_data_high = range_starting_at_address(high_offset, data)
-                ckt_code = svc_data_high.words[0] >> 11
-                dta = svc_data_high.words[0] & 0xfff
+def spn_dump_records(columns: SUBTRANSLATOR_COLUMNS) -> Iterator[dict]:
+    """
+    Yield one record per subtranslator slot from `SPN_HEAD_TABLE.enumerate_entries`,
+    keyed by head table and subtranslator index, OE, TEN and scan point number.
+    The TEN key is `ten_number`, as `ten` is the universal subtranslator field.
+    Miscellaneous subtranslator entries are listed with their raw word0.
+    """
+    scanner, row, col = SPN_HEAD_TABLE.scanpoint_numbers(columns.w_index, columns.x_index)
+    keys = {
+        "w_index": columns.w_index.tolist(),
+        "x_index": columns.x_index.tolist(),
+        "oe": [f"{oe:06o}" for oe in SPN_HEAD_TABLE.oe_numbers(columns.w_index, columns.x_index).tolist()],
+        "ten_number": [f"{ten:06o}" for ten in SPN_HEAD_TABLE.ten_numbers(columns.w_index, columns.x_index).tolist()],
+        "spn": [f"{s:02d} {r:02d} {c:02d}" for s, r, c in zip(scanner.tolist(), row.tolist(), col.tolist())],
+    }
+    return subtranslator_records(columns, keys)
+
+
+def write_records(records: Iterable[dict], output_format: str, file: TextIO):
+    """Stream records as CSV (header from the first record) or JSON Lines."""
+    if output_format == "jsonl":
+        file.writelines(json.dumps(record) + "\n" for record in records)
+    elif output_format == "csv":
+        writer = None
+        for record in records:
+            if writer is None:
+                writer = csv.DictWriter(file, fieldnames=list(record), lineterminator="\n")
+                writer.writeheader()
+            writer.writerow(record)
+    else:
+        raise ValueError(f"Unknown output format {output_format}")
+
+
+def display_svc_circuits(svc_members, file: TextIO | None = None):
+    """
+    List every service circuit decoded by `bulk.decode_service_members`,
+    one line per member.
+    """
+    for member in svc_members:
+        group_n = int(member["group"])
+        member_n = int(member["member"])
+        address = int(member["address"])
+        if not member["loaded"]:
+            print(f"Group {group_n:d} Member {member_n:d} not loaded addr {address:o}", file=file)
+        elif member["format"] == 1:
+            print("Group {:d} Member {:d} TEN {:04o} addr {:o}".format(group_n, member_n, int(member["ten"]), address),
+                  file=file)
+        else:
+            dta = int(member["dta"])
+            dp_PD, dp_trip = decode_dta(dta)
+            print("Group {:d} Member {:d} SVCNBR {:s}, ckt_code {:d}, DP {:03d} {:d} ({:d}) addr {:o}".format(
+                group_n, member_n, format_scanpoint(int(member["scanpoint"])), int(member["ckt_code"]),
+                dp_PD, dp_trip, dta, address), file=file)
+
+
+def svc_member_records(svc_members) -> Iterator[dict]:
+    """Yield one record per decoded service circuit, for CSV or JSON Lines output."""
+    for member in svc_members:
+        is_ten = member["format"] == 1
+        yield {
+            "group": int(member["group"]),
+            "member": int(member["member"]),
+            "format": int(member["format"]),
+            "loaded": bool(member["loaded"]),
+            "address": f"{int(member['address']):o}",
+            "ten": f"{int(member['ten']):04o}" if is_ten else None,
+            "scanpoint": None if is_ten else format_scanpoint(int(member["scanpoint"])),
+            "dta": None if is_ten else int(member["dta"]),
+            "ckt_code": None if is_ten else int(member["ckt_code"]),
+        }
+
+def display_trunk_entries(trunk_groups, trunk_members, file: TextIO | None = None):
+    """
+    List trunk groups and their circuits from `bulk.decode_office_trunks`,
+    one line per group followed by one line per member.
+    """
+    for table, groups in trunk_groups.items():
+        table_n = TRUNK_TABLES.index(table)
+        table_members = trunk_members[trunk_members["table"] == table_n]
+        starts = np.searchsorted(table_members["group"], groups["grp_num"], side="left")
+        ends = np.searchsorted(table_members["group"], groups["grp_num"], side="right")
+
+        for group, start, end in zip(groups, starts, ends):
+            if not group["exists"]:
+                continue
+            group_n = int(group["grp_num"])
+            print(f"GROUP {group_n:3d} ({table}) highest member: {int(group['highest_member']):d}, "
+                  f"circuit code: {int(group['circuit_code']):d}, address 0o{int(group['memory_address']):o}", file=file)
+
+            for member in table_members[start:end]:
+                dta = int(member["dta"])
                 dp_PD, dp_trip = decode_dta(dta)
+                print(f"GROUP {group_n:d}, MEMBER {int(member['member']):d}, SPN {format_scanpoint(int(member['spn'])):s}, "
+                      f"DTA {dp_PD:03d} {dp_trip:d} ({dta:d}), CKTCODE {int(member['ckt_code']):d} ", file=file)
+
+
+def trunk_member_records(trunk_members) -> Iterator[dict]:
+    """Yield one record per decoded trunk circuit, for CSV or JSON Lines output."""
+    for member in trunk_members:
+        yield {
+            "table": TRUNK_TABLES[int(member["table"])],
+            "group": int(member["group"]),
+            "member": int(member["member"]),
+            "loaded": bool(member["loaded"]),
+            "address": f"{int(member['address']):o}",
+            "spn": format_scanpoint(int(member["spn"])),
+            "dta": int(member["dta"]),
+            "ckt_code": int(member["ckt_code"]),
+        }
+
+
+def format_xref_value(kind: str, value: int) -> str:
+    if kind == "scanpoint":
+        return format_scanpoint(value)
+    if kind == "ten":
+        return f"{value:04o}"
+    if kind in ("svc_scanpoint", "univ_scanpoint"):
+        return f"{value:03o}"
+    return f"{value:d}"
+
+
+def xref_records(entries) -> Iterator[dict]:
+    """Yield one record per owner found by `CrossReference.lookup`."""
+    for entry in entries:
+        kind = KINDS[int(entry["kind"])]
+        source = SOURCES[int(entry["source"])]
+        record = {
+            "kind": kind,
+            "value": format_xref_value(kind, int(entry["value"])),
+            "source": source,
+            "table": TRUNK_TABLES[int(entry["table"])] if entry["table"] >= 0 else None,
+            "group": None,
+            "member": None,
+            "oe": None,
+            "address": f"{int(entry['address']):o}",
+        }
+        if source in ("service", "trunk"):
+            record["group"] = int(entry["group"])
+            record["member"] = int(entry["member"])
+        else:
+            record["oe"] = f"{int(SPN_HEAD_TABLE.oe_numbers(entry['group'], entry['member'])):06o}"
+        yield record
+
+
+def display_xref(entries, file: TextIO | None = None):
+    """List the owners found by `CrossReference.lookup`, one line each."""
+    for record in xref_records(entries):
+        if record["source"] == "service":
+            owner = f"service group {record['group']:d} member {record['member']:d}"
+        elif record["source"] == "trunk":
+            owner = f"trunk group {record['group']:d} ({record['table']}) member {record['member']:d}"
+        else:
+            owner = f"{record['source']} subtranslator OE {record['oe']}"
+        print(f"{record['kind'].upper()} {record['value']}: {owner} addr {record['address']}", file=file)
+
+
+def search_records(chunks) -> Iterator[dict]:
+    """Yield one record per match from the chunks of a `search` function."""
+    for matches in chunks:
+        for match in matches:
+            target = int(match["target"])
+            yield {
+                "address": f"{int(match['address']):o}",
+                "word": f"{int(match['word']):06o}",
+                "target": f"{target:o}" if target >= 0 else None,
+            }
+
+
+def display_search(chunks, file: TextIO | None = None):
+    """List the matches from the chunks of a `search` function, one line each."""
+    for record in search_records(chunks):
+        target = f" -> {record['target']}" if record["target"] is not None else ""
+        print(f"{record['address']}: {record['word']}{target}", file=file, flush=True)
+
+
+def table_records(graph) -> Iterator[dict]:
+    """Yield one record per table of a `crawl.TableGraph`, with the pointers to it."""
+    for table in graph.tables:
+        yield {
+            "name": table.name,
+            "address": f"{table.address:o}",
+            "end": f"{table.end:o}",
+            "length": table.length,
+            "count": table.count,
+            "loaded": table.loaded,
+            "pointers": " ".join(f"{edge.source}@{edge.pointer_address:o}" for edge in graph.sources(table.name)),
+        }
+
 
-                scanpoint_string = "{:02d} {:02d} {:02d}".format(*decode_scanpoint(svcnbr))
-                print("Group {:d} Member {:d} SVCNBR {:s}, ckt_code {:d}, DP {:03d} {:d} ({:d}) addr {:o}".format(group_n,
-                                                                                                                  member_n,
-                                                                                                                  scanpoint_string,
-                                                                                                                  ckt_code,
-                                                                                                                  dp_PD,
-                                                                                                                  dp_trip,
-                                                                                                                  dta,
-                                                                                                                  offset))
-            elif group_format == 1:
-                TEN = member_list_range.words[member_n + 1]
-                print("Group {:d} Member {:d} TEN {:04o} addr {:o}".format(group_n,
-                                                                           member_n,
-                                                                           TEN,
-                                                                           offset))
-            else:
-                print("Group {:d} Member {:d} unknown format addr {:o}".format(group_n,
-                                                                               member_n,
-                                                                               offset))
-
-def display_trunk_entries(trunk_entries):
-
-    for group_n, trunk_group in trunk_entries.items():
-        member_list_range = range_starting_at_address(memlist_entry_trunks_low.pointer +
-                                                      trunk_group.member_list_index, data)
-        if(trunk_group.exists == False):
-            continue
-        print("GROUP {:3d} N members: {:d}, N spares: {:d}".format(group_n,
-                                                                   (member_list_range.words[0] >> 7) & 0x7f,
-                                                                   member_list_range.words[0] & 0x7f))
-        for member_n in range(0, trunk_group.highest_member + 1):
-
-            circuit_member_pointer = memlist_entry_trunks_low.pointer + trunk_group.member_list_index + member_n*2 + 1
-            circuit_member = range_starting_at_address(circuit_member_pointer, data)
-            # SPN = Scan Point Number
-            # DTA = distributor triplet address
-            scanpoint_field = circuit_member.words[0] & 0x1fff
-            scanpoint_string = "{:02d} {:02d} {:02d}".format(*decode_scanpoint(scanpoint_field))
-            distribute_field = circuit_member.words[0] & 0x1fff
-            distribute_string = "{:01d} {:03d} {:01d}".format(distribute_field >> 11,
-                                                             (distribute_field >> 2) & 0x1ff,
-                                                             distribute_field & 0b11)
-
-            cktcode = circuit_member.words[1] >> 11
-            print(f"GROUP {group_n:d}, MEMBER {member_n:d}, SPN {scanpoint_string:s}, "
-                  f"DTA {distribute_string:s} ({distribute_field:d}), CKTCODE {cktcode:d} ")
\ No newline at end of file
+def display_tables(graph, file: TextIO | None = None):
+    """List the tables of a `crawl.TableGraph`, one line each."""
+    for record in table_records(graph):
+        loaded = "" if record["loaded"] else " not fully loaded"
+        pointers = f" from {record['pointers']}" if record["pointers"] else ""
+        print(f"{record['name']:<24} {record['address']:>7} - {record['end']:>7} {record['length']:5d} words "
+              f"count {record['count']}{pointers}{loaded}", file=file)
@@ -0,0 +1,50 @@
+"""Entry layouts of the BSP figure tables, compiled by `schema.TableSchema`."""
+
+from .schema import Field, TableSchema
+
+# Service (Figure 12C) and trunk (Figure 12D) group table entries share the
+# layout of their first four words.
+GROUP_ENTRY_FIELDS = [
+    Field("mbr", word=0, low=8, width=1, flag=True),
+    Field("exists", word=0, low=7, width=1, flag=True),
+    Field("highest_member", word=0, low=0, width=7),
+    Field("sel_status_block_index", word=1, low=0, width=14),
+    Field("member_list_index", word=2, low=0, width=14),
+    Field("circuit_code", word=3, low=0, width=5),
+]
+
+SERVICE_GROUP_SCHEMA = TableSchema("SERVICE_GROUP_entry", 4, GROUP_ENTRY_FIELDS)
+TRUNK_GROUP_SCHEMA = TableSchema("TRUNK_GROUP_entry", 4, GROUP_ENTRY_FIELDS)
+
+# Figure 15C: the header word of a service group member list.
+SERVICE_MEMBER_LIST_HEADER_SCHEMA = TableSchema("MEMLST_SVC_GROUP", 1, [
+    Field("group_format", word=0, low=14, width=2),
+    Field("n_members", word=0, low=7, width=7),
+    Field("n_spares", word=0, low=0, width=7),
+])
+
+# A trunk circuit member list entry: scan point number, circuit code and DTA.
+TRUNK_MEMBER_SCHEMA = TableSchema("TRUNK_CIRCUIT_MEMBER_LIST_entry", 2, [
+    Field("spn", word=0, low=0, width=13),
+    Field("ckt_code", word=1, low=11, width=5),
+    Field("dta", word=1, low=0, width=11),
+])
+
+# Figure 2A: universal subtranslator entry.
+UNIV_SUBTRANSLATOR_SCHEMA = TableSchema("UNIV_SUBTRANSLATOR", 2, [
+    Field("u_type", word=0, low=13, width=3),
+    Field("ten", word=0, low=0, width=9, when=(1, 2)),
+    Field("mem_number", word=1, low=8, width=8, when=(1, 2)),
+    Field("grp_number", word=1, low=0, width=8, when=(1, 2)),
+    Field("tone_scanpoint", word=0, low=0, width=9, when=(3,)),
+    Field("supv_scanpoint", word=0, low=0, width=9, when=(4,)),
+], tag="u_type")
+
+# Figure 2B: line subtranslator entry. The scan point is packed; see
+# `image_tools.decode_scanpoint`.
+LINE_SUBTRANSLATOR_SCHEMA = TableSchema("LINE_SUBTRANSLATOR", 2, [
+    Field("u_type", word=0, low=12, width=4),
+    Field("terminal", word=1, low=8, width=8, when=(11,)),
+    Field("group", word=1, low=0, width=8, when=(11,)),
+    Field("scanpoint", word=1, low=0, width=12, when=(10,)),
+], tag="u_type")
@@ -1,26 +1,34 @@
 
 import numpy as np
 import numpy.typing as npt
+import bisect
 import os
 import struct
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import dataclass, field
 
-@dataclass
+import fastcrc
+
+@dataclass(slots=True)
 class DataRange:
     start_address: int # Address of the first word
     # end_address: int # Address of the last word
     words: npt.NDArray[np.uint16]
 
-    def subset(self, offset, length):
+    def subset(self, offset, length, copy=False):
+        """
+        Return `length` words starting `offset` words into the range. The words
+        are a read-only view unless `copy` is set.
+        """
         new_start = self.start_address + offset
 
         if new_start + length > self.start_address + len(self.words):
             raise ValueError(f"Offset {offset} and length {length} not within size {len(self.words)}")
 
         return DataRange(start_address=new_start,
-                         words=self.words[offset:(offset+length)])
+                         words=_words_view(self.words[offset:(offset+length)], copy))
 
-    def subset_at_address(self, address, length):
+    def subset_at_address(self, address, length, copy=False):
 
         if (address < self.start_address) or (address + length > self.start_address + len(self.words)):
             raise ValueError(f"New addresss 0o{address:06o} not within range 0o{self.start_address:06o}-0o{(self.start_address + len(self.words)):06o}")
@@ -28,7 +36,7 @@ class DataRange:
         offset = address - self.start_address
 
         return DataRange(start_address=address,
-                         words=self.words[offset:(offset+length)])
+                         words=_words_view(self.words[offset:(offset+length)], copy))
 
     @property
     def length(self):
@@ -38,6 +46,23 @@ class DataRange:
         return f"DataRange(start_address=0o{self.start_address:o}, end_address=0o{(self.start_address + len(self.words)):o})"
 
 
+def _words_view(words: npt.NDArray[np.uint16], copy: bool = False) -> npt.NDArray[np.uint16]:
+    """
+    Return a writable copy of `words`, or a read-only view of them. Views
+    alias the loaded tape data, so writing through them is refused; callers
+    that need to modify words ask for a copy.
+    """
+    if copy:
+        return np.array(words, copy=True)
+    view = words.view()
+    view.flags.writeable = False
+    return view
+
+
+def _same_range(a: DataRange, b: DataRange) -> bool:
+    return a.start_address == b.start_address and np.array_equal(a.words, b.words)
+
+
 class DataRangeSet:
     """
     A DataRangeSet contains multiple ranges which need not be contiguous. This
@@ -45,49 +70,166 @@ class DataRangeSet:
     """
 
     ranges: list[DataRange]
-
-    def __init__(self, ranges: list[DataRange]):
-        for range in ranges:
-            for test_range in ranges:
-                assert not (test_range.start_address < range.start_address < test_range.start_address + test_range.length), "Overlapping range"
-                assert not (test_range.start_address < (range.start_address + range.length) < test_range.start_address + test_range.length), "Overlapping range"
-        self.ranges = ranges
+    provenance: "Provenance | None" = None
+    merged_fragments: int = 0
+    # When a list, the (start, end) address spans read are appended to it.
+    read_log: list[tuple[int, int]] | None = None
+
+    def __init__(self, ranges: list[DataRange], provenance: "Provenance | None" = None, merged_fragments: int = 0):
+        self.provenance = provenance
+        self.merged_fragments = merged_fragments
+        self._set_ranges(ranges)
+
+    def _set_ranges(self, ranges: list[DataRange]):
+        ranges = sorted(ranges, key=lambda data_range: data_range.start_address)
+        # An exact duplicate of a range adds no words, so it is dropped rather
+        # than reported as an overlap. Ranges at the same address with
+        # different words still collide.
+        self.ranges = [data_range for n, data_range in enumerate(ranges)
+                       if n == 0 or not _same_range(ranges[n - 1], data_range)]
+
+        # Empty ranges hold no addresses, so they are left out of the index.
+        indexed = [data_range for data_range in self.ranges if data_range.length > 0]
+        self._indexed_ranges = indexed
+        self._starts = np.array([data_range.start_address for data_range in indexed], dtype=np.int64)
+        self._ends = self._starts + np.array([data_range.length for data_range in indexed], dtype=np.int64)
+        self._start_list = self._starts.tolist()
+        self._end_list = self._ends.tolist()
+        self._flat = None
+
+        collisions = self._find_overlaps()
+        if collisions:
+            raise ValueError("Overlapping ranges: " + ", ".join(f"{a} and {b}" for a, b in collisions))
+
+    def replace_ranges(self, removed: list[DataRange], added: list[DataRange], provenance: "Provenance | None" = None):
+        """
+        Swap ranges in place, so tables holding this set see the new words.
+        `removed` are ranges of this set. If the result would overlap,
+        ValueError is raised and the set is left unchanged.
+        """
+        removed_ids = {id(data_range) for data_range in removed}
+        saved = dict(self.__dict__)
+        try:
+            self._set_ranges([data_range for data_range in self.ranges if id(data_range) not in removed_ids] + added)
+        except ValueError:
+            self.__dict__.update(saved)
+            raise
+        if provenance is not None:
+            self.provenance = provenance
+
+    def _log_reads(self, start: int, end: int):
+        if self.read_log is not None:
+            self.read_log.append((start, end))
+
+    def _log_addresses(self, addresses: npt.NDArray[np.int64]):
+        if self.read_log is not None:
+            self.read_log.extend(address_spans(addresses))
+
+    def _find_overlaps(self) -> list[tuple[DataRange, DataRange]]:
+        """
+        Sweep the ranges in address order and return every colliding pair.
+        Each range is compared with the earlier ranges that are still open,
+        so the cost is O(n log n) for the sort plus the number of collisions.
+        """
+        collisions = []
+        if len(self._starts) < 2:
+            return collisions
+
+        # Running maximum of the end addresses seen so far; a range can only
+        # collide with an earlier one if it starts before that maximum.
+        reach = np.maximum.accumulate(self._ends)
+        for n in np.flatnonzero(self._starts[1:] < reach[:-1]) + 1:
+            for m in range(n - 1, -1, -1):
+                if self._ends[m] > self._starts[n]:
+                    collisions.append((self._range(m), self._range(n)))
+                elif reach[m] <= self._starts[n]:
+                    break
+        return collisions
+
+    def _range(self, n: int) -> DataRange:
+        """The nth non-empty range in address order."""
+        return self._indexed_ranges[n]
 
     def _find_range(self, target_address: int) -> DataRange:
         """Find a range and return it verbatim."""
-        for data_range in self.ranges:
-            if((target_address >= data_range.start_address) and
-            (target_address < data_range.start_address + data_range.length)):
-                return data_range
+        n = bisect.bisect_right(self._start_list, target_address) - 1
+        if n >= 0 and target_address < self._end_list[n]:
+            return self._range(n)
 
         raise ValueError(f"Target address 0o{target_address:o} not found in data")
 
-    def range_starting_at_address(self, target_address: int, length: int = 0) -> DataRange:
+    def find_range_indices(self, addresses: npt.ArrayLike) -> npt.NDArray[np.int64]:
+        """
+        Vectorized `_find_range`: return the index into the sorted, non-empty
+        ranges holding each address, or -1 where the address is not loaded.
+        """
+        addresses = np.asarray(addresses, dtype=np.int64)
+        if len(self._starts) == 0:
+            return np.full(addresses.shape, -1, dtype=np.int64)
+        indices = np.searchsorted(self._starts, addresses, side="right") - 1
+        found = (indices >= 0) & (addresses < self._ends[np.maximum(indices, 0)])
+        return np.where(found, indices, -1)
+
+    def words_at(self, addresses: npt.ArrayLike) -> tuple[npt.NDArray[np.uint16], npt.NDArray[np.bool_]]:
+        """
+        Gather the words at an array of addresses. Returns the words and a mask
+        of which addresses are loaded; unloaded addresses read as zero.
+        """
+        if self._flat is None:
+            # All range words back to back, so one fancy index gathers them.
+            self._flat = np.concatenate([data_range.words for data_range in self._indexed_ranges] +
+                                        [np.zeros(0, dtype=np.uint16)])
+            self._flat_offsets = np.cumsum(self._ends - self._starts) - (self._ends - self._starts)
+
+        addresses = np.asarray(addresses, dtype=np.int64)
+        self._log_addresses(addresses)
+        indices = self.find_range_indices(addresses)
+        loaded = indices >= 0
+
+        words = np.zeros(addresses.shape, dtype=np.uint16)
+        found = indices[loaded]
+        words[loaded] = self._flat[self._flat_offsets[found] + addresses[loaded] - self._starts[found]]
+        return words, loaded
+
+    def range_starting_at_address(self, target_address: int, length: int = 0, copy: bool = False) -> DataRange:
         """
         Return a range starting at the target address.
 
         Range is truncated to `length` if specified. If length is not specified,
         the remainder of the DataRange containing the target_address is
         returned.
+
+        When the request falls inside a single range the words are a read-only
+        view of it; only requests spanning several ranges allocate. Pass
+        `copy=True` for a writable array that does not alias the loaded data.
         """
+        try:
+            new_range = self._range_starting_at_address(target_address, length, copy)
+        except ValueError:
+            # A failed read still depends on the words it asked for.
+            self._log_reads(target_address, target_address + max(length, 1))
+            raise
+        self._log_reads(new_range.start_address, new_range.start_address + new_range.length)
+        return new_range
 
+    def _range_starting_at_address(self, target_address: int, length: int, copy: bool) -> DataRange:
         original_range = self._find_range(target_address)
         offset = target_address - original_range.start_address
         if length == 0:
             new_range = DataRange(
                 start_address=original_range.start_address + offset,
-                words=np.copy(original_range.words[offset:]),
+                words=_words_view(original_range.words[offset:], copy),
             )
 
         elif length > 0 and (offset + length) <= len(original_range.words):
             new_range = DataRange(
                 start_address=original_range.start_address + offset,
-                words=np.copy(original_range.words[offset : (offset + length)]),
+                words=_words_view(original_range.words[offset : (offset + length)], copy),
             )
         else:
             # The more difficult case, combining ranges
             new_word_list = []
-            new_word_list.append(np.copy(original_range.words[offset:]))
+            new_word_list.append(original_range.words[offset:])
             current_address = original_range.start_address + original_range.length
             target_end_address = target_address + length
             while current_address < target_end_address:
@@ -98,68 +240,524 @@ class DataRangeSet:
                                  next_range.start_address + next_range.length - current_address)
                 assert max_offset > 0, "max_offset should not be negative"
 
-                new_word_list.append(np.copy(next_range.words[:max_offset]))
+                new_word_list.append(next_range.words[:max_offset])
                 current_address += max_offset
 
             # print(new_word_list)
+            # The concatenated array is new, but it is handed out read-only
+            # like the views unless a copy was asked for.
+            words = np.concatenate(new_word_list)
+            words.flags.writeable = copy
             new_range = DataRange(
                 start_address=target_address,
-                words=np.concatenate(new_word_list),
+                words=words,
             )
 
         return new_range
 
 
+ADDRESS_SPACE = 1 << 20
+
+NOT_RELOADABLE = "Only an office loaded from track block files without lazy or coalesce can be reloaded"
+
+
+class MemoryImage:
+    """
+    A MemoryImage holds the whole 20-bit address space in one contiguous
+    uint16 array, with a mask marking which words were loaded from tape.
+    Slices are views into that array, so lookups at any address take constant
+    time and never stitch ranges together.
+    """
+
+    words: npt.NDArray[np.uint16]
+    loaded: npt.NDArray[np.bool_]
+    provenance: "Provenance | None" = None
+    read_log: list[tuple[int, int]] | None = None
+
+    def __init__(self, words: npt.NDArray[np.uint16], loaded: npt.NDArray[np.bool_]):
+        if len(words) != ADDRESS_SPACE or len(loaded) != ADDRESS_SPACE:
+            raise ValueError(f"MemoryImage requires {ADDRESS_SPACE:d} words and mask entries")
+        self.words = words
+        self.loaded = loaded
+        self._update_extents()
+
+    @classmethod
+    def from_range_set(cls, range_set: DataRangeSet) -> "MemoryImage":
+        words = np.zeros(ADDRESS_SPACE, dtype=np.uint16)
+        loaded = np.zeros(ADDRESS_SPACE, dtype=np.bool_)
+        for data_range in range_set.ranges:
+            end = data_range.start_address + data_range.length
+            words[data_range.start_address:end] = data_range.words
+            loaded[data_range.start_address:end] = True
+        image = cls(words, loaded)
+        image.provenance = range_set.provenance
+        return image
+
+    def replace_ranges(self, removed: list[DataRange], added: list[DataRange], provenance: "Provenance | None" = None):
+        """
+        Unload the `removed` ranges and load the `added` ones. A read-only
+        image, such as a mapped office image file, is copied into memory
+        first. If an added range overlaps loaded words, ValueError is raised
+        and the image is left unchanged.
+        """
+        loaded = self.loaded.copy()
+        for data_range in removed:
+            loaded[data_range.start_address:data_range.start_address + data_range.length] = False
+        for data_range in added:
+            end = data_range.start_address + data_range.length
+            if loaded[data_range.start_address:end].any():
+                raise ValueError(f"Range 0o{data_range.start_address:o}-0o{end:o} overlaps loaded data")
+            loaded[data_range.start_address:end] = True
+
+        if not self.words.flags.writeable:
+            self.words = np.array(self.words, dtype=np.uint16)
+        self.words[~loaded] = 0
+        for data_range in added:
+            self.words[data_range.start_address:data_range.start_address + data_range.length] = data_range.words
+        self.loaded = loaded
+        if provenance is not None:
+            self.provenance = provenance
+        self._update_extents()
+
+    def _update_extents(self):
+        """Find the maximal runs of loaded words."""
+        edges = np.flatnonzero(np.diff(self.loaded, prepend=False, append=False))
+        self._extent_starts = edges[0::2].tolist()
+        self._extent_ends = edges[1::2].tolist()
+
+    @property
+    def ranges(self) -> list[DataRange]:
+        """One DataRange view per contiguous loaded extent."""
+        return [DataRange(start_address=start, words=_words_view(self.words[start:end]))
+                for start, end in zip(self._extent_starts, self._extent_ends)]
+
+    def words_at(self, addresses: npt.ArrayLike) -> tuple[npt.NDArray[np.uint16], npt.NDArray[np.bool_]]:
+        """
+        Gather the words at an array of addresses. Returns the words and a mask
+        of which addresses are loaded; unloaded addresses read as zero.
+        """
+        addresses = np.asarray(addresses, dtype=np.int64)
+        if self.read_log is not None:
+            self.read_log.extend(address_spans(addresses))
+        in_space = (addresses >= 0) & (addresses < ADDRESS_SPACE)
+        safe_addresses = np.where(in_space, addresses, 0)
+        loaded = in_space & self.loaded[safe_addresses]
+        return np.where(loaded, self.words[safe_addresses], 0).astype(np.uint16), loaded
+
+    def range_starting_at_address(self, target_address: int, length: int = 0, copy: bool = False) -> DataRange:
+        """
+        Return a read-only view starting at the target address, or a writable
+        copy if `copy` is set.
+
+        If length is not specified, the remainder of the contiguous loaded
+        extent containing the target address is returned.
+        """
+        target_address = int(target_address)
+        try:
+            new_range = self._range_starting_at_address(target_address, length, copy)
+        except ValueError:
+            # A failed read still depends on the words it asked for.
+            self._log_reads(target_address, target_address + max(length, 1))
+            raise
+        self._log_reads(target_address, new_range.start_address + new_range.length)
+        return new_range
+
+    def _log_reads(self, start: int, end: int):
+        if self.read_log is not None:
+            self.read_log.append((start, end))
+
+    def _range_starting_at_address(self, target_address: int, length: int, copy: bool) -> DataRange:
+        if not (0 <= target_address < ADDRESS_SPACE) or not self.loaded[target_address]:
+            raise ValueError(f"Target address 0o{target_address:o} not found in data")
+
+        if length == 0:
+            n = bisect.bisect_right(self._extent_starts, target_address) - 1
+            end = self._extent_ends[n]
+        else:
+            end = target_address + length
+            if end > ADDRESS_SPACE:
+                raise ValueError(f"Range 0o{target_address:o}-0o{end:o} exceeds the 20-bit address space")
+            missing = np.flatnonzero(~self.loaded[target_address:end])
+            if len(missing) > 0:
+                raise ValueError(f"Range 0o{target_address:o}-0o{end:o} includes unloaded word "
+                                 f"0o{target_address + int(missing[0]):o}")
+
+        return DataRange(start_address=target_address, words=_words_view(self.words[target_address:end], copy))
+
+
+def address_spans(addresses: npt.ArrayLike) -> list[tuple[int, int]]:
+    """The (start, end) spans of runs of consecutive addresses, in address order."""
+    addresses = np.unique(np.asarray(addresses, dtype=np.int64))
+    if len(addresses) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(addresses) != 1)
+    starts = np.concatenate(([addresses[0]], addresses[breaks + 1]))
+    ends = np.concatenate((addresses[breaks], [addresses[-1]])) + 1
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def merge_spans(spans: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Merge overlapping and adjacent (start, end) spans, in address order."""
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def spans_overlap(a: list[tuple[int, int]], b: list[tuple[int, int]]) -> bool:
+    """Whether any span of `a` overlaps any span of `b`. Both must be merged spans."""
+    if not a or not b:
+        return False
+    starts = np.array([start for start, _ in a], dtype=np.int64)
+    ends = np.array([end for _, end in a], dtype=np.int64)
+    for start, end in b:
+        # The last span of `a` starting before `end` is the only one that can reach `start`.
+        n = np.searchsorted(starts, end) - 1
+        if n >= 0 and ends[n] > start:
+            return True
+    return False
+
+
 def twentybit(a: int, b: int) -> int:
     """
     Convert two words into a single 20-bit integer. The first word contains the
     high four bits, and the low 16 bits are in the second word.
     """
-    return ((a & 0xf) << 16) + b
+    return ((int(a) & 0xf) << 16) + int(b)
+
+@dataclass
+class BlockStatus:
+    block: int
+    stored_crc: int
+    computed_crc: int
+    # (start_address, length) of each range of words carried by the block
+    ranges: list[tuple[int, int]] = field(default_factory=list)
+
+    @property
+    def crc_ok(self) -> bool:
+        return self.stored_crc == self.computed_crc
+
+
+class CorruptBlockError(ValueError):
+    """Raised by a verifying load when block CRCs do not match."""
+
+    def __init__(self, blocks: list[BlockStatus]):
+        self.blocks = blocks
+        super().__init__("CRC mismatch in blocks " + ", ".join(str(status.block) for status in blocks))
+
+
+class Provenance:
+    """
+    Where each loaded address came from on tape. Holds one
+    (start_address, length, block, offset_in_block) entry per block fragment,
+    like the ranges of an office image header.
+    """
+
+    def __init__(self, fragments: list[tuple[int, int, int, int]]):
+        self.fragments = sorted(fragments)
+        columns = np.array(self.fragments, dtype=np.int64).reshape(-1, 4)
+        self._starts = columns[:, 0]
+        self._ends = columns[:, 0] + columns[:, 1]
+        self._blocks = columns[:, 2]
+        self._offsets = columns[:, 3]
+
+    def __len__(self):
+        return len(self.fragments)
+
+    def locate_many(self, addresses: npt.ArrayLike) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+        """
+        The block and offset in the block of each address, or -1 for both
+        where an address is not loaded.
+        """
+        addresses = np.asarray(addresses, dtype=np.int64)
+        blocks = np.full(addresses.shape, -1, dtype=np.int64)
+        offsets = np.full(addresses.shape, -1, dtype=np.int64)
+
+        n = np.searchsorted(self._starts, addresses, side="right") - 1
+        found = n >= 0
+        found[found] = addresses[found] < self._ends[n[found]]
+        blocks[found] = self._blocks[n[found]]
+        offsets[found] = self._offsets[n[found]] + addresses[found] - self._starts[n[found]]
+        return blocks, offsets
+
+    def locate(self, address: int) -> tuple[int, int]:
+        """The block and offset in the block of an address."""
+        blocks, offsets = self.locate_many([address])
+        if blocks[0] < 0:
+            raise ValueError(f"Address 0o{address:o} not found in data")
+        return int(blocks[0]), int(offsets[0])
+
+
+def coalesce_ranges(ranges: list[DataRange]) -> tuple[list[DataRange], int]:
+    """
+    Merge address-adjacent ranges into maximal contiguous extents, with one
+    concatenation per extent. Ranges that stand alone keep their words.
+    Returns the extents and the number of ranges merged away.
+    """
+    ranges = sorted((data_range for data_range in ranges if data_range.length > 0),
+                    key=lambda data_range: data_range.start_address)
+
+    extents = []
+    run = []
+    for data_range in ranges:
+        if run and data_range.start_address != run[-1].start_address + run[-1].length:
+            extents.append(run)
+            run = []
+        run.append(data_range)
+    if run:
+        extents.append(run)
+
+    merged = [run[0] if len(run) == 1 else
+              DataRange(run[0].start_address, np.concatenate([data_range.words for data_range in run]))
+              for run in extents]
+    return merged, len(ranges) - len(merged)
+
+
+def load_track(base_filename, start_block=0, end_block=358, verify=False, coalesce=False) -> DataRangeSet:
+    """
+    Load the ranges carried by a track's block files. With `verify`, every
+    block's CRC is checked and CorruptBlockError is raised, listing each
+    corrupt block and the ranges it carries, if any do not match.
 
-def load_track(base_filename, start_block=0, end_block=358) -> DataRangeSet:
+    With `coalesce`, adjacent ranges are merged into contiguous extents and
+    the set's `merged_fragments` counts the ranges merged away. Either way
+    the set's `provenance` maps addresses back to their block and offset.
+    """
 
     data_ranges = []
+    blocks = []
+    fragments_loaded = []
 
     for block_n in range(start_block, end_block):
-        filename = os.path.join(base_filename, "{:04d}.bin".format(block_n))
+        filename = block_filename(base_filename, block_n)
         try:
             block_data = load_block(filename)
         except FileNotFoundError:
             continue
 
-        next_header = 2
-        while(next_header < 828):
-            length = (block_data[next_header] & 0xfff0) >> 4
-            offset =  ((block_data[next_header] & 0xf) << 16) + block_data[next_header + 1]
-
-            new_range = DataRange(start_address=offset,
-                                  words=block_data[next_header+2:next_header+length + 2])
+        fragments = block_fragments(block_data)
+        blocks.append((block_n, block_data, fragments))
+        for start_address, length, offset_in_block in fragments:
+            new_range = DataRange(start_address=start_address,
+                                  words=block_data[offset_in_block:offset_in_block + length])
             data_ranges.append(new_range)
+            fragments_loaded.append((start_address, length, block_n, offset_in_block))
+
+    if verify:
+        computed_crcs = block_crcs([block_data for _, block_data, _ in blocks])
+        corrupt = [BlockStatus(block_n, int(block_data[-2]), computed_crc,
+                               [(start_address, length) for start_address, length, _ in fragments])
+                   for (block_n, block_data, fragments), computed_crc in zip(blocks, computed_crcs)
+                   if computed_crc != int(block_data[-2])]
+        if corrupt:
+            raise CorruptBlockError(corrupt)
+
+    provenance = Provenance(fragments_loaded)
+    if coalesce:
+        # Overlapping ranges are not merged, so they are still reported.
+        data_ranges, merged_fragments = coalesce_ranges(data_ranges)
+        return DataRangeSet(data_ranges, provenance=provenance, merged_fragments=merged_fragments)
+    return DataRangeSet(data_ranges, provenance=provenance)
+
+
+class LazyTrack(DataRangeSet):
+    """
+    A DataRangeSet over a track's block files that reads only the block
+    headers up front. A block's words are read the first time an address in
+    it is used, and at most `max_resident_blocks` blocks are kept, least
+    recently used first out. Ranges already handed out keep their block's
+    words alive.
+    """
+
+    def __init__(self, base_filename, start_block=0, end_block=358, max_resident_blocks=16):
+        self.base_filename = base_filename
+        self.max_resident_blocks = max_resident_blocks
+        self.blocks_read = 0
+        self._resident = OrderedDict()
+
+        fragments = []
+        for block_n in range(start_block, end_block):
+            try:
+                fd = os.open(block_filename(base_filename, block_n), os.O_RDONLY)
+            except FileNotFoundError:
+                continue
+            try:
+                fragments += [(start_address, length, block_n, offset_in_block)
+                              for start_address, length, offset_in_block in read_block_headers(fd)]
+            finally:
+                os.close(fd)
+
+        fragments.sort()
+        self._fragments = fragments
+        self.provenance = Provenance([(start_address, length, block_n, offset_in_block)
+                                      for start_address, length, block_n, offset_in_block in fragments])
+        self.merged_fragments = 0
+        self._starts = np.array([fragment[0] for fragment in fragments], dtype=np.int64)
+        self._ends = self._starts + np.array([fragment[1] for fragment in fragments], dtype=np.int64)
+        self._blocks = np.array([fragment[2] for fragment in fragments], dtype=np.int64)
+        self._offsets = np.array([fragment[3] for fragment in fragments], dtype=np.int64)
+        self._start_list = self._starts.tolist()
+        self._end_list = self._ends.tolist()
+        self._flat = None
+
+        collisions = self._find_overlaps()
+        if collisions:
+            raise ValueError("Overlapping ranges: " + ", ".join(f"{a} and {b}" for a, b in collisions))
+
+    def _block(self, block_n: int) -> npt.NDArray[np.uint16]:
+        if block_n in self._resident:
+            self._resident.move_to_end(block_n)
+            return self._resident[block_n]
+
+        block_data = load_block(block_filename(self.base_filename, block_n))
+        block_data.flags.writeable = False
+        self.blocks_read += 1
+        self._resident[block_n] = block_data
+        if len(self._resident) > self.max_resident_blocks:
+            self._resident.popitem(last=False)
+        return block_data
+
+    def replace_ranges(self, removed, added, provenance=None):
+        """A LazyTrack reads its ranges from the block files, so it cannot be reloaded in place."""
+        raise ValueError(NOT_RELOADABLE)
+
+    @property
+    def resident_blocks(self) -> list[int]:
+        return list(self._resident)
+
+    def _range(self, n: int) -> DataRange:
+        start_address, length, block_n, offset_in_block = self._fragments[n]
+        return DataRange(start_address, self._block(block_n)[offset_in_block:offset_in_block + length])
+
+    @property
+    def ranges(self) -> list[DataRange]:
+        """Every range, which reads every block."""
+        return [self._range(n) for n in range(len(self._fragments))]
+
+    def words_at(self, addresses: npt.ArrayLike) -> tuple[npt.NDArray[np.uint16], npt.NDArray[np.bool_]]:
+        """
+        Gather the words at an array of addresses, reading only the blocks
+        that hold them. Unloaded addresses read as zero.
+        """
+        addresses = np.asarray(addresses, dtype=np.int64)
+        self._log_addresses(addresses)
+        indices = self.find_range_indices(addresses)
+        loaded = indices >= 0
+
+        words = np.zeros(addresses.shape, dtype=np.uint16)
+        found = indices[loaded]
+        found_addresses = addresses[loaded]
+        found_words = np.zeros(len(found), dtype=np.uint16)
+        blocks = self._blocks[found]
+        for block_n in np.unique(blocks).tolist():
+            in_block = blocks == block_n
+            n = found[in_block]
+            found_words[in_block] = self._block(block_n)[self._offsets[n] + found_addresses[in_block] - self._starts[n]]
+        words[loaded] = found_words
+        return words, loaded
+
+
+def read_block_headers(fd: int) -> list[tuple[int, int, int]]:
+    """
+    Walk the headers of a tape block file, open as a file descriptor, without
+    reading the words between them. Returns (start_address, length,
+    offset_in_block) like `block_fragments`.
+    """
+    fragments = []
+
+    next_header = 2
+    while(next_header < 828):
+        header = os.pread(fd, 4, 2*next_header)
+        if len(header) < 4:
+            break
+        header_word, address_word = struct.unpack(">HH", header)
+        length = (header_word & 0xfff0) >> 4
+        if(length == 0):
+            break
+
+        fragments.append((twentybit(header_word, address_word), length, next_header + 2))
+
+        next_header += length + 2
 
-            next_header += length + 2
+    return fragments
 
-            if(length == 0):
-                break
 
-    return DataRangeSet(data_ranges)
+def block_filename(base_filename, block_n: int) -> str:
+    return os.path.join(base_filename, f"{block_n:04d}.bin")
 
 
-def load_block(filename: str):
-    f = open(filename, "rb")
+def block_fragments(block_data) -> list[tuple[int, int, int]]:
+    """
+    Walk the headers of a tape block and return (start_address, length,
+    offset_in_block) for each range of memory words it carries.
+    """
+    fragments = []
 
-    read_len = 50
-    words = []
-    while True:
-        data = f.read(2*read_len)
-        if(len(data) == 0):
+    next_header = 2
+    while(next_header < 828):
+        length = int(block_data[next_header] & 0xfff0) >> 4
+        start_address = twentybit(block_data[next_header], block_data[next_header + 1])
+        if(length == 0):
             break
-        successful_len = len(data)//2
 
-        new_words = struct.unpack(f'>{successful_len}H', data)
+        fragments.append((start_address, length, next_header + 2))
+
+        next_header += length + 2
+
+    return fragments
+
+
+def block_crc(block_data) -> int:
+    """
+    CRC-16/ARC of a tape block, computed over the little-endian words between
+    the first word and the stored CRC.
+
+    On a little-endian host the CRC reads the block's own buffer; only
+    big-endian arrays are byte swapped first.
+    """
+    words = np.ascontiguousarray(np.asarray(block_data)[1:-2], dtype="<u2")
+    return fastcrc.crc16.arc(memoryview(words).cast("B"))
+
+
+def block_crcs(blocks: list[npt.NDArray[np.uint16]]) -> list[int]:
+    """
+    CRCs of many blocks. Blocks of the same length are stacked and converted
+    to little-endian words in one operation; each CRC then reads a row of
+    that buffer.
+    """
+    crcs = [0] * len(blocks)
+    by_length = {}
+    for n, block_data in enumerate(blocks):
+        by_length.setdefault(len(block_data), []).append(n)
+
+    for indices in by_length.values():
+        words = np.ascontiguousarray(np.stack([blocks[n] for n in indices])[:, 1:-2], dtype="<u2")
+        for n, row in zip(indices, words):
+            crcs[n] = fastcrc.crc16.arc(memoryview(row).cast("B"))
+    return crcs
+
+
+def block_crc_ok(block_data) -> bool:
+    """Compare the computed CRC with the one stored in the block."""
+    return block_crc(block_data) == int(block_data[-2])
+
+
+def read_block(block_file) -> npt.NDArray[np.uint16]:
+    """
+    Read a whole tape block from an open binary file.
+
+    Tape words are stored big-endian; the block is read in one call and
+    converted once to a native uint16 array. A trailing odd byte is ignored.
+    """
+    data = block_file.read()
+    return np.frombuffer(data, dtype=">u2", count=len(data)//2).astype(np.uint16)
 
-        words.extend(new_words)
-    return np.array(words)
+def load_block(filename: str) -> npt.NDArray[np.uint16]:
+    with open(filename, "rb") as f:
+        return read_block(f)
 
 def print_data(target_address, block, length=5):
     offset = target_address - block.start_address
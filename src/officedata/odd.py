@@ -1,9 +1,18 @@
 
+from collections.abc import Sequence
 from dataclasses import dataclass
+from functools import cached_property
 
-from .image_tools import twentybit, load_track, DataRange, DataRangeSet, decode_dta, decode_scanpoint
+import numpy as np
+import numpy.typing as npt
 
-@dataclass
+from .bulk import decode_trunk_groups
+from .figures import (LINE_SUBTRANSLATOR_SCHEMA, SERVICE_GROUP_SCHEMA, SERVICE_MEMBER_LIST_HEADER_SCHEMA,
+                      TRUNK_GROUP_SCHEMA, TRUNK_MEMBER_SCHEMA, UNIV_SUBTRANSLATOR_SCHEMA)
+from .image_tools import DataRange, DataRangeSet, MemoryImage, decode_dta, decode_scanpoint, twentybit
+
+
+@dataclass(slots=True)
 class GRPTBL_entry:
     """Deprecated"""
     header: int
@@ -12,8 +21,8 @@ class GRPTBL_entry:
 
     @classmethod
     def parse_GRPTBL_entry(cls, words):
-        header = words[0]
-        n_entries = words[1] >> 4
+        header = int(words[0])
+        n_entries = int(words[1]) >> 4
         pointer = twentybit(words[1], words[2])
         return cls(header, n_entries, pointer)
 
@@ -25,7 +34,7 @@ class GRPTBL_entry:
                                                                self.n_entries,
                                                                self.pointer)
 
-@dataclass
+@dataclass(slots=True)
 class TRUNK_GROUP_entry:
     """Figure 12D"""
     grp_num: int
@@ -41,21 +50,16 @@ class TRUNK_GROUP_entry:
     def parse(cls, grp_num, dataRange):
         return cls.parse_TRUNK_GROUP_entry(grp_num, dataRange.words, dataRange.start_address)
 
+    @classmethod
+    def parse_table(cls, groups) -> list["TRUNK_GROUP_entry"]:
+        """Build entries from the structured array made by `bulk.decode_trunk_groups`."""
+        return [cls(*row) for row in groups.tolist()]
+
     @classmethod
     def parse_TRUNK_GROUP_entry(cls, grp_num, words, memory_address):
-        if len(words) < 4:
-            raise ValueError(f"TRUNK_GROUP_entry requires 4 words; only {len(words):d} provided.")
-        mbr = words[0] & 2**8 > 0
-        exists = words[0] & 2**7 > 0
-        highest_member = words[0] & 0x7f
-        sel_status_block_index = words[1] & 0x3fff
-        member_list_index = words[2] & 0x3fff
-        circuit_code = words[3] & 0x1f
-        memory_address = memory_address
-        return cls(grp_num, mbr, exists, highest_member, sel_status_block_index, member_list_index,
-                   circuit_code, memory_address)
+        return cls(grp_num, *TRUNK_GROUP_SCHEMA.decode(words), int(memory_address))
 
-@dataclass
+@dataclass(slots=True)
 class SERVICE_GROUP_entry:
     """Individual entry on Figure 12C"""
     grp_num: int
@@ -66,29 +70,25 @@ class SERVICE_GROUP_entry:
     member_list_index: int
     circuit_code: int
     memory_address: int
-    data: DataRange
+    words: tuple[int, int, int, int]
 
     @classmethod
     def parse(cls, grp_num, data):
         return cls.parse_SERVICE_GROUP_entry(grp_num, data.words, data.start_address, data)
 
+    @property
+    def data(self) -> DataRange:
+        """The entry's four words. The entry keeps them as ints, not a view of the loaded data."""
+        return DataRange(self.memory_address, np.array(self.words, dtype=np.uint16))
+
     @classmethod
     def parse_SERVICE_GROUP_entry(cls, grp_num, words, memory_address, data):
-        if len(data.words) < 4:
-            raise ValueError(f"SERVICE_GROUP_entry requires 4 words; only {len(data.words):d} provided.")
-        mbr = words[0] & 2**8 > 0
-        exists = words[0] & 2**7 > 0
-        highest_member = words[0] & 0x7f
-        sel_status_block_index = words[1] & 0x3fff
-        member_list_index = words[2] & 0x3fff
-        circuit_code = words[3] & 0x1f
-        memory_address = memory_address
-        return cls(grp_num, mbr, exists, int(highest_member), int(sel_status_block_index), int(member_list_index),
-                   int(circuit_code), int(memory_address), data=data)
+        fields = SERVICE_GROUP_SCHEMA.decode(words)
+        return cls(grp_num, *fields, int(memory_address), words=tuple(int(word) for word in words[:4]))
 
     def __repr__(self):
         return (f"SERVICE_GROUP_entry(grp_num={self.grp_num}, mbr={self.mbr}, exists={self.exists}, highest_member={self.highest_member}, "
-                f"circuit_code={self.circuit_code:d} address={self.data.start_address:o} word0=0o{self.data.words[0]:o})")
+                f"circuit_code={self.circuit_code:d} address={self.memory_address:o} word0=0o{self.words[0]:o})")
 
 
 @dataclass
@@ -98,9 +98,9 @@ class SERVICE_GROUP_TABLE:
     range: DataRange
     table_address: int
     group_count: int
-    groups: list[SERVICE_GROUP_entry]
+    groups: "list[SERVICE_GROUP_entry] | LazyEntryList"
 
-@dataclass
+@dataclass(slots=True)
 class TRUNK_CIRCUIT_MEMBER_LIST_entry:
     spn: int
     ckt_code: int
@@ -108,12 +108,9 @@ class TRUNK_CIRCUIT_MEMBER_LIST_entry:
 
     @classmethod
     def parse_TRUNK_GROUP_entry(cls, words):
-        spn = words[0] & 0x1fff
-        ckt_code = words[1] >> 11
-        dta = words[1] & 0x7ff
-        return cls(spn, ckt_code, dta)
+        return cls(*TRUNK_MEMBER_SCHEMA.decode(words))
 
-@dataclass
+@dataclass(slots=True)
 class SERVICE_GROUP:
 
     group_n: int
@@ -125,9 +122,7 @@ class SERVICE_GROUP:
 
     @classmethod
     def parse(cls, group_n: int, data: DataRange):
-        n_members = (data.words[0] >> 7) & 0x7f
-        n_spares = data.words[0] & 0x7f
-        group_format = data.words[0] >> 14
+        group_format, n_members, n_spares = SERVICE_MEMBER_LIST_HEADER_SCHEMA.decode(data.words)
         entries = []
         for member_index in range(0, n_members + n_spares):
             member_address = data.start_address + member_index//2 + 1
@@ -144,9 +139,63 @@ class SERVICE_GROUP:
         print(f"Header byte: 0o{self.data.words[0]:o}")
 
 
+class LazyEntryList(Sequence):
+    """
+    A read-only list of group table entries that decodes each entry on first
+    access and keeps it. Its length and iteration do not require decoding
+    the entries that are never reached.
+    """
+
+    def __init__(self, entry_class, range_set: DataRangeSet | MemoryImage, table_address: int, count: int,
+                 stride: int, first_group: int):
+        self.entry_class = entry_class
+        self.range_set = range_set
+        self.table_address = table_address
+        self.stride = stride
+        self.first_group = first_group
+        self._count = count
+        self._entries = {}
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[n] for n in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("LazyEntryList index out of range")
+
+        if index not in self._entries:
+            data = self.range_set.range_starting_at_address(self.table_address + self.stride*index, self.stride)
+            self._entries[index] = self.entry_class.parse(self.first_group + index, data)
+        return self._entries[index]
+
+    @property
+    def decoded_count(self) -> int:
+        """Number of entries decoded so far."""
+        return len(self._entries)
+
+    def __eq__(self, other):
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"LazyEntryList({self.entry_class.__name__}, {self.decoded_count}/{self._count} decoded)"
+
+
+def _entry_by_group(entries, grp_num: int, first_group: int):
+    index = grp_num - first_group
+    if not 0 <= index < len(entries):
+        raise ValueError(f"Group {grp_num} not in table of {len(entries)} groups starting at {first_group}")
+    return entries[index]
+
+
 @dataclass
 class GRPTBL:
-    range_set: DataRangeSet
+    range_set: DataRangeSet | MemoryImage
     pbx_table_address: int
     pbx_table_entry_count: int
     pbx_table_entries: list   #unused
@@ -155,16 +204,21 @@ class GRPTBL:
 
     trunk_table_low_address: int
     trunk_table_low_entry_count: int
-    trunk_table_low_entries: list[TRUNK_GROUP_entry]
+    trunk_table_low_entries: list[TRUNK_GROUP_entry] | LazyEntryList
 
     trunk_table_high_address: int
     trunk_table_high_entry_count: int
-    trunk_table_high_entries: list[TRUNK_GROUP_entry]
+    trunk_table_high_entries: list[TRUNK_GROUP_entry] | LazyEntryList
 
     @classmethod
-    def parse(cls, grptbl_address, range_set: DataRangeSet):
+    def parse(cls, grptbl_address, range_set: DataRangeSet | MemoryImage, lazy: bool = False):
         """Parse the GRPTBL.
-        This contains pointers to tables that could be in other areas of memory, so a DataRangeSet is required.
+        This contains pointers to tables that could be in other areas of memory, so a DataRangeSet or
+        MemoryImage is required.
+
+        With `lazy`, only the table headers are decoded. The service and trunk
+        group lists are then LazyEntryLists, which decode each group on first
+        access.
         """
 
         # grptbl_entry_pbx = GRPTBL_entry.parse_GRPTBL_entry(grptable_data.words)
@@ -173,7 +227,7 @@ class GRPTBL:
         # grptbl_entry_trunks_high = GRPTBL_entry.parse_GRPTBL_entry(grptable_data.words[9:])
 
         def parse_entry(dataRange):
-            n_entries = dataRange.words[1] >> 4
+            n_entries = int(dataRange.words[1]) >> 4
             pointer = twentybit(dataRange.words[1], dataRange.words[2])
             return pointer, n_entries
 
@@ -185,37 +239,27 @@ class GRPTBL:
         table_range = range_set.range_starting_at_address(grptbl_address)
 
         svc_table_address, svc_table_entry_count = parse_entry(table_range.subset(3,3))
-        svc_table_groups = []
-        for n in range(0, svc_table_entry_count):
-            group_number = 64 + n
-            pointer = svc_table_address + (4*n)
-            svc_data_range = range_set.range_starting_at_address(pointer, 4)
-            group = SERVICE_GROUP_entry.parse(group_number, svc_data_range)
-            svc_table_groups.append(group)
+        trunk_table_low_address, trunk_table_low_entry_count = parse_entry(table_range.subset(6,3))
+        trunk_table_high_address, trunk_table_high_entry_count = parse_entry(table_range.subset(9,3))
+
+        if lazy:
+            svc_table_groups = LazyEntryList(SERVICE_GROUP_entry, range_set, svc_table_address,
+                                             svc_table_entry_count, 4, 64)
+            trunk_table_low_entries = LazyEntryList(TRUNK_GROUP_entry, range_set, trunk_table_low_address,
+                                                    trunk_table_low_entry_count, 8, 128)
+            trunk_table_high_entries = LazyEntryList(TRUNK_GROUP_entry, range_set, trunk_table_high_address,
+                                                     trunk_table_high_entry_count, 8, 128)
+        else:
+            svc_table_groups, trunk_table_low_entries, trunk_table_high_entries = cls._parse_groups(
+                range_set, svc_table_address, svc_table_entry_count,
+                trunk_table_low_address, trunk_table_low_entry_count,
+                trunk_table_high_address, trunk_table_high_entry_count)
 
         svc_table = SERVICE_GROUP_TABLE(range=range_set.range_starting_at_address(svc_table_address),
                                         table_address=svc_table_address,
                                         group_count=svc_table_entry_count,
                                         groups=svc_table_groups)
 
-        trunk_table_low_address, trunk_table_low_entry_count = parse_entry(table_range.subset(6,3))
-        trunk_table_low_entries = []
-        for n in range(0, trunk_table_low_entry_count):
-            group_number = 128 + n
-            pointer = trunk_table_low_address + (8*n)
-            trunk_data_range = range_set.range_starting_at_address(pointer, 8)
-            group_entry = TRUNK_GROUP_entry.parse(group_number, trunk_data_range)
-            trunk_table_low_entries.append(group_entry)
-
-        trunk_table_high_address, trunk_table_high_entry_count = parse_entry(table_range.subset(9,3))
-        trunk_table_high_entries = []
-        for n in range(0, trunk_table_high_entry_count):
-            group_number = 128 + n
-            pointer = trunk_table_high_address + (8*n)
-            trunk_data_range = range_set.range_starting_at_address(pointer, 8)
-            group_entry = TRUNK_GROUP_entry.parse(group_number, trunk_data_range)
-            trunk_table_high_entries.append(group_entry)
-
         return cls(range_set=range_set,
                    pbx_table_address=0,
                    pbx_table_entry_count=0,
@@ -229,14 +273,79 @@ class GRPTBL:
                    trunk_table_high_entries=trunk_table_high_entries
         )
 
+    @staticmethod
+    def _parse_groups(range_set, svc_table_address, svc_table_entry_count,
+                      trunk_table_low_address, trunk_table_low_entry_count,
+                      trunk_table_high_address, trunk_table_high_entry_count):
+        """Decode every service and trunk group entry."""
+        svc_table_groups = []
+        for n in range(svc_table_entry_count):
+            group_number = 64 + n
+            pointer = svc_table_address + (4*n)
+            svc_data_range = range_set.range_starting_at_address(pointer, 4)
+            group = SERVICE_GROUP_entry.parse(group_number, svc_data_range)
+            svc_table_groups.append(group)
+
+        # The trunk tables are decoded as (N, 8) views of the table words.
+        trunk_table_low_entries = TRUNK_GROUP_entry.parse_table(
+            decode_trunk_groups(range_set, trunk_table_low_address, trunk_table_low_entry_count, 128))
+
+        trunk_table_high_entries = TRUNK_GROUP_entry.parse_table(
+            decode_trunk_groups(range_set, trunk_table_high_address, trunk_table_high_entry_count, 128))
+
+        return svc_table_groups, trunk_table_low_entries, trunk_table_high_entries
+
+    def service_group(self, grp_num: int) -> SERVICE_GROUP_entry:
+        """Look up a service group entry by group number."""
+        return _entry_by_group(self.svc_table.groups, grp_num, 64)
+
+    def trunk_group(self, grp_num: int, table: str = "low") -> TRUNK_GROUP_entry:
+        """Look up a trunk group entry by group number in the low or high trunk table."""
+        if table not in ("low", "high"):
+            raise ValueError(f"Unknown trunk table {table}")
+        entries = self.trunk_table_low_entries if table == "low" else self.trunk_table_high_entries
+        return _entry_by_group(entries, grp_num, 128)
+
+
+# The master table index is not found from the office data: nothing in the
+# loaded blocks is known to point to it, so its address is the one fixed
+# address the crawler starts from. It is where the GRPTBL was previously
+# assumed to be, as the GRPTBL is the index's first run of slots.
+MASTER_TABLE_ADDRESS = 0o421410
+MASTER_TABLE_SLOTS = 10
+# Slots of the master table index at which each table's entries start. The
+# layout is fixed by the office data format; everything else is found by
+# following the pointers in these slots (see crawl.py).
+GRPTBL_SLOT = 0
+MEMLST_SLOT = 4
+SPTBL_SLOT = 9
+
 
 @dataclass
 class MASTER_TABLE_INDEX:
-    """These are mostly fixed values"""
-    pass
+    """
+    The master table index is at a fixed address, MASTER_TABLE_ADDRESS unless
+    another is given, and holds three word GRPTBL_entry-style headers. The GRPTBL (four entries), MEMLST (four
+    entries) and SPTBL (one entry) are runs of these slots, so a table's
+    address is the address of its first slot.
+    """
+    address: int
+    entries: list[GRPTBL_entry]
+
+    @classmethod
+    def parse(cls, range_set: DataRangeSet | MemoryImage, address: int = MASTER_TABLE_ADDRESS,
+              n_slots: int = MASTER_TABLE_SLOTS):
+        words = range_set.range_starting_at_address(address, 3 * n_slots).words
+        return cls(address=address,
+                   entries=[GRPTBL_entry.parse_GRPTBL_entry(words[3 * n:3 * n + 3]) for n in range(n_slots)])
 
+    def slot_address(self, slot: int) -> int:
+        if not 0 <= slot < len(self.entries):
+            raise ValueError(f"Master table index has no slot {slot}")
+        return self.address + 3 * slot
 
-@dataclass
+
+@dataclass(slots=True)
 class MEMLIST_SVC_MEMBER:
     """Individual entry on Figure 15C"""
     scanpoint: int = 0
@@ -247,7 +356,7 @@ class MEMLIST_SVC_MEMBER:
     def __repr__(self):
         return f"MEMLIST_SVC_MEMBER(scanpoint={self.scanpoint:d}, cktcode={self.cktcode:d}, dta={decode_dta(self.dta)}, ten=0o{self.ten:o})"
 
-@dataclass
+@dataclass(slots=True)
 class MEMLST_SVC_GROUP:
     """Figure 15C"""
     n_members: int
@@ -259,22 +368,20 @@ class MEMLST_SVC_GROUP:
 
     @classmethod
     def parse(cls, highest_mem: int, data: DataRange):
-        n_members = (data.words[0] >> 7) & 0x7f
-        n_spares = data.words[0] & 0x7f
-        group_format = data.words[0] >> 14
+        group_format, n_members, n_spares = SERVICE_MEMBER_LIST_HEADER_SCHEMA.decode(data.words)
 
         members = []
 
         if group_format == 1:
             for n in range(0, n_members):
-                ten = data.words[n + 1] & 0xfff
+                ten = int(data.words[n + 1] & 0xfff)
                 members.append(MEMLIST_SVC_MEMBER(ten=ten))
 
         elif group_format == 2:
             for n in range(0, n_members):
-                scanpoint = data.words[n//2 + 1] & 0xff if n % 2 == 0 else data.words[n//2 + 1] >> 8
-                dta = data.words[n + 1 + (highest_mem + 1)//2] & 0x7ff
-                cktcode = data.words[n + 1 + (highest_mem + 1)//2] >> 11
+                scanpoint = int(data.words[n//2 + 1] & 0xff if n % 2 == 0 else data.words[n//2 + 1] >> 8)
+                dta = int(data.words[n + 1 + (highest_mem + 1)//2] & 0x7ff)
+                cktcode = int(data.words[n + 1 + (highest_mem + 1)//2] >> 11)
                 members.append(MEMLIST_SVC_MEMBER(scanpoint=scanpoint, dta=dta, cktcode=cktcode))
 
         return cls(n_members=n_members, n_spares=n_spares, group_format=group_format, members=members, address=data.start_address)
@@ -284,7 +391,7 @@ class MEMLST_SVC_GROUP:
                 f"group_format={self.group_format:d}, address=0o{self.address:o} members=[{len(self.members)} entries])")
 
 
-@dataclass
+@dataclass(slots=True)
 class MEMLST_entry:
     """Figure 15A"""
     header: int
@@ -294,8 +401,8 @@ class MEMLST_entry:
 
     @classmethod
     def parse(cls, dataRange):
-        header = dataRange.words[0]
-        max_words = dataRange.words[1] >> 4
+        header = int(dataRange.words[0])
+        max_words = int(dataRange.words[1]) >> 4
         address = twentybit(dataRange.words[1], dataRange.words[2])
         return cls(header=header, member_list_words_minus_one=max_words, member_list_address=address, data=dataRange)
 
@@ -320,7 +427,7 @@ class MEMLST:
                    memlist_trunks_low=memlist_trunks_low,
                    memlist_trunks_high=memlist_trunks_high)
 
-@dataclass
+@dataclass(slots=True)
 class UNIV_SUBTRANSLATOR:
     address: int
     u_type: int
@@ -333,32 +440,14 @@ class UNIV_SUBTRANSLATOR:
 
     @classmethod
     def parse(cls, data: DataRange):
-        address = data.start_address
-        u_type = data.words[0] >> 13
-
-        match u_type:
-            case 1 | 2:
-                ten = data.words[0] & 0x1ff
-                grp_number = data.words[1] & 0xff
-                mem_number = data.words[1] >> 8
-                return cls(address=address, u_type=u_type, ten=ten, grp_number=grp_number, mem_number=mem_number)
-
-            case 3:
-                tone_scanpoint = data.words[0] & 0x1ff
-                return cls(address=address, u_type=u_type, tone_scanpoint=tone_scanpoint)
-
-            case 4:
-                supv_scanpoint = data.words[0] & 0x1ff
-                return cls(address=address, u_type=u_type, supv_scanpoint=supv_scanpoint)
-
-            case _:
-                return cls(address=address, u_type=u_type)
+        # Fields not used by the entry's u_type decode as None.
+        return cls(data.start_address, *UNIV_SUBTRANSLATOR_SCHEMA.decode(data.words))
 
-@dataclass
+@dataclass(slots=True)
 class LINE_SUBTRANSLATOR:
     address: int
     u_type: int
-    data: DataRange
+    words: tuple[int, int]
     terminal: int | None = None
     group: int | None = None
     scanpoint: tuple[int, int, int] | None = None
@@ -366,40 +455,105 @@ class LINE_SUBTRANSLATOR:
     @classmethod
     def parse(cls, data: DataRange):
         address = data.start_address
-        u_type = data.words[0] >> 12
+        u_type, terminal, group, scanpoint = LINE_SUBTRANSLATOR_SCHEMA.decode(data.words)
+        if scanpoint is not None:
+            scanpoint = decode_scanpoint(scanpoint)
+        return cls(address=address, u_type=u_type, words=(int(data.words[0]), int(data.words[1])),
+                   terminal=terminal, group=group, scanpoint=scanpoint)
 
-        match u_type:
-            case 10:
-                scanpoint = data.words[1] & 0xfff
-                return cls(address=address, u_type=u_type, data=data, scanpoint=decode_scanpoint(scanpoint))
-
-            case 11:
-                terminal = data.words[1] >> 8
-                group = data.words[1] & 0xff
-                return cls(address=address, u_type=u_type, data=data, terminal=terminal, group=group)
-
-            case _:
-                return cls(address=address, u_type=u_type, data=data)
+    @property
+    def data(self) -> DataRange:
+        """The entry's two words. The entry keeps them as ints, not a view of the loaded data."""
+        return DataRange(self.address, np.array(self.words, dtype=np.uint16))
 
     def __repr__(self):
         if self.terminal and self.group:
             return (f"LINE_SUBTRANSLATOR(address=0o{self.address:o}, u_type={self.u_type:d}, terminal={self.terminal:d}, "
-                f"group={self.group:d}, scanpoint={self.scanpoint}, data=[0o{self.data.words[0]:o}, 0o{self.data.words[1]:o}]")
+                f"group={self.group:d}, scanpoint={self.scanpoint}, data=[0o{self.words[0]:o}, 0o{self.words[1]:o}]")
         else:
             return (f"LINE_SUBTRANSLATOR(address=0o{self.address:o}, u_type={self.u_type:d}, terminal={self.terminal}, "
-                f"group={self.group}, scanpoint={self.scanpoint}, data=[0o{self.data.words[0]:o}, 0o{self.data.words[1]:o}]")
+                f"group={self.group}, scanpoint={self.scanpoint}, data=[0o{self.words[0]:o}, 0o{self.words[1]:o}]")
+
+@dataclass(slots=True)
+class MISC_SUBTRANSLATOR:
+    """
+    Miscellaneous subtranslator entry (Figure 2C). These entries are one word
+    each; their layout is not decoded yet, so the raw word is kept.
+    """
+    address: int
+    word: int
+
+    @classmethod
+    def parse(cls, data: DataRange):
+        return cls(address=data.start_address, word=int(data.words[0]))
+
+    def __repr__(self):
+        return f"MISC_SUBTRANSLATOR(address=0o{self.address:o}, word=0o{self.word:o})"
+
+@dataclass
+class SUBTRANSLATOR_COLUMNS:
+    """
+    Columnar result of a bulk SPN_HEAD_TABLE lookup, one element per requested
+    point. Fields that do not apply to an entry's subtranslator and u_type are
+    -1. `loaded` is False for unassigned entries and for entries whose words
+    are not in the loaded data.
+    """
+    w_index: npt.NDArray[np.int64]
+    x_index: npt.NDArray[np.int64]
+    sub_type: npt.NDArray[np.int64]
+    address: npt.NDArray[np.int64]
+    loaded: npt.NDArray[np.bool_]
+    word0: npt.NDArray[np.int64]
+    word1: npt.NDArray[np.int64]
+    u_type: npt.NDArray[np.int64]
+    # Universal subtranslator (Figure 2A)
+    ten: npt.NDArray[np.int64]
+    grp_number: npt.NDArray[np.int64]
+    mem_number: npt.NDArray[np.int64]
+    tone_scanpoint: npt.NDArray[np.int64]
+    supv_scanpoint: npt.NDArray[np.int64]
+    # Line subtranslator (Figure 2B)
+    terminal: npt.NDArray[np.int64]
+    group: npt.NDArray[np.int64]
+    scanpoint: npt.NDArray[np.int64]
+
+    def __len__(self):
+        return len(self.w_index)
+
+
+# Words in the SPN head table, one per head table (W) index
+SPN_HEAD_WORDS = 127
+
 
 @dataclass
 class SPN_HEAD_TABLE:
-    data: DataRangeSet
+    data: DataRangeSet | MemoryImage
     table_address: int
 
+    @cached_property
+    def head(self) -> npt.NDArray[np.uint16]:
+        """The 127 head table words, fetched once."""
+        return self.data.range_starting_at_address(self.table_address, SPN_HEAD_WORDS, copy=True).words
+
+    def load(self) -> "SPN_HEAD_TABLE":
+        """Fetch the head table words now, rather than on the first lookup."""
+        _ = self.head
+        return self
+
+    @cached_property
+    def store_increments(self) -> npt.NDArray[np.int64]:
+        return (self.head & 0x3ff).astype(np.int64)
+
+    @cached_property
+    def sub_types(self) -> npt.NDArray[np.int64]:
+        return (self.head >> 14).astype(np.int64)
+
     def lookup_scanpoint(self, scanner: int, row: int, col: int):
         w_index = (scanner << 3) | (row >> 2)
         x_index = ((row & 0b11) << 4) | col
         return self._lookup_entry(w_index, x_index)
 
-    def lookup_oe(self, oe: str) -> LINE_SUBTRANSLATOR | UNIV_SUBTRANSLATOR:
+    def lookup_oe(self, oe: str) -> LINE_SUBTRANSLATOR | UNIV_SUBTRANSLATOR | MISC_SUBTRANSLATOR:
         """This OE is the concatenated string,
          [2 digit Concentrator Group][Concentrator][Switch Group][Switch][Level]
          Where all the other fields are one octal digit.
@@ -412,11 +566,92 @@ class SPN_HEAD_TABLE:
         # XXX: This minus one offset isn't documented.
         return self._lookup_entry(oe_int >> 6, (oe_int & 0x3f) - 0)
 
-    def lookup_ten(self, ten: str) -> LINE_SUBTRANSLATOR | UNIV_SUBTRANSLATOR:
+    def lookup_ten(self, ten: str) -> LINE_SUBTRANSLATOR | UNIV_SUBTRANSLATOR | MISC_SUBTRANSLATOR:
 
         ten_int = self._ten_string_to_number(ten)
         return self._lookup_entry(ten_int >>6, (ten_int & 0x3f) - 0)
 
+    def lookup_scanpoint_many(self, scanner: npt.ArrayLike, row: npt.ArrayLike, col: npt.ArrayLike) -> SUBTRANSLATOR_COLUMNS:
+        """Bulk `lookup_scanpoint` over arrays of scanner, row and column numbers."""
+        scanner = np.asarray(scanner, dtype=np.int64)
+        row = np.asarray(row, dtype=np.int64)
+        col = np.asarray(col, dtype=np.int64)
+        return self.lookup_entries_many((scanner << 3) | (row >> 2), ((row & 0b11) << 4) | col)
+
+    def lookup_oe_many(self, oes) -> SUBTRANSLATOR_COLUMNS:
+        """
+        Bulk `lookup_oe`. OEs are six digit octal strings, or the integers
+        those strings denote (e.g. 0o010016).
+        """
+        return self.lookup_entries_many(*self.oe_indices(oes))
+
+    def lookup_ten_many(self, tens) -> SUBTRANSLATOR_COLUMNS:
+        """Bulk `lookup_ten`, taking strings or integers like `lookup_oe_many`."""
+        return self.lookup_entries_many(*self.ten_indices(tens))
+
+    @classmethod
+    def oe_indices(cls, oes) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+        """The head table (W) and subtranslator (X) indexes of OEs, as `lookup_oe_many` uses them."""
+        cg, c, sg, sw, lv = cls._split_digits(oes, "OE")
+        oe_int = (cg << 9) | (c << 8) | (sg << 6) | (sw << 3) | lv
+        return oe_int >> 6, oe_int & 0x3f
+
+    @classmethod
+    def ten_indices(cls, tens) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+        """The head table (W) and subtranslator (X) indexes of TENs, like `oe_indices`."""
+        cg, c, sg, sw, lv = cls._split_digits(tens, "TEN")
+        ten_int = (cg << 9) | (sg << 7) | (c << 6) | (sw << 3) | lv
+        return ten_int >> 6, ten_int & 0x3f
+
+    def enumerate_entries(self, include_unassigned: bool = False) -> SUBTRANSLATOR_COLUMNS:
+        """
+        Decode every subtranslator slot of every assigned head table word in
+        one `lookup_entries_many` call, in W then X order. With
+        `include_unassigned`, unassigned head table words are listed too.
+        """
+        w_index = np.arange(len(self.head), dtype=np.int64)
+        if not include_unassigned:
+            w_index = w_index[self.sub_types != 0]
+        return self.lookup_entries_many(np.repeat(w_index, 64), np.tile(np.arange(64, dtype=np.int64), len(w_index)))
+
+    @staticmethod
+    def oe_numbers(w_index: npt.ArrayLike, x_index: npt.ArrayLike) -> npt.NDArray[np.int64]:
+        """
+        The OE of each head table and subtranslator index, as the integer its
+        six octal digit string denotes (inverse of `lookup_oe_many`).
+        """
+        oe_int = (np.asarray(w_index, dtype=np.int64) << 6) | np.asarray(x_index, dtype=np.int64)
+        cg, c, sg = oe_int >> 9, (oe_int >> 8) & 1, (oe_int >> 6) & 3
+        return (cg << 12) | (c << 9) | (sg << 6) | (oe_int & 0x3f)
+
+    @staticmethod
+    def ten_numbers(w_index: npt.ArrayLike, x_index: npt.ArrayLike) -> npt.NDArray[np.int64]:
+        """The TEN of each head table and subtranslator index, like `oe_numbers`."""
+        ten_int = (np.asarray(w_index, dtype=np.int64) << 6) | np.asarray(x_index, dtype=np.int64)
+        cg, sg, c = ten_int >> 9, (ten_int >> 7) & 3, (ten_int >> 6) & 1
+        return (cg << 12) | (c << 9) | (sg << 6) | (ten_int & 0x3f)
+
+    @staticmethod
+    def scanpoint_numbers(w_index: npt.ArrayLike, x_index: npt.ArrayLike) -> tuple[npt.NDArray[np.int64], ...]:
+        """The (scanner, row, column) of each index (inverse of `lookup_scanpoint_many`)."""
+        w_index = np.asarray(w_index, dtype=np.int64)
+        x_index = np.asarray(x_index, dtype=np.int64)
+        return w_index >> 3, ((w_index & 7) << 2) | (x_index >> 4), x_index & 0xf
+
+    @staticmethod
+    def _split_digits(numbers, name: str) -> tuple[npt.NDArray[np.int64], ...]:
+        """Split six octal digit numbers into the 2-1-1-1-1 digit fields."""
+        numbers = np.asarray(numbers)
+        if numbers.dtype.kind in "UO":
+            strings = numbers.ravel().tolist()
+            if any(len(number) != 6 for number in strings):
+                raise ValueError(f"{name} must be a six digit string")
+            numbers = np.array([int(number, base=8) for number in strings], dtype=np.int64).reshape(numbers.shape)
+        numbers = numbers.astype(np.int64)
+        if ((numbers < 0) | (numbers > 0o777777)).any():
+            raise ValueError(f"{name} must be six octal digits")
+        return numbers >> 12, (numbers >> 9) & 7, (numbers >> 6) & 7, (numbers >> 3) & 7, numbers & 7
+
     @staticmethod
     def _oe_string_to_number(oe: str) -> int:
         if len(oe) != 6:
@@ -439,14 +674,14 @@ class SPN_HEAD_TABLE:
         lv = int(ten[5], base=8)
         return (cg << 9) | (sg << 7) | (c << 6) | (sw << 3) | lv
 
-    def _lookup_entry(self, w_index: int, x_index: int) -> LINE_SUBTRANSLATOR | UNIV_SUBTRANSLATOR:
+    def _lookup_entry(self, w_index: int, x_index: int) -> LINE_SUBTRANSLATOR | UNIV_SUBTRANSLATOR | MISC_SUBTRANSLATOR:
         """
         Misc subtranslator is indexed differently from Line and Univeral subtranslators"""
 
-        entry = self.data.range_starting_at_address(self.table_address, 127).words[w_index]
-
-        store_increment = entry & 0x3ff
-        sub_type = entry >> 14
+        if not 0 <= w_index < SPN_HEAD_WORDS:
+            raise ValueError(f"Head table index must be below {SPN_HEAD_WORDS:d}")
+        store_increment = int(self.store_increments[w_index])
+        sub_type = int(self.sub_types[w_index])
 
         if sub_type == 1:
             # Misc subtranslator
@@ -458,7 +693,7 @@ class SPN_HEAD_TABLE:
             case 0:
                 raise ValueError(f"Unassigned subtranslator type {sub_type}")
             case 1:
-                raise NotImplementedError("Miscelaneous subtranslator not implemented")
+                return MISC_SUBTRANSLATOR.parse(subtranslator_entry)
             case 2:
                 return UNIV_SUBTRANSLATOR.parse(subtranslator_entry)
             case 3:
@@ -466,6 +701,58 @@ class SPN_HEAD_TABLE:
             case _:
                 raise ValueError(f"Unknown subtranslator type {sub_type}")
 
+    def lookup_entries_many(self, w_index: npt.ArrayLike, x_index: npt.ArrayLike) -> SUBTRANSLATOR_COLUMNS:
+        """
+        Vectorized `_lookup_entry`: decode the subtranslator entries for arrays
+        of head table (W) and subtranslator (X) indexes with numpy gathers.
+        """
+        w_index = np.asarray(w_index, dtype=np.int64)
+        x_index = np.asarray(x_index, dtype=np.int64)
+        if ((w_index < 0) | (w_index >= len(self.head))).any():
+            raise ValueError(f"Head table index must be below {len(self.head):d}")
+
+        sub_type = self.sub_types[w_index]
+        base = self.table_address + w_index + self.store_increments[w_index]
+        # Misc subtranslators have one word per entry, the others two.
+        address = np.where(sub_type == 1, base + x_index, base + 2*x_index)
+        address = np.where(sub_type == 0, -1, address)
+
+        words, words_loaded = self.data.words_at(np.stack([address, address + 1], axis=-1))
+        word0 = words[..., 0].astype(np.int64)
+        word1 = np.where(sub_type == 1, -1, words[..., 1].astype(np.int64))
+        loaded = (sub_type != 0) & words_loaded[..., 0] & (words_loaded[..., 1] | (sub_type == 1))
+
+        univ = loaded & (sub_type == 2)
+        line = loaded & (sub_type == 3)
+        entries = words.reshape(-1, 2)
+        univ_fields = UNIV_SUBTRANSLATOR_SCHEMA.decode_many(entries).reshape(w_index.shape)
+        line_fields = LINE_SUBTRANSLATOR_SCHEMA.decode_many(entries).reshape(w_index.shape)
+
+        def univ_column(name):
+            return np.where(univ, univ_fields[name], -1)
+
+        def line_column(name):
+            return np.where(line, line_fields[name], -1)
+
+        return SUBTRANSLATOR_COLUMNS(
+            w_index=w_index,
+            x_index=x_index,
+            sub_type=sub_type,
+            address=address,
+            loaded=loaded,
+            word0=np.where(loaded, word0, -1),
+            word1=np.where(loaded, word1, -1),
+            u_type=np.where(univ, univ_fields["u_type"], line_column("u_type")),
+            ten=univ_column("ten"),
+            grp_number=univ_column("grp_number"),
+            mem_number=univ_column("mem_number"),
+            tone_scanpoint=univ_column("tone_scanpoint"),
+            supv_scanpoint=univ_column("supv_scanpoint"),
+            terminal=line_column("terminal"),
+            group=line_column("group"),
+            scanpoint=line_column("scanpoint"),
+        )
+
 @dataclass
 class SPTBL:
     """Figure 2. Scan point number translator.
@@ -476,10 +763,10 @@ class SPTBL:
     spn_head: SPN_HEAD_TABLE
 
     @classmethod
-    def find(cls, base_address, all_data: DataRangeSet):
+    def find(cls, base_address, all_data: DataRangeSet | MemoryImage):
         """Find the table in the set of tape blocks and load the spn_head table with data."""
         table_data = all_data.range_starting_at_address(base_address, 3)
-        n_entries = table_data.words[1] >> 4
+        n_entries = int(table_data.words[1]) >> 4
         address = twentybit(table_data.words[1], table_data.words[2])
 
         spn_head = SPN_HEAD_TABLE(data=all_data, table_address=address)
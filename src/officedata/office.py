@@ -0,0 +1,221 @@
+"""The decoded office: the loaded memory plus the tables found in it."""
+
+import hashlib
+
+from .bulk import decode_office_trunks, decode_service_members
+from .cache import TableCache, track_files
+from .crawl import TableGraph, TableNode, check_graph, crawl
+from .image_tools import (NOT_RELOADABLE, DataRangeSet, LazyTrack, MemoryImage, load_track, merge_spans,
+                          spans_overlap)
+from .odd import GRPTBL, MEMLST, SPN_HEAD_TABLE, SPTBL
+from .office_image import load_office_image
+from .reload import ReloadResult, TrackReloader
+from .xref import CrossReference
+
+TRACK_DIRECTORY = "TapeData/1/"
+START_BLOCK = 167
+END_BLOCK = 317
+
+
+class Office:
+    """
+    Office data with its tables decoded on first use. When a TableCache and a
+    key for the source files are given, decoded tables are read from and
+    stored in the cache.
+
+    The address spans each table read while it was decoded are kept with it,
+    so that `reload` drops only the tables that read a changed block.
+
+    Table addresses come from the table graph, crawled from the master table
+    index on first use, or from a graph saved by `odd tables --save`. A given
+    graph is checked against the master table index first, and tables decoded
+    at its addresses are cached under a key that includes the graph. Like a
+    crawled graph, it is dropped when a reload changes a table it holds.
+    """
+
+    def __init__(self, data: DataRangeSet | MemoryImage, cache: TableCache | None = None, cache_key: str | None = None,
+                 reloader: TrackReloader | None = None, graph: TableGraph | None = None):
+        self.data = data
+        self.cache = cache
+        self.cache_key = cache_key
+        self.reloader = reloader
+        self._tables = {}
+        self._spans = {}
+        if graph is not None:
+            self.use_graph(graph)
+
+    @classmethod
+    def load(cls, base_filename=TRACK_DIRECTORY, start_block=START_BLOCK, end_block=END_BLOCK,
+             image: str | None = None, cache: TableCache | None = None, lazy: bool = False,
+             coalesce: bool = False, prefer_patched: bool = False, graph: TableGraph | None = None) -> "Office":
+        """
+        Load from an office image if given, otherwise from the track's block
+        files. With `lazy`, only the block headers are read up front and block
+        words are read as they are used. With `coalesce`, adjacent block
+        fragments are merged into contiguous extents.
+
+        An office loaded from the track's block files without `lazy` or
+        `coalesce` can be reloaded. With `prefer_patched`, NNNN_patched.bin
+        files written by patch_tape.py are loaded in place of their blocks.
+        A `graph` saved from the same office saves crawling it; ValueError is
+        raised if it does not match the office's master table index.
+        """
+        reloader = None
+        if image:
+            data = load_office_image(image)
+            sources = [image]
+        elif lazy:
+            data = LazyTrack(base_filename, start_block=start_block, end_block=end_block)
+            sources = track_files(base_filename, start_block, end_block)
+        elif coalesce:
+            data = load_track(base_filename, start_block=start_block, end_block=end_block, coalesce=coalesce)
+            sources = track_files(base_filename, start_block, end_block)
+        else:
+            reloader = TrackReloader(base_filename, start_block, end_block, prefer_patched=prefer_patched)
+            data = reloader.load()
+            sources = track_files(base_filename, start_block, end_block)
+
+        cache_key = cache.source_key(sources) if cache else None
+        return cls(data, cache=cache, cache_key=cache_key, reloader=reloader, graph=graph)
+
+    def use_graph(self, graph: TableGraph):
+        """
+        Take table addresses from a saved graph instead of crawling the office.
+        Raises ValueError if the graph does not match the master table index.
+        Tables already decoded are dropped.
+        """
+        check_graph(graph, self.data)
+        self._tables.clear()
+        self._spans.clear()
+        if self.cache_key is not None:
+            self.cache_key = hashlib.sha256((self.cache_key + graph.to_json()).encode()).hexdigest()
+        # The spans crawling the graph would have read
+        self._tables["table_graph"] = graph
+        self._spans["table_graph"] = merge_spans([(table.address, table.end) for table in graph.tables if table.length])
+
+    def _decode(self, build) -> tuple:
+        """Call `build`, returning its value and the merged address spans it read."""
+        outer_log = self.data.read_log
+        read_log = self.data.read_log = []
+        try:
+            value = build()
+        finally:
+            self.data.read_log = outer_log
+        return value, merge_spans(read_log)
+
+    def _table(self, name: str, build, cached: bool = True):
+        if name not in self._tables:
+            if cached and self.cache and self.cache_key:
+                value, spans = self.cache.load(self.cache_key, name, lambda: self._decode(build), data=self.data)
+            else:
+                value, spans = self._decode(build)
+            self._tables[name] = value
+            self._spans[name] = spans
+
+        # A table decoded from other tables depends on what they read.
+        if self.data.read_log is not None:
+            self.data.read_log.extend(self._spans[name])
+        return self._tables[name]
+
+    def reload(self) -> ReloadResult:
+        """
+        Reload the track's changed block files into the office data in place,
+        and drop the decoded tables that read any address the changed blocks
+        load or loaded. The other tables are kept.
+        """
+        if self.reloader is None:
+            raise ValueError(NOT_RELOADABLE)
+
+        result = self.reloader.reload()
+        if not result:
+            return result
+
+        result.invalidated = [name for name, spans in self._spans.items() if spans_overlap(spans, result.spans)]
+        for name in result.invalidated:
+            del self._tables[name]
+            del self._spans[name]
+
+        if self.cache:
+            reloader = self.reloader
+            self.cache_key = self.cache.source_key(track_files(reloader.base_filename, reloader.start_block,
+                                                               reloader.end_block))
+        return result
+
+    @property
+    def table_graph(self) -> TableGraph:
+        """
+        Every table found by following pointers from the master table index.
+        It is not put in the table cache, as crawling costs about as much as a
+        cache read.
+        """
+        return self._table("table_graph", lambda: crawl(self.data), cached=False)
+
+    def _table_node(self, name: str) -> TableNode:
+        """
+        A table of the table graph. Only the three word headers pointing to the
+        table are recorded as read, so a table decoded from its address is
+        dropped on reload when the address changes, not whenever any crawled
+        table does.
+        """
+        read_log = self.data.read_log
+        self.data.read_log = None
+        try:
+            graph = self.table_graph
+        finally:
+            self.data.read_log = read_log
+        if read_log is not None:
+            read_log.extend((edge.pointer_address, edge.pointer_address + 3) for edge in graph.sources(name))
+        return graph.table(name)
+
+    @property
+    def grptbl(self) -> GRPTBL:
+        return self._table("grptbl", lambda: GRPTBL.parse(self._table_node("grptbl").address, self.data))
+
+    @property
+    def lazy_grptbl(self) -> GRPTBL:
+        """
+        The GRPTBL with only its headers decoded; groups are decoded as they
+        are looked up. It is not cached, as it costs no more than a cache read.
+        """
+        if "grptbl" in self._tables:
+            return self._tables["grptbl"]
+        return GRPTBL.parse(self._table_node("grptbl").address, self.data, lazy=True)
+
+    @property
+    def memlst(self) -> MEMLST:
+        return self._table("memlst", lambda: MEMLST.parse(
+            self.data.range_starting_at_address(self._table_node("memlst").address)))
+
+    @property
+    def sptbl(self) -> SPTBL:
+        return self._table("sptbl", self._find_sptbl)
+
+    def _find_sptbl(self) -> SPTBL:
+        # The SPN head table is the one the SPTBL header points to in the graph.
+        node = self._table_node("spn_head")
+        sptbl = SPTBL(n_entries=node.count, spn_head_table_address=node.address,
+                      spn_head=SPN_HEAD_TABLE(data=self.data, table_address=node.address))
+        # Fetch the head table words now, so their span is recorded with the
+        # table; the subtranslators are read from the data on each lookup.
+        sptbl.spn_head.load()
+        return sptbl
+
+    def decode(self, *names: str) -> list:
+        """Decode the named tables now, e.g. `decode("grptbl", "xref")`, and return them."""
+        return [getattr(self, name) for name in names]
+
+    @property
+    def service_members(self):
+        """Every service group member, decoded by `bulk.decode_service_members`."""
+        return self._table("service_members", lambda: decode_service_members(self.data, self.grptbl, self.memlst))
+
+    @property
+    def trunks(self):
+        """Trunk groups by table and their members, decoded by `bulk.decode_office_trunks`."""
+        return self._table("trunks", lambda: decode_office_trunks(self.data, self.grptbl, self.memlst))
+
+    @property
+    def xref(self) -> CrossReference:
+        """Reverse index from scan point, TEN and DTA values to their owners."""
+        return self._table("xref", lambda: CrossReference.build(self.service_members, self.trunks[1],
+                                                                self.sptbl.spn_head.enumerate_entries()))
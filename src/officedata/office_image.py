@@ -0,0 +1,136 @@
+"""
+Office image files (.odi).
+
+An office image is the whole 20-bit address space of a track, written as raw
+little-endian words so that it can be opened with `np.memmap` instead of
+re-reading every tape block. The file starts with a small header:
+
+    magic     4 bytes, b"ODI1"
+    length    uint32, little-endian, length of the JSON metadata
+    metadata  JSON: source track, loaded ranges and block CRC status
+
+The words follow at the next multiple of DATA_ALIGNMENT bytes.
+"""
+
+import json
+import os
+import struct
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .image_tools import (ADDRESS_SPACE, BlockStatus, MemoryImage, block_crc, block_filename, block_fragments,
+                          load_block)
+
+ODI_MAGIC = b"ODI1"
+ODI_VERSION = 1
+DATA_ALIGNMENT = 4096
+
+
+@dataclass
+class OfficeImageHeader:
+    source: str
+    start_block: int
+    end_block: int
+    # (start_address, length, block, offset_in_block) for every range loaded
+    ranges: list[tuple[int, int, int, int]] = field(default_factory=list)
+    blocks: list[BlockStatus] = field(default_factory=list)
+
+    def to_json(self) -> bytes:
+        return json.dumps({
+            "version": ODI_VERSION,
+            "address_space": ADDRESS_SPACE,
+            "dtype": "<u2",
+            "source": self.source,
+            "start_block": self.start_block,
+            "end_block": self.end_block,
+            "ranges": self.ranges,
+            "blocks": [[status.block, status.stored_crc, status.computed_crc] for status in self.blocks],
+        }).encode()
+
+    @classmethod
+    def from_json(cls, data: bytes) -> "OfficeImageHeader":
+        metadata = json.loads(data)
+        if metadata.get("version") != ODI_VERSION or metadata.get("address_space") != ADDRESS_SPACE:
+            raise ValueError("Unsupported office image version")
+        return cls(source=metadata["source"],
+                   start_block=metadata["start_block"],
+                   end_block=metadata["end_block"],
+                   ranges=[tuple(entry) for entry in metadata["ranges"]],
+                   blocks=[BlockStatus(*entry) for entry in metadata["blocks"]])
+
+
+def write_office_image(filename: str, base_filename: str, start_block=0, end_block=358) -> OfficeImageHeader:
+    """
+    Read the blocks of a track directory and write them as an office image.
+    The image is written to a temporary file and renamed into place, so an
+    interrupted write never leaves a truncated image.
+    """
+
+    header = OfficeImageHeader(source=str(base_filename), start_block=start_block, end_block=end_block)
+    words = np.zeros(ADDRESS_SPACE, dtype="<u2")
+    loaded = np.zeros(ADDRESS_SPACE, dtype=np.bool_)
+
+    for block_n in range(start_block, end_block):
+        try:
+            block_data = load_block(block_filename(base_filename, block_n))
+        except FileNotFoundError:
+            continue
+
+        header.blocks.append(BlockStatus(block_n, int(block_data[-2]), block_crc(block_data)))
+        for start_address, length, offset_in_block in block_fragments(block_data):
+            end_address = start_address + length
+            if loaded[start_address:end_address].any():
+                raise ValueError(f"Block {block_n} range 0o{start_address:o}-0o{end_address:o} overlaps loaded data")
+            words[start_address:end_address] = block_data[offset_in_block:offset_in_block + length]
+            loaded[start_address:end_address] = True
+            header.ranges.append((start_address, length, block_n, offset_in_block))
+
+    metadata = header.to_json()
+    prefix = ODI_MAGIC + struct.pack("<I", len(metadata)) + metadata
+    padding = -len(prefix) % DATA_ALIGNMENT
+
+    temporary = f"{filename}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(prefix + bytes(padding))
+            f.write(words.tobytes())
+        os.replace(temporary, filename)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+    return header
+
+
+def _read_prefix(f) -> tuple[OfficeImageHeader, int]:
+    magic = f.read(4)
+    if magic != ODI_MAGIC:
+        raise ValueError("Not an office image file")
+    (length,) = struct.unpack("<I", f.read(4))
+    header = OfficeImageHeader.from_json(f.read(length))
+    data_offset = 8 + length + (-(8 + length) % DATA_ALIGNMENT)
+    return header, data_offset
+
+
+def read_office_image_header(filename: str) -> OfficeImageHeader:
+    with open(filename, "rb") as f:
+        header, _ = _read_prefix(f)
+    return header
+
+
+def load_office_image(filename: str) -> MemoryImage:
+    """
+    Open an office image as a MemoryImage. The words are memory mapped
+    read-only, so only the pages that are touched are read from disk.
+    """
+    with open(filename, "rb") as f:
+        header, data_offset = _read_prefix(f)
+
+    words = np.memmap(filename, dtype="<u2", mode="r", offset=data_offset, shape=(ADDRESS_SPACE,))
+    loaded = np.zeros(ADDRESS_SPACE, dtype=np.bool_)
+    for start_address, length, _, _ in header.ranges:
+        loaded[start_address:start_address + length] = True
+
+    return MemoryImage(words, loaded)
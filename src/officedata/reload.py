@@ -0,0 +1,162 @@
+"""
+Incremental reload of a track's changed block files.
+
+A TrackReloader loads a track and remembers each block file's size, mtime
+and content hash and the ranges it carried. `reload` finds the block files
+whose size or mtime changed, confirms the change by hash, reads only those
+blocks and swaps their ranges into the loaded data in place. It reports the
+address spans that changed, so holders of decoded tables can drop only the
+tables that read them.
+"""
+
+import hashlib
+import io
+import os
+from dataclasses import dataclass, field
+
+from .image_tools import (DataRange, DataRangeSet, MemoryImage, Provenance, block_filename, block_fragments,
+                          merge_spans, read_block)
+
+
+def patched_block_filename(base_filename, block_n: int) -> str:
+    return os.path.join(base_filename, f"{block_n:04d}_patched.bin")
+
+
+def track_block_files(base_filename, start_block=0, end_block=358, prefer_patched=False) -> dict[int, str]:
+    """
+    The block file to load for each block of a track that has one. With
+    `prefer_patched`, a block's NNNN_patched.bin written by patch_tape.py is
+    used in place of NNNN.bin.
+    """
+    files = {}
+    for block_n in range(start_block, end_block):
+        candidates = [block_filename(base_filename, block_n)]
+        if prefer_patched:
+            candidates.insert(0, patched_block_filename(base_filename, block_n))
+        for filename in candidates:
+            if os.path.exists(filename):
+                files[block_n] = filename
+                break
+    return files
+
+
+@dataclass
+class LoadedBlock:
+    filename: str
+    size: int
+    mtime_ns: int
+    digest: str
+    # (start_address, length, offset_in_block) of each range, as block_fragments returns them
+    fragments: list[tuple[int, int, int]]
+    ranges: list[DataRange]
+
+
+@dataclass
+class ReloadResult:
+    # Blocks whose file changed, appeared or disappeared
+    blocks: list[int] = field(default_factory=list)
+    # Merged (start, end) address spans loaded by those blocks before or after
+    spans: list[tuple[int, int]] = field(default_factory=list)
+    # Decoded tables dropped because they read those spans, filled in by Office.reload
+    invalidated: list[str] = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.blocks)
+
+
+class TrackReloader:
+    """Loads a track and keeps it up to date with its block files."""
+
+    def __init__(self, base_filename, start_block=0, end_block=358, prefer_patched=False):
+        self.base_filename = base_filename
+        self.start_block = start_block
+        self.end_block = end_block
+        self.prefer_patched = prefer_patched
+        self.blocks: dict[int, LoadedBlock] = {}
+        self.data: DataRangeSet | MemoryImage | None = None
+
+    def _read_block(self, filename: str) -> LoadedBlock:
+        stat = os.stat(filename)
+        with open(filename, "rb") as f:
+            content = f.read()
+        block_data = read_block(io.BytesIO(content))
+        fragments = block_fragments(block_data)
+        ranges = [DataRange(start_address=start_address, words=block_data[offset_in_block:offset_in_block + length])
+                  for start_address, length, offset_in_block in fragments]
+        return LoadedBlock(filename, stat.st_size, stat.st_mtime_ns, hashlib.sha256(content).hexdigest(), fragments,
+                           ranges)
+
+    def _provenance(self) -> Provenance:
+        return Provenance([(start_address, length, block_n, offset_in_block)
+                           for block_n, block in self.blocks.items()
+                           for start_address, length, offset_in_block in block.fragments])
+
+    def load(self, image=False) -> DataRangeSet | MemoryImage:
+        """Read every block file, returning a DataRangeSet, or a MemoryImage if `image` is set."""
+        files = track_block_files(self.base_filename, self.start_block, self.end_block, self.prefer_patched)
+        self.blocks = {block_n: self._read_block(filename) for block_n, filename in files.items()}
+
+        data = DataRangeSet([data_range for block in self.blocks.values() for data_range in block.ranges],
+                            provenance=self._provenance())
+        self.data = MemoryImage.from_range_set(data) if image else data
+        return self.data
+
+    def changed_blocks(self) -> dict[int, LoadedBlock | None]:
+        """
+        Read the blocks whose file changed since they were loaded. Returns the
+        newly read block for each, or None for a block whose file is gone.
+        A file that was touched but has the same content is not a change.
+        """
+        files = track_block_files(self.base_filename, self.start_block, self.end_block, self.prefer_patched)
+        changed = {}
+        for block_n in sorted(set(files) | set(self.blocks)):
+            loaded = self.blocks.get(block_n)
+            filename = files.get(block_n)
+            if filename is None:
+                changed[block_n] = None
+                continue
+            try:
+                stat = os.stat(filename)
+            except FileNotFoundError:
+                changed[block_n] = None
+                continue
+            if loaded and loaded.filename == filename and (loaded.size, loaded.mtime_ns) == (stat.st_size,
+                                                                                             stat.st_mtime_ns):
+                continue
+
+            block = self._read_block(filename)
+            if loaded and loaded.digest == block.digest:
+                # Same words; keep the loaded ranges so the data is untouched.
+                loaded.filename, loaded.size, loaded.mtime_ns = block.filename, block.size, block.mtime_ns
+                continue
+            changed[block_n] = block
+        return changed
+
+    def reload(self) -> ReloadResult:
+        """Swap the ranges of changed blocks into the loaded data in place."""
+        if self.data is None:
+            raise ValueError("Nothing loaded yet; call load() first")
+
+        changed = self.changed_blocks()
+        if not changed:
+            return ReloadResult()
+
+        removed = [data_range for block_n in changed if block_n in self.blocks
+                   for data_range in self.blocks[block_n].ranges]
+        added = [data_range for block in changed.values() if block for data_range in block.ranges]
+
+        old_blocks = dict(self.blocks)
+        for block_n, block in changed.items():
+            if block is None:
+                self.blocks.pop(block_n, None)
+            else:
+                self.blocks[block_n] = block
+        try:
+            self.data.replace_ranges(removed, added, provenance=self._provenance())
+        except ValueError:
+            self.blocks = old_blocks
+            raise
+
+        spans = merge_spans([(data_range.start_address, data_range.start_address + data_range.length)
+                             for data_range in removed + added if data_range.length > 0])
+        return ReloadResult(sorted(changed), spans)
@@ -0,0 +1,135 @@
+"""
+Declarative layouts for the fixed-size entries of the BSP figure tables.
+
+A TableSchema names the bit fields of an entry's words. It is compiled once
+into a scalar decoder, which returns the field values of one entry as Python
+ints, and can decode an (N, n_words) array of entries into a structured
+array with numpy.
+
+Bits are numbered from the least significant bit of the word, so a field
+with `low=7, width=7` is `(word >> 7) & 0x7f`.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+
+
+@dataclass(frozen=True)
+class Field:
+    name: str
+    word: int
+    low: int = 0
+    width: int = 16
+    flag: bool = False  # decode a one bit field as a bool
+    # Values of the schema's tag field for which this field applies. Where it
+    # does not apply the scalar decoder gives None and the vectorized one -1.
+    when: tuple[int, ...] | None = None
+
+    @property
+    def mask(self) -> int:
+        return (1 << self.width) - 1
+
+
+class TableSchema:
+    """Bit field layout of one table entry, e.g. Figure 12C."""
+
+    def __init__(self, name: str, n_words: int, fields: list[Field], tag: str | None = None):
+        self.name = name
+        self.n_words = n_words
+        self.fields = tuple(fields)
+        self.tag = tag
+        self._check()
+        self.decode = self._compile()
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        return tuple(field.name for field in self.fields)
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype([(field.name, np.bool_ if field.flag else np.int32) for field in self.fields])
+
+    def _check(self):
+        names = self.names
+        if len(set(names)) != len(names):
+            raise ValueError(f"{self.name}: duplicate field names")
+        for field in self.fields:
+            if not 0 <= field.word < self.n_words:
+                raise ValueError(f"{self.name}.{field.name}: word {field.word} not in a {self.n_words} word entry")
+            if field.low < 0 or field.width < 1 or field.low + field.width > 16:
+                raise ValueError(f"{self.name}.{field.name}: bits {field.low}+{field.width} not within a word")
+            if field.flag and field.width != 1:
+                raise ValueError(f"{self.name}.{field.name}: flags must be one bit wide")
+            if field.when is not None and self.tag is None:
+                raise ValueError(f"{self.name}.{field.name}: conditional field without a tag field")
+        if self.tag is not None:
+            if self.tag not in names:
+                raise ValueError(f"{self.name}: tag field {self.tag} not defined")
+            if self.fields[names.index(self.tag)].when is not None:
+                raise ValueError(f"{self.name}: tag field {self.tag} cannot be conditional")
+
+    @staticmethod
+    def _expression(field: Field) -> str:
+        value = f"w{field.word}" if field.low == 0 else f"(w{field.word} >> {field.low})"
+        if field.low + field.width < 16:
+            value = f"({value} & 0x{field.mask:x})"
+        if field.flag:
+            value = f"bool({value})"
+        return value
+
+    def _compile(self):
+        """
+        Generate the scalar decoder: a function taking the entry's words and
+        returning the field values as a tuple in field order.
+        """
+        used_words = sorted({field.word for field in self.fields})
+        lines = ["def decode(words):",
+                 "    if len(words) < n_words:",
+                 "        raise ValueError(f'{name} requires {n_words:d} words; only {len(words):d} provided.')"]
+        lines += [f"    w{word} = int(words[{word}])" for word in used_words]
+
+        values = []
+        for field in self.fields:
+            value = self._expression(field)
+            if field.name == self.tag:
+                lines.append(f"    tag = {value}")
+                value = "tag"
+            elif field.when is not None:
+                value = f"({value} if tag in {field.when!r} else None)"
+            values.append(value)
+        lines.append(f"    return ({', '.join(values)},)")
+
+        namespace = {"n_words": self.n_words, "name": self.name}
+        exec(compile("\n".join(lines), f"<schema {self.name}>", "exec"), namespace)  # noqa: S102
+        return namespace["decode"]
+
+    def decode_dict(self, words) -> dict:
+        """Decode one entry into a dict of field values."""
+        return dict(zip(self.names, self.decode(words)))
+
+    def decode_many(self, words: npt.NDArray) -> npt.NDArray:
+        """
+        Decode an (N, n_words) array of entries into a structured array with
+        one field per schema field.
+        """
+        words = np.asarray(words)
+        if words.ndim != 2 or words.shape[1] < self.n_words:
+            raise ValueError(f"{self.name} requires an (N, {self.n_words:d}) array of words; got {words.shape}")
+        columns = [words[:, n].astype(np.int32) for n in range(self.n_words)]
+
+        values = {field.name: (columns[field.word] >> field.low) & field.mask for field in self.fields}
+        tag = values[self.tag] if self.tag is not None else None
+
+        applies = {}
+        result = np.empty(len(words), dtype=self.dtype)
+        for field in self.fields:
+            value = values[field.name]
+            if field.when is not None:
+                if field.when not in applies:
+                    # Comparing with each tag value is much faster than np.isin for a few values.
+                    applies[field.when] = np.logical_or.reduce([tag == when for when in field.when])
+                value = np.where(applies[field.when], value, -1)
+            result[field.name] = value > 0 if field.flag else value
+        return result
@@ -0,0 +1,118 @@
+"""
+Searches over the whole loaded memory image.
+
+Each search walks the 20-bit address space a chunk at a time with numpy and
+yields the matches found in each chunk as a structured array, so results can
+be written out while the rest of the space is still being searched. Only
+loaded words match; a sequence or pointer never spans an unloaded word.
+"""
+
+from collections.abc import Iterator, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from .image_tools import ADDRESS_SPACE, DataRangeSet, MemoryImage
+
+# Addresses searched per chunk
+SEARCH_CHUNK = 1 << 16
+WORD_MASK = 0o177777
+
+MATCH_DTYPE = np.dtype([
+    ("address", np.int32),
+    ("word", np.uint16),        # word at the address
+    ("target", np.int32),       # twentybit address a pointer pair points to, otherwise -1
+])
+
+
+def as_memory_image(data: DataRangeSet | MemoryImage) -> MemoryImage:
+    """The data as a MemoryImage, building one from a range set if needed."""
+    if isinstance(data, MemoryImage):
+        return data
+    return MemoryImage.from_range_set(data)
+
+
+def _chunks(start: int, end: int, chunk: int) -> Iterator[tuple[int, int]]:
+    start = max(start, 0)
+    end = min(end, ADDRESS_SPACE)
+    for chunk_start in range(start, end, chunk):
+        yield chunk_start, min(chunk_start + chunk, end)
+
+
+def _matches(image: MemoryImage, addresses: npt.NDArray[np.int64], targets=-1) -> npt.NDArray:
+    matches = np.empty(len(addresses), dtype=MATCH_DTYPE)
+    matches["address"] = addresses
+    matches["word"] = image.words[addresses]
+    matches["target"] = targets
+    return matches
+
+
+def find_masked(image: MemoryImage, value: int, mask: int = WORD_MASK, start: int = 0, end: int = ADDRESS_SPACE,
+                chunk: int = SEARCH_CHUNK) -> Iterator[npt.NDArray]:
+    """Yield, a chunk at a time, the loaded words in [start, end) with `word & mask == value & mask`."""
+    return find_sequence(image, [value], mask, start, end, chunk)
+
+
+def find_sequence(image: MemoryImage, sequence: Sequence[int | None], mask: int = WORD_MASK, start: int = 0,
+                  end: int = ADDRESS_SPACE, chunk: int = SEARCH_CHUNK) -> Iterator[npt.NDArray]:
+    """
+    Yield, a chunk at a time, the addresses in [start, end) where a run of
+    loaded words matches `sequence` under `mask`. A None in the sequence
+    matches any loaded word. The run may extend past `end`.
+    """
+    if not sequence:
+        raise ValueError("Sequence must have at least one word")
+    length = len(sequence)
+    mask &= WORD_MASK
+    checks = [(offset, value & mask) for offset, value in enumerate(sequence) if value is not None]
+
+    for chunk_start, chunk_end in _chunks(start, end, chunk):
+        # Candidates whose whole run fits in the address space
+        chunk_end = min(chunk_end, ADDRESS_SPACE - length + 1)
+        if chunk_end <= chunk_start:
+            break
+        # Narrow the chunk by one compared word, then check the few candidates left
+        selected = image.loaded[chunk_start:chunk_end].copy()
+        if checks:
+            offset, value = checks[0]
+            selected &= (image.words[chunk_start + offset:chunk_end + offset] & mask) == value
+        candidates = chunk_start + np.flatnonzero(selected)
+        for offset in range(1, length):
+            candidates = candidates[image.loaded[candidates + offset]]
+        for offset, value in checks[1:]:
+            candidates = candidates[(image.words[candidates + offset] & mask) == value]
+        if len(candidates):
+            yield _matches(image, candidates)
+
+
+def find_pointers(image: MemoryImage, low: int, high: int, start: int = 0, end: int = ADDRESS_SPACE,
+                  chunk: int = SEARCH_CHUNK) -> Iterator[npt.NDArray]:
+    """
+    Yield, a chunk at a time, the addresses in [start, end) of loaded word
+    pairs whose `twentybit` decoding is in [low, high), with that target.
+    """
+    for chunk_start, chunk_end in _chunks(start, end, chunk):
+        chunk_end = min(chunk_end, ADDRESS_SPACE - 1)
+        if chunk_end <= chunk_start:
+            break
+        loaded = image.loaded[chunk_start:chunk_end] & image.loaded[chunk_start + 1:chunk_end + 1]
+        high_words = image.words[chunk_start:chunk_end].astype(np.int32)
+        low_words = image.words[chunk_start + 1:chunk_end + 1].astype(np.int32)
+        targets = ((high_words & 0xf) << 16) | low_words
+        found = np.flatnonzero(loaded & (targets >= low) & (targets < high))
+        if len(found):
+            yield _matches(image, chunk_start + found, targets[found])
+
+
+def first_matches(chunks: Iterator[npt.NDArray], limit: int | None) -> Iterator[npt.NDArray]:
+    """Pass chunks of matches through until `limit` matches have been yielded."""
+    if limit is not None and limit < 0:
+        raise ValueError("Limit must not be negative")
+    remaining = limit
+    for matches in chunks:
+        if remaining is not None:
+            matches = matches[:remaining]
+            remaining -= len(matches)
+        yield matches
+        if remaining == 0:
+            return
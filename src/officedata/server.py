@@ -0,0 +1,207 @@
+"""
+Query server: answer lookups from an office loaded once.
+
+`odd serve` loads the office data and the decoded tables, then answers
+requests over a Unix socket. Requests and responses are JSON objects, one per
+line, so a client can send several requests before reading the responses.
+Every response has "ok"; failed requests carry "error" instead of a result.
+
+    {"op": "lookup", "kind": "oe", "numbers": ["000100", "000300"]}
+    {"op": "group", "group": 65}
+    {"op": "xref", "kind": "dta", "value": 1203}
+    {"op": "dump", "include_unassigned": false}
+    {"op": "reload"}
+    {"op": "ping"}
+
+"reload" reads the track's changed block files and drops the decoded tables
+that read them; the next query that needs a dropped table decodes it again.
+
+Clients are served concurrently by one asyncio event loop. Each request is
+answered in full before the next is read, so the tables are never used from
+two threads.
+"""
+
+import asyncio
+import json
+import os
+import signal
+import socket
+import tempfile
+
+from .display import batch_records, spn_dump_records, svc_member_records, xref_records
+from .office import Office
+from .xref import KINDS
+
+# Requests a client sends before reading their responses
+PIPELINE_DEPTH = 64
+# Longest request line the server reads
+REQUEST_LIMIT = 1 << 24
+
+
+def default_socket_path() -> str:
+    if "ODD_SOCKET" in os.environ:
+        return os.environ["ODD_SOCKET"]
+    return os.path.join(tempfile.gettempdir(), f"odd-{os.getuid()}.sock")
+
+
+class QueryServer:
+    """Dispatches query requests to the tables of an office."""
+
+    def __init__(self, office: Office):
+        self.office = office
+        self.requests_served = 0
+        self._handlers = {
+            "lookup": self._lookup,
+            "group": self._group,
+            "xref": self._xref,
+            "dump": self._dump,
+            "reload": self._reload,
+            "ping": self._ping,
+        }
+
+    def warm(self):
+        """Decode the tables the queries use, so the first client does not wait for them."""
+        self.office.decode("sptbl", "grptbl", "service_members", "xref")
+
+    def handle(self, request) -> dict:
+        """Answer one request."""
+        self.requests_served += 1
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "Request must be a JSON object"}
+        handler = self._handlers.get(request.get("op"))
+        if handler is None:
+            return {"ok": False, "error": f"Op must be one of {', '.join(self._handlers)}"}
+        try:
+            return {"ok": True, **handler(request)}
+        except (KeyError, TypeError, ValueError) as e:
+            return {"ok": False, "error": str(e) if not isinstance(e, KeyError) else f"Missing field {e}"}
+
+    def _lookup(self, request) -> dict:
+        kind = request.get("kind", "oe")
+        if kind not in ("oe", "ten"):
+            raise ValueError("Kind must be oe or ten")
+        numbers = request["numbers"]
+        if not isinstance(numbers, list) or not all(isinstance(number, str) for number in numbers):
+            raise ValueError("Numbers must be a list of six octal digit strings")
+        if not numbers:
+            return {"records": []}
+        return {"records": list(batch_records(self.office.sptbl.spn_head, [(kind, number) for number in numbers]))}
+
+    def _group(self, request) -> dict:
+        group = int(request["group"])
+        entry = self.office.grptbl.service_group(group)
+        members = self.office.service_members
+        return {"entry": str(entry), "members": list(svc_member_records(members[members["group"] == group]))}
+
+    def _xref(self, request) -> dict:
+        kind = request["kind"]
+        if kind not in KINDS:
+            raise ValueError(f"Kind must be one of {', '.join(KINDS)}")
+        value = request["value"]
+        if isinstance(value, str):
+            value = int(value, base=8)
+        return {"records": list(xref_records(self.office.xref.lookup(kind, int(value))))}
+
+    def _dump(self, request) -> dict:
+        columns = self.office.sptbl.spn_head.enumerate_entries(
+            include_unassigned=bool(request.get("include_unassigned", False)))
+        return {"records": list(spn_dump_records(columns))}
+
+    def _reload(self, request) -> dict:
+        result = self.office.reload()
+        return {"blocks": result.blocks, "invalidated": result.invalidated}
+
+    def _ping(self, request) -> dict:
+        return {"requests_served": self.requests_served}
+
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while line := await reader.readline():
+                try:
+                    response = self.handle(json.loads(line))
+                except ValueError:
+                    response = {"ok": False, "error": "Request is not valid JSON"}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path: str):
+        """Serve clients on a Unix socket until cancelled."""
+        server = await asyncio.start_unix_server(self._serve_client, path=socket_path, limit=REQUEST_LIMIT)
+        async with server:
+            await server.serve_forever()
+
+
+def remove_stale_socket(socket_path: str):
+    """Remove a socket left by a server that has exited. Raises if one is still listening."""
+    if not os.path.exists(socket_path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.remove(socket_path)
+            return
+    raise OSError(f"A server is already listening on {socket_path}")
+
+
+def serve(office: Office, socket_path: str):
+    """Warm the office's tables and serve queries until interrupted or terminated."""
+    query_server = QueryServer(office)
+    query_server.warm()
+    remove_stale_socket(socket_path)
+
+    async def serve_until_terminated():
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        await query_server.serve(socket_path)
+
+    try:
+        asyncio.run(serve_until_terminated())
+    except asyncio.CancelledError:
+        pass
+    finally:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+class QueryClient:
+    """A blocking client for the query server."""
+
+    def __init__(self, socket_path: str | None = None, timeout: float | None = 30):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.settimeout(timeout)
+        self.socket.connect(socket_path or default_socket_path())
+        self._responses = self.socket.makefile("rb")
+
+    def query(self, request: dict) -> dict:
+        return self.query_many([request])[0]
+
+    def query_many(self, requests: list[dict]) -> list[dict]:
+        """
+        Send the requests a batch at a time, reading each batch's responses
+        in order before sending the next. Batches are kept small so the
+        requests always fit in the socket buffer while the server answers.
+        """
+        responses = []
+        for start in range(0, len(requests), PIPELINE_DEPTH):
+            batch = requests[start:start + PIPELINE_DEPTH]
+            self.socket.sendall(b"".join(json.dumps(request).encode() + b"\n" for request in batch))
+            for _ in batch:
+                line = self._responses.readline()
+                if not line:
+                    raise ConnectionError("Server closed the connection")
+                responses.append(json.loads(line))
+        return responses
+
+    def close(self):
+        self._responses.close()
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
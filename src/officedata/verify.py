@@ -0,0 +1,71 @@
+"""
+Track-wide block CRC verification.
+
+Results are cached by block content hash in the table cache directory. The
+cache's stat index supplies the hashes of unchanged files, so a repeated run
+over an unchanged track reads no block files at all.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .cache import TableCache
+from .image_tools import BlockStatus, block_crcs, block_filename, block_fragments, load_block
+
+VERIFY_INDEX = "verify_index.json"
+
+
+def check_blocks(filenames: list[str], block_numbers: list[int]) -> list[BlockStatus]:
+    """Read block files and compare their stored and computed CRCs."""
+    blocks = [load_block(filename) for filename in filenames]
+    return [BlockStatus(block_n, int(block_data[-2]), computed_crc,
+                        [(start_address, length) for start_address, length, _ in block_fragments(block_data)])
+            for block_n, block_data, computed_crc in zip(block_numbers, blocks, block_crcs(blocks))]
+
+
+def _check_blocks_parallel(filenames: list[str], block_numbers: list[int], jobs: int) -> list[BlockStatus]:
+    chunk = -(-len(filenames) // jobs)
+    chunks = [(filenames[n:n + chunk], block_numbers[n:n + chunk]) for n in range(0, len(filenames), chunk)]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(check_blocks, *zip(*chunks))
+        return [status for statuses in results for status in statuses]
+
+
+def verify_track(base_filename, start_block=0, end_block=358, jobs=1,
+                 cache: TableCache | None = None) -> list[BlockStatus]:
+    """
+    Check the CRC of every block file of a track, returning a BlockStatus
+    with the block's address ranges for each block found. With `jobs` above
+    one, uncached blocks are checked in a process pool.
+    """
+    block_numbers = [block_n for block_n in range(start_block, end_block)
+                     if os.path.exists(block_filename(base_filename, block_n))]
+    filenames = [block_filename(base_filename, block_n) for block_n in block_numbers]
+
+    statuses = {}
+    if cache:
+        hashes = dict(zip(block_numbers, cache.file_hashes(filenames)))
+        index = cache.read_json(VERIFY_INDEX, {})
+        for block_n in block_numbers:
+            entry = index.get(hashes[block_n])
+            if entry:
+                stored_crc, computed_crc, ranges = entry
+                statuses[block_n] = BlockStatus(block_n, stored_crc, computed_crc, [tuple(r) for r in ranges])
+
+    unchecked = [n for n, block_n in enumerate(block_numbers) if block_n not in statuses]
+    unchecked_files = [filenames[n] for n in unchecked]
+    unchecked_blocks = [block_numbers[n] for n in unchecked]
+    if jobs > 1 and len(unchecked) > 1:
+        checked = _check_blocks_parallel(unchecked_files, unchecked_blocks, jobs)
+    else:
+        checked = check_blocks(unchecked_files, unchecked_blocks)
+
+    for status in checked:
+        statuses[status.block] = status
+
+    if cache and checked:
+        for status in checked:
+            index[hashes[status.block]] = [status.stored_crc, status.computed_crc, status.ranges]
+        cache.write_json(VERIFY_INDEX, index)
+
+    return [statuses[block_n] for block_n in block_numbers]
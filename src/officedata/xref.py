@@ -0,0 +1,129 @@
+"""
+Reverse cross-reference from scan point, TEN and DTA values to their owners.
+
+The index is built from the bulk decodes of the service and trunk member
+lists and the scan point translator, and kept as one structured array sorted
+by (kind, value), so every lookup is a binary search.
+
+Scan point fields come in several encodings, and each encoding has its own
+kind. "scanpoint" is the packed scanner/row/column number of line
+subtranslator entries and trunk members (`image_tools.decode_scanpoint`),
+so one physical scan point is found through either. The 8-bit service
+member scan point bytes and the 9-bit universal tone and supervisory scan
+point fields are kept as raw values under "svc_scanpoint" and
+"univ_scanpoint".
+"""
+
+import numpy as np
+import numpy.typing as npt
+
+from .odd import SUBTRANSLATOR_COLUMNS
+
+KINDS = ("scanpoint", "ten", "dta", "svc_scanpoint", "univ_scanpoint")
+# Owners: service and trunk circuit members, and universal and line
+# subtranslator entries. Translator entries are owned by their head table and
+# subtranslator index (W, X), stored in the group and member fields.
+SOURCES = ("service", "trunk", "universal", "line")
+
+XREF_DTYPE = np.dtype([
+    ("kind", np.int8),          # index into KINDS
+    ("value", np.int32),
+    ("source", np.int8),        # index into SOURCES
+    ("table", np.int8),         # trunk table number, otherwise -1
+    ("group", np.int32),
+    ("member", np.int32),
+    ("address", np.int32),
+])
+
+
+def _entries(kind: str, source: str, values, group, member, address, table=-1) -> npt.NDArray:
+    entries = np.empty(len(values), dtype=XREF_DTYPE)
+    entries["kind"] = KINDS.index(kind)
+    entries["value"] = values
+    entries["source"] = SOURCES.index(source)
+    entries["table"] = table
+    entries["group"] = group
+    entries["member"] = member
+    entries["address"] = address
+    return entries
+
+
+def _keys(kind, value) -> npt.NDArray[np.int64]:
+    return (np.asarray(kind, dtype=np.int64) << 32) | np.asarray(value, dtype=np.int64)
+
+
+class CrossReference:
+    """Sorted owner entries with binary search lookups by kind and value."""
+
+    def __init__(self, entries: npt.NDArray):
+        order = np.lexsort((entries["address"], entries["value"], entries["kind"]))
+        self.entries = entries[order]
+        self._keys = _keys(self.entries["kind"], self.entries["value"])
+
+    @classmethod
+    def build(cls, service_members: npt.NDArray, trunk_members: npt.NDArray,
+              spn_columns: SUBTRANSLATOR_COLUMNS) -> "CrossReference":
+        """
+        Index the members from `bulk.decode_service_members` and
+        `bulk.decode_office_trunks`, and the translator entries from
+        `SPN_HEAD_TABLE.enumerate_entries`. Members and entries that are not
+        loaded are left out.
+        """
+        parts = []
+
+        svc = service_members[service_members["loaded"]]
+        for kind, field, selected in (("ten", "ten", svc["format"] == 1),
+                                      ("svc_scanpoint", "scanpoint", svc["format"] == 2),
+                                      ("dta", "dta", svc["format"] == 2)):
+            members = svc[selected]
+            parts.append(_entries(kind, "service", members[field], members["group"], members["member"],
+                                  members["address"]))
+
+        trunks = trunk_members[trunk_members["loaded"]]
+        for kind, field in (("scanpoint", "spn"), ("dta", "dta")):
+            parts.append(_entries(kind, "trunk", trunks[field], trunks["group"], trunks["member"], trunks["address"],
+                                  table=trunks["table"]))
+
+        columns = spn_columns
+        for kind, source, field in (("ten", "universal", columns.ten),
+                                    ("univ_scanpoint", "universal", columns.tone_scanpoint),
+                                    ("univ_scanpoint", "universal", columns.supv_scanpoint),
+                                    ("scanpoint", "line", columns.scanpoint)):
+            selected = columns.loaded & (field >= 0)
+            parts.append(_entries(kind, source, field[selected], columns.w_index[selected],
+                                  columns.x_index[selected], columns.address[selected]))
+
+        return cls(np.concatenate(parts))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, kind: str, value: int) -> npt.NDArray:
+        """Every owner of `value`, as a slice of the sorted entries."""
+        if kind not in KINDS:
+            raise ValueError(f"Kind must be one of {', '.join(KINDS)}")
+        key = _keys(KINDS.index(kind), value)
+        start, end = np.searchsorted(self._keys, [key, key + 1])
+        return self.entries[start:end]
+
+    def lookup_many(self, kind: str, values: npt.ArrayLike) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+        """
+        Owners of an array of values. Returns the start and end of each
+        value's owners in `entries`.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Kind must be one of {', '.join(KINDS)}")
+        keys = _keys(KINDS.index(kind), values)
+        return np.searchsorted(self._keys, keys), np.searchsorted(self._keys, keys + 1)
+
+    def save(self, filename: str):
+        """Write the index as a .npy file."""
+        with open(filename, "wb") as f:
+            np.save(f, self.entries, allow_pickle=False)
+
+    @classmethod
+    def load(cls, filename: str) -> "CrossReference":
+        entries = np.load(filename, allow_pickle=False)
+        if entries.dtype != XREF_DTYPE:
+            raise ValueError(f"{filename} is not a cross-reference index")
+        return cls(entries)
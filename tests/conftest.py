@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def cache_directory(tmp_path_factory, monkeypatch):
+    """Keep the decoded table cache out of the user's cache directory."""
+    directory = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv("ODD_CACHE_DIR", str(directory))
+    return directory
@@ -0,0 +1,215 @@
+"""Synthetic office data for tests and benchmarks.
+
+The real tape images are not distributed with the repository, so this module
+builds a small office with the same table layout (Figures 2, 12 and 15) and can
+write it out as tape block files that `load_track` understands.
+"""
+
+import os
+import random
+
+import fastcrc
+import numpy as np
+
+from officedata.image_tools import DataRange, DataRangeSet
+
+BLOCK_WORDS = 832
+HEADER_LIMIT = 828
+
+GRPTBL_BASE = 0o421410
+MEMLST_BASE = 0o421424
+SPTBL_BASE = 0o421443
+
+SVC_TABLE = 0o500000
+TRUNK_LOW_TABLE = 0o510000
+TRUNK_HIGH_TABLE = 0o520000
+MEMLST_PBX = 0o530000
+MEMLST_SVC = 0o531000
+MEMLST_TRUNKS_LOW = 0o540000
+MEMLST_TRUNKS_HIGH = 0o550000
+SPN_HEAD = 0o600000
+
+
+def header_entry(count, pointer, header=0):
+    """Three word GRPTBL/MEMLST style header: header, count and 20-bit pointer."""
+    return [header, (count << 4) | ((pointer >> 16) & 0xf), pointer & 0xffff]
+
+
+class SyntheticOffice:
+    """Sparse memory image that can be cut into ranges or tape blocks."""
+
+    def __init__(self):
+        self.memory = {}
+
+    def put(self, address, words):
+        for n, word in enumerate(words):
+            self.memory[address + n] = int(word) & 0xffff
+
+    def extents(self):
+        """Return (start, words) for every maximal contiguous extent."""
+        extents = []
+        for address in sorted(self.memory):
+            if extents and extents[-1][0] + len(extents[-1][1]) == address:
+                extents[-1][1].append(self.memory[address])
+            else:
+                extents.append((address, [self.memory[address]]))
+        return extents
+
+    def fragments(self, max_length=100):
+        """Split the memory into address ordered (start, words) fragments."""
+        fragments = []
+        for start, words in self.extents():
+            for offset in range(0, len(words), max_length):
+                fragments.append((start + offset, words[offset:offset + max_length]))
+        return fragments
+
+    def range_set(self, max_length=100):
+        return DataRangeSet([DataRange(start, np.array(words, dtype=np.uint16))
+                             for start, words in self.fragments(max_length)])
+
+    def blocks(self, max_length=100):
+        """Pack the fragments into lists of fragments that fit in a tape block."""
+        blocks = [[]]
+        used = 2
+        for start, words in self.fragments(max_length):
+            if used + len(words) + 2 > HEADER_LIMIT:
+                blocks.append([])
+                used = 2
+            blocks[-1].append((start, words))
+            used += len(words) + 2
+        return blocks
+
+    def write_track(self, directory, start_block=167, max_length=100):
+        """Write tape block files; returns the block numbers written."""
+        block_numbers = []
+        for n, fragments in enumerate(self.blocks(max_length)):
+            block_n = start_block + n
+            write_block_file(os.path.join(directory, f"{block_n:04d}.bin"),
+                             build_block(block_n, fragments))
+            block_numbers.append(block_n)
+        return block_numbers
+
+
+def block_crc(block):
+    return fastcrc.crc16.arc(block[1:-2].astype("<u2").tobytes())
+
+
+def build_block(block_n, fragments):
+    """Build a tape block holding the (start, words) fragments, with a valid CRC."""
+    block = np.zeros(BLOCK_WORDS, dtype=np.uint16)
+    block[0] = block_n
+    next_header = 2
+    for start, words in fragments:
+        length = len(words)
+        block[next_header] = (length << 4) | ((start >> 16) & 0xf)
+        block[next_header + 1] = start & 0xffff
+        block[next_header + 2:next_header + 2 + length] = words
+        next_header += length + 2
+    assert next_header <= HEADER_LIMIT, "Fragments do not fit in a block"
+    block[-2] = block_crc(block)
+    return block
+
+
+def write_block_file(filename, block):
+    with open(filename, "wb") as f:
+        f.write(np.asarray(block, dtype=">u2").tobytes())
+
+
+def random_track(directory, n_blocks=150, start_block=167, seed=0):
+    """Write blocks filled with random words covering consecutive addresses."""
+    rng = np.random.default_rng(seed)
+    address = 0o100000
+    for block_n in range(start_block, start_block + n_blocks):
+        fragments = []
+        for length in (400, 200, 218):
+            fragments.append((address, rng.integers(0, 0x10000, length, dtype=np.uint16)))
+            address += length
+        write_block_file(os.path.join(directory, f"{block_n:04d}.bin"), build_block(block_n, fragments))
+
+
+def build_office(n_svc_groups=24, n_trunk_groups=16, n_spn_heads=6, seed=1):
+    """
+    Build a synthetic office with service and trunk group tables, member lists
+    and a scan point translator. Returns the SyntheticOffice.
+    """
+    rnd = random.Random(seed)
+    office = SyntheticOffice()
+
+    # Master table entries: GRPTBL, MEMLST, one unused entry and SPTBL.
+    office.put(GRPTBL_BASE, header_entry(0, 0)
+               + header_entry(n_svc_groups, SVC_TABLE)
+               + header_entry(n_trunk_groups, TRUNK_LOW_TABLE)
+               + header_entry(n_trunk_groups, TRUNK_HIGH_TABLE))
+    office.put(MEMLST_BASE, header_entry(0, MEMLST_PBX)
+               + header_entry(0o777, MEMLST_SVC)
+               + header_entry(0o777, MEMLST_TRUNKS_LOW)
+               + header_entry(0o777, MEMLST_TRUNKS_HIGH))
+    office.put(MEMLST_BASE + 12, header_entry(0, 0))
+    office.put(SPTBL_BASE, header_entry(127, SPN_HEAD))
+    office.put(MEMLST_PBX, [0])
+
+    # Service groups (Figure 12C) and their member lists (Figure 15C).
+    member_list_index = 0
+    for n in range(n_svc_groups):
+        n_members = 2 * rnd.randint(1, 6)
+        n_spares = rnd.randint(0, 2)
+        highest_member = n_members - 1
+        group_format = 1 if n % 3 == 0 else 2
+        exists = n % 5 != 4
+        office.put(SVC_TABLE + 4 * n, [(rnd.randint(0, 1) << 8) | (exists << 7) | highest_member,
+                                       rnd.randint(0, 0x3fff),
+                                       member_list_index,
+                                       rnd.randint(0, 0x1f)])
+        words = [(group_format << 14) | (n_members << 7) | n_spares]
+        if group_format == 1:
+            words += [rnd.randint(0, 0xfff) for _ in range(n_members)]
+        else:
+            scanpoints = [rnd.randint(0, 0xff) for _ in range(n_members)]
+            words += [scanpoints[m] | (scanpoints[m + 1] << 8) for m in range(0, n_members, 2)]
+            words += [(rnd.randint(0, 0x1f) << 11) | rnd.randint(0, 0x7ff) for _ in range(n_members)]
+        office.put(MEMLST_SVC + member_list_index, words)
+        member_list_index += len(words)
+
+    # Trunk groups (Figure 12D) and trunk circuit member lists.
+    for table, memlst in ((TRUNK_LOW_TABLE, MEMLST_TRUNKS_LOW), (TRUNK_HIGH_TABLE, MEMLST_TRUNKS_HIGH)):
+        member_list_index = 0
+        for n in range(n_trunk_groups):
+            n_members = rnd.randint(1, 8)
+            highest_member = n_members - 1
+            exists = n % 4 != 3
+            office.put(table + 8 * n, [(rnd.randint(0, 1) << 8) | (exists << 7) | highest_member,
+                                       rnd.randint(0, 0x3fff),
+                                       member_list_index,
+                                       rnd.randint(0, 0x1f),
+                                       0, 0, 0, 0])
+            words = [(n_members << 7)]
+            for _ in range(n_members):
+                words += [rnd.randint(0, 0x1fff), (rnd.randint(0, 0x1f) << 11) | rnd.randint(0, 0x7ff)]
+            office.put(memlst + member_list_index, words)
+            member_list_index += len(words)
+
+    # Scan point number translator (Figure 2): head table then subtranslators.
+    head = [0] * 127
+    subtranslator_address = SPN_HEAD + 127
+    sub_types = [2, 3, 1]
+    for n in range(n_spn_heads):
+        w_index = 2 * n + 1
+        sub_type = sub_types[n % 3]
+        head[w_index] = (sub_type << 14) | (subtranslator_address - SPN_HEAD - w_index)
+        if sub_type == 1:
+            office.put(subtranslator_address, [rnd.randint(0, 0xffff) for _ in range(64)])
+            subtranslator_address += 64
+            continue
+
+        for _ in range(64):
+            if sub_type == 2:
+                u_type = rnd.choice([1, 2, 3, 4, 5])
+                words = [(u_type << 13) | rnd.randint(0, 0x1ff), rnd.randint(0, 0xffff)]
+            else:
+                u_type = rnd.choice([10, 11, 12])
+                words = [(u_type << 12) | rnd.randint(0, 0xfff), rnd.randint(0, 0xffff)]
+            office.put(subtranslator_address, words)
+            subtranslator_address += 2
+    office.put(SPN_HEAD, head)
+
+    return office
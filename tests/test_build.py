@@ -1,6 +1,7 @@
 """Test building the office data tree from the disk image"""
 
-from officedata.odd import load_track, GRPTBL
+from officedata.image_tools import load_track
+from officedata.odd import GRPTBL
 
 
 def test_build_tree():
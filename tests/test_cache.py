@@ -0,0 +1,62 @@
+"""Test the decoded table cache"""
+
+import os
+
+import numpy as np
+from synthetic import SPN_HEAD, build_block, build_office, write_block_file
+
+from officedata.cache import TableCache
+from officedata.office import Office
+
+
+def load(track, cache):
+    return Office.load(str(track), 167, 317, cache=cache)
+
+
+def test_hits_and_misses(tmp_path, cache_directory):
+
+    build_office().write_track(tmp_path)
+
+    cache = TableCache()
+    first = load(tmp_path, cache)
+    groups = repr(first.grptbl.svc_table.groups)
+    assert first.sptbl.spn_head_table_address == SPN_HEAD
+    assert (cache.stats.hits, cache.stats.misses) == (0, 2)
+
+    second = load(tmp_path, cache)
+    assert repr(second.grptbl.svc_table.groups) == groups
+    assert second.grptbl.range_set is second.data
+    assert second.sptbl.spn_head.data is second.data
+    assert (cache.stats.hits, cache.stats.misses) == (2, 2)
+    assert TableCache(str(cache_directory)).total_stats().hits == 2
+
+
+def test_touched_file_rehashed(tmp_path):
+
+    build_office().write_track(tmp_path)
+    cache = TableCache()
+    groups = repr(load(tmp_path, cache).grptbl.svc_table.groups)
+
+    os.utime(tmp_path / "0167.bin", ns=(0, 0))
+    hashed = cache.stats.files_hashed
+    assert repr(load(tmp_path, cache).grptbl.svc_table.groups) == groups
+    assert cache.stats.files_hashed == hashed + 1
+    assert cache.stats.hits == 1
+
+
+def test_patched_block_invalidates(tmp_path):
+
+    build_office().write_track(tmp_path)
+    cache = TableCache()
+    groups = repr(load(tmp_path, cache).grptbl.svc_table.groups)
+
+    write_block_file(tmp_path / "0168_patched.bin", build_block(168, [(0o100, np.zeros(4, dtype=np.uint16))]))
+    assert repr(load(tmp_path, cache).grptbl.svc_table.groups) == groups
+    assert (cache.stats.hits, cache.stats.misses) == (0, 2)
+
+
+def test_no_cache(tmp_path):
+
+    build_office().write_track(tmp_path)
+    office = Office.load(str(tmp_path), 167, 317, cache=None)
+    assert len(office.grptbl.svc_table.groups) == 24
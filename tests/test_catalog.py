@@ -0,0 +1,66 @@
+"""Test the block catalog"""
+
+import os
+
+import numpy as np
+from synthetic import build_office, write_block_file
+
+from officedata import catalog as catalog_module
+from officedata.catalog import BlockCatalog, catalog_filename
+from officedata.image_tools import load_block
+
+
+def test_catalog_matches_blocks(tmp_path):
+
+    office = build_office()
+    blocks = office.write_track(tmp_path)
+    catalog = BlockCatalog.build(tmp_path, 167, 317)
+
+    assert catalog.block_numbers() == blocks
+    assert catalog.corrupt_blocks() == []
+    for block_n, fragments in zip(blocks, office.blocks()):
+        assert [(int(r["start_address"]), int(r["length"])) for r in catalog.block_ranges(block_n)] == \
+            [(start, len(words)) for start, words in fragments]
+    assert catalog.block(blocks[-1] + 1) is None
+
+    parallel = BlockCatalog.build(tmp_path, 167, 317, jobs=2)
+    assert (parallel.blocks == catalog.blocks).all() and (parallel.ranges == catalog.ranges).all()
+
+    for address in sorted(office.memory)[::11]:
+        located = catalog.locate(address)
+        assert len(located) == 1
+        entry = located[0]
+        assert entry["start_address"] <= address < entry["start_address"] + entry["length"]
+        block = load_block(tmp_path / f"{entry['block']:04d}.bin")
+        assert block[entry["offset_in_block"] + address - entry["start_address"]] == office.memory[address]
+    assert len(catalog.locate(0o7777777)) == 0
+
+
+def test_catalog_file(tmp_path, cache_directory, monkeypatch):
+
+    office = build_office()
+    blocks = office.write_track(tmp_path)
+    catalog = BlockCatalog.load_or_build(tmp_path, 167, 317)
+    # The catalog is kept in the cache directory, not next to the block files
+    assert os.path.exists(catalog_filename(tmp_path))
+    assert os.path.commonpath([catalog_filename(tmp_path), str(cache_directory)]) == str(cache_directory)
+    assert sorted(os.listdir(tmp_path)) == [f"{block_n:04d}.bin" for block_n in blocks]
+
+    loaded = []
+    original_load_block = catalog_module.load_block
+    monkeypatch.setattr(catalog_module, "load_block",
+                        lambda filename: loaded.append(filename) or original_load_block(filename))
+    reloaded = BlockCatalog.load_or_build(tmp_path, 167, 317)
+    assert loaded == []
+    assert (reloaded.ranges == catalog.ranges).all()
+
+    # A changed block file makes the catalog stale
+    filename = tmp_path / f"{blocks[1]:04d}.bin"
+    block = load_block(filename)
+    block[10] ^= 1
+    write_block_file(filename, block)
+    os.utime(filename, ns=(0, 0))
+    rebuilt = BlockCatalog.load_or_build(tmp_path, 167, 317)
+    assert len(loaded) == len(blocks)
+    assert rebuilt.corrupt_blocks() == [blocks[1]]
+    assert np.array_equal(rebuilt.ranges, catalog.ranges)
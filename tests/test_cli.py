@@ -0,0 +1,301 @@
+"""Test the odd command line interface against a synthetic office"""
+
+import json
+import os
+
+from synthetic import build_office
+from typer.testing import CliRunner
+
+from officedata.cli import main
+
+runner = CliRunner()
+
+
+def test_convert_and_open_image(tmp_path):
+
+    build_office().write_track(tmp_path)
+    image = str(tmp_path / "office.odi")
+
+    result = runner.invoke(main, ["convert", image, "--track-directory", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    assert "Wrote" in result.output
+
+    result = runner.invoke(main, ["grptable", "65", "--image", image])
+    assert result.exit_code == 0, result.output
+    assert "SERVICE_GROUP_entry(grp_num=65" in result.output
+
+    result = runner.invoke(main, ["grptable", "65", "--track-directory", str(tmp_path), "--no-cache"])
+    assert result.exit_code == 0, result.output
+    assert "SERVICE_GROUP_entry(grp_num=65" in result.output
+
+    lazy = runner.invoke(main, ["grptable", "65", "--track-directory", str(tmp_path), "--no-cache", "--lazy"])
+    assert lazy.exit_code == 0, lazy.output
+    assert lazy.output == result.output
+
+    coalesced = runner.invoke(main, ["grptable", "65", "--track-directory", str(tmp_path), "--no-cache", "--coalesce"])
+    assert coalesced.exit_code == 0, coalesced.output
+    stats, = [line for line in coalesced.output.splitlines() if line.startswith("Coalesced ")]
+    assert coalesced.output.replace(stats + "\n", "") == result.output
+    extents = len(build_office().extents())
+    assert stats == f"Coalesced {len(build_office().fragments())} fragments into {extents} extents " \
+                    f"({len(build_office().fragments()) - extents} merged)"
+
+    result = runner.invoke(main, ["grptable", "65", "--image", image, "--coalesce"])
+    assert result.exit_code == 2
+
+    result = runner.invoke(main, ["blocks", "--image", image])
+    assert result.exit_code == 0, result.output
+    assert result.output.startswith("Block 167: 0o")
+
+
+def test_scanpoints_batch(tmp_path):
+
+    build_office().write_track(tmp_path)
+    batch = "# audit\n000100\nten,000101\noe 000300\n\n000600\n"
+
+    result = runner.invoke(main, ["scanpoints", "--batch", "-", "--track-directory", str(tmp_path), "--format", "jsonl"],
+                           input=batch)
+    assert result.exit_code == 0, result.output
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert [(record["kind"], record["number"]) for record in records] == [("oe", "000100"), ("ten", "000101"),
+                                                                           ("oe", "000300"), ("oe", "000600")]
+    assert records[0]["status"] == "ok" and records[0]["sub_type"] == 2
+    assert records[3]["status"] == "unassigned"
+
+    result = runner.invoke(main, ["scanpoints", "--batch", "-", "--track-directory", str(tmp_path)], input=batch)
+    assert result.exit_code == 0, result.output
+    assert result.output.splitlines()[0].startswith("kind,number,status,sub_type,address")
+    assert len(result.output.splitlines()) == 5
+
+
+def test_scanpoints_batch_validation(tmp_path):
+
+    result = runner.invoke(main, ["scanpoints", "--batch", "-", "--track-directory", str(tmp_path)],
+                           input="000100\n12345\nfoo 000100\n")
+    assert result.exit_code != 0
+    assert "line 2" in result.output and "line 3" in result.output
+
+    # Nothing is looked up, or reported as unassigned, when any line is malformed
+    build_office().write_track(tmp_path)
+    for number in ("0o1234", "+12345", "12_345", "-12345", "770000", "ten 770000"):
+        result = runner.invoke(main, ["scanpoints", "--batch", "-", "--track-directory", str(tmp_path)],
+                               input=f"000100\n{number}\n")
+        assert result.exit_code == 2, (number, result.output)
+        assert "line 2" in result.output and "Traceback" not in result.output
+        assert "unassigned" not in result.output
+
+    # Single lookups beyond the head table or of unassigned words are rejected without a traceback
+    for option, number, message in (("--oe", "777777", "beyond the 127 word head table"),
+                                    ("--ten", "000100", "Unassigned subtranslator")):
+        result = runner.invoke(main, ["scanpoints", option, number, "--track-directory", str(tmp_path)])
+        assert result.exit_code == 2, (number, result.output)
+        assert message in result.output and "Traceback" not in result.output
+
+
+def test_spn_dump(tmp_path):
+
+    build_office().write_track(tmp_path)
+
+    result = runner.invoke(main, ["spn-dump", "--format", "jsonl", "--track-directory", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert len(records) == 6 * 64
+    assert {record["sub_type"] for record in records} == {1, 2, 3}
+    assert all(record["status"] == "ok" for record in records)
+
+    # The OE keys lead back to the same entries.
+    result = runner.invoke(main, ["scanpoints", "--batch", "-", "--format", "jsonl", "--track-directory", str(tmp_path)],
+                           input="".join(f"{record['oe']}\n" for record in records))
+    assert [json.loads(line)["address"] for line in result.output.splitlines()] == [record["address"] for record in records]
+
+    # So do the TEN keys, which the universal subtranslator's ten field does not overwrite
+    by_oe = {record["oe"]: record for record in records}
+    assert (by_oe["000100"]["ten_number"], by_oe["000101"]["ten_number"]) == ("001000", "001001")
+    assert by_oe["000101"]["sub_type"] == 2 and "ten" in by_oe["000101"]
+    result = runner.invoke(main, ["scanpoints", "--batch", "-", "--batch-kind", "ten", "--format", "jsonl",
+                                  "--track-directory", str(tmp_path)],
+                           input="".join(f"{record['ten_number']}\n" for record in records))
+    assert [json.loads(line)["address"] for line in result.output.splitlines()] == [record["address"] for record in records]
+
+    result = runner.invoke(main, ["spn-dump", "--include-unassigned", "--track-directory", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    assert result.output.splitlines()[0].startswith("w_index,x_index,oe,ten_number,spn,status,sub_type")
+    assert len(result.output.splitlines()) == 1 + 127 * 64
+
+
+def test_xref(tmp_path):
+
+    build_office().write_track(tmp_path)
+    trunks = runner.invoke(main, ["trunks", "--group", "129", "--format", "jsonl", "--track-directory", str(tmp_path)])
+    member = json.loads(trunks.output.splitlines()[0])
+
+    result = runner.invoke(main, ["xref", "--scanpoint", member["spn"], "--dta", str(member["dta"]),
+                                  "--format", "jsonl", "--track-directory", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert {record["kind"] for record in records} == {"scanpoint", "dta"}
+    assert all(any(record["source"] == "trunk" and record["address"] == member["address"]
+                   for record in records if record["kind"] == kind) for kind in ("scanpoint", "dta"))
+
+    index = str(tmp_path / "xref.npy")
+    result = runner.invoke(main, ["xref", "--save", index, "--track-directory", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+
+    result = runner.invoke(main, ["xref", "--dta", str(member["dta"]), "--index", index])
+    assert result.exit_code == 0, result.output
+    assert f"DTA {member['dta']}: trunk group 129 (low) member {member['member']} addr {member['address']}" in result.output
+
+    result = runner.invoke(main, ["xref", "--scanpoint", "1 2", "--index", index])
+    assert result.exit_code != 0
+
+    result = runner.invoke(main, ["xref", "--svc-scanpoint", "400", "--index", index])
+    assert result.exit_code != 0
+    result = runner.invoke(main, ["xref", "--univ-scanpoint", "0", "--svc-scanpoint", "0", "--index", index])
+    assert result.exit_code == 0, result.output
+
+
+def test_verify(tmp_path):
+
+    blocks = build_office().write_track(tmp_path)
+    result = runner.invoke(main, ["verify", "--track-directory", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    assert result.output == f"{len(blocks)} blocks checked, 0 corrupt\n"
+
+    filename = tmp_path / f"{blocks[1]:04d}.bin"
+    data = bytearray(filename.read_bytes())
+    data[40] ^= 1
+    filename.write_bytes(bytes(data))
+
+    result = runner.invoke(main, ["verify", "--track-directory", str(tmp_path), "--jobs", "2"])
+    assert result.exit_code == 1
+    assert result.output.startswith(f"Block {blocks[1]}: CRC mismatch, stored ")
+    assert "; ranges 0o" in result.output
+
+
+def test_svc_report(tmp_path):
+
+    build_office().write_track(tmp_path)
+
+    result = runner.invoke(main, ["svc-report", "--track-directory", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    assert result.output.startswith("Group 64 Member 0 TEN ")
+    assert "Group 65 Member 0 SVCNBR " in result.output
+
+    result = runner.invoke(main, ["svc-report", "--group", "65", "--format", "jsonl", "--track-directory", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    assert {json.loads(line)["group"] for line in result.output.splitlines()} == {65}
+
+
+def test_trunks(tmp_path):
+
+    build_office().write_track(tmp_path)
+
+    result = runner.invoke(main, ["trunks", "--track-directory", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    assert result.output.startswith("GROUP 128 (low)")
+    assert "GROUP 128, MEMBER 0, SPN " in result.output
+    assert "(high)" in result.output
+
+    result = runner.invoke(main, ["trunks", "--group", "129", "--format", "csv", "--track-directory", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    lines = result.output.splitlines()
+    assert lines[0] == "table,group,member,loaded,address,spn,dta,ckt_code"
+    assert all(",129," in line for line in lines[1:])
+
+
+def test_blocks(tmp_path):
+
+    office = build_office()
+    blocks = office.write_track(tmp_path)
+
+    result = runner.invoke(main, ["blocks", "--track-directory", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    lines = result.output.splitlines()
+    assert len([line for line in lines if line.startswith(f"Block {blocks[0]}:")]) == len(office.blocks()[0])
+    assert f"Block {blocks[-1] + 1} no data" in lines
+    assert not [name for name in os.listdir(tmp_path) if not name.endswith(".bin")]
+
+    address = sorted(office.memory)[100]
+    result = runner.invoke(main, ["blocks", "--address", f"{address:o}", "--track-directory", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    assert len(result.output.splitlines()) == 1 and result.output.startswith("Block ")
+
+    result = runner.invoke(main, ["blocks", "--address", "3777777", "--track-directory", str(tmp_path)])
+    assert result.exit_code == 1
+
+    # An image lists the CRC status recorded when it was converted
+    block_file = tmp_path / f"{blocks[1]:04d}.bin"
+    raw = bytearray(block_file.read_bytes())
+    raw[100] ^= 0xff
+    block_file.write_bytes(bytes(raw))
+    image = str(tmp_path / "office.odi")
+    assert runner.invoke(main, ["convert", image, "--track-directory", str(tmp_path)]).exit_code == 0
+    result = runner.invoke(main, ["blocks", "--image", image])
+    assert result.exit_code == 0, result.output
+    mismatched = {line.split(":")[0] for line in result.output.splitlines() if line.endswith("CRC mismatch")}
+    assert mismatched == {f"Block {blocks[1]}"}
+
+
+def test_search(tmp_path):
+
+    office = build_office()
+    office.write_track(tmp_path)
+    address = sorted(office.memory)[300]
+    words = [office.memory[address + n] for n in range(3)]
+
+    result = runner.invoke(main, ["search", "--sequence", " ".join(f"{word:o}" for word in words),
+                                  "--track-directory", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    assert f"{address:o}: {words[0]:06o}" in result.output.splitlines()
+
+    result = runner.invoke(main, ["search", "--pointers-to", "600000-610000", "--limit", "3", "--format", "jsonl",
+                                  "--track-directory", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert len(records) == 3 and all(0o600000 <= int(record["target"], base=8) < 0o610000 for record in records)
+
+    result = runner.invoke(main, ["search", "--value", "1", "--sequence", "1 2", "--track-directory", str(tmp_path)])
+    assert result.exit_code != 0
+
+    result = runner.invoke(main, ["search", "--value", "0", "--mask", "0", "--limit", "-1",
+                                  "--track-directory", str(tmp_path)])
+    assert result.exit_code == 2 and "--limit" in result.output
+
+    # A lazy track would read every block for a search anyway
+    result = runner.invoke(main, ["search", "--value", "0", "--lazy", "--track-directory", str(tmp_path)])
+    assert result.exit_code == 2 and "--lazy" in result.output
+
+
+def test_tables(tmp_path):
+
+    build_office().write_track(tmp_path)
+    graph = str(tmp_path / "graph.json")
+
+    result = runner.invoke(main, ["tables", "--save", graph, "--format", "jsonl", "--track-directory", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    records = {record["name"]: record
+               for record in map(json.loads, (line for line in result.output.splitlines() if line.startswith("{")))}
+    assert records["svc_groups"]["address"] == "500000" and records["svc_groups"]["pointers"] == "grptbl@421413"
+
+    result = runner.invoke(main, ["tables", "--graph", graph])
+    assert result.exit_code == 0, result.output
+    assert result.output.splitlines()[0].startswith("master_table_index")
+
+    # Lookups reuse the saved graph instead of crawling the office again
+    for command in (["grptable", "65"], ["scanpoints", "--oe", "000100"], ["svc-report", "--format", "csv"],
+                    ["trunks", "--format", "csv"]):
+        expected = runner.invoke(main, command + ["--track-directory", str(tmp_path), "--no-cache"])
+        assert expected.exit_code == 0, expected.output
+        result = runner.invoke(main, command + ["--track-directory", str(tmp_path), "--no-cache", "--graph", graph])
+        assert result.exit_code == 0, result.output
+        assert result.output == expected.output
+
+    # A graph that does not match the office is refused
+    stale = str(tmp_path / "stale.json")
+    with open(graph) as f:
+        saved = json.load(f)
+    next(table for table in saved["tables"] if table["name"] == "spn_head")["address"] += 1
+    with open(stale, "w") as f:
+        json.dump(saved, f)
+    result = runner.invoke(main, ["scanpoints", "--oe", "000100", "--track-directory", str(tmp_path), "--graph", stale])
+    assert result.exit_code == 2 and "slot 9" in result.output
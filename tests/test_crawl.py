@@ -0,0 +1,85 @@
+"""Test the table graph crawled from the master table index"""
+
+import pytest
+from synthetic import (GRPTBL_BASE, MEMLST_BASE, MEMLST_SVC, SPN_HEAD, SPTBL_BASE, SVC_TABLE, TRUNK_HIGH_TABLE,
+                       build_office, header_entry)
+
+from officedata.cache import TableCache
+from officedata.crawl import TableGraph, check_graph, crawl
+from officedata.odd import GRPTBL, MASTER_TABLE_INDEX, SPTBL
+from officedata.office import Office
+
+
+def test_master_table_index():
+
+    data = build_office().range_set()
+    master = MASTER_TABLE_INDEX.parse(data)
+    assert (master.slot_address(0), master.slot_address(4), master.slot_address(9)) == \
+           (GRPTBL_BASE, MEMLST_BASE, SPTBL_BASE)
+    assert master.entries[1].pointer == SVC_TABLE and master.entries[1].n_entries == 24
+
+    office = Office(data)
+    assert repr(office.grptbl.svc_table.groups) == repr(GRPTBL.parse(GRPTBL_BASE, data).svc_table.groups)
+    assert office.sptbl == SPTBL.find(SPTBL_BASE, data)
+
+    # A saved graph is used as is
+    graph = crawl(data)
+    office = Office(data, graph=graph)
+    assert office.table_graph is graph and office.sptbl == SPTBL.find(SPTBL_BASE, data)
+
+
+def test_crawl(tmp_path):
+
+    office = build_office(n_spn_heads=6)
+    # Point the unused master table slot at a table already found through the GRPTBL
+    office.put(MEMLST_BASE + 12, header_entry(16, TRUNK_HIGH_TABLE))
+    graph = crawl(office.range_set())
+
+    names = [table.name for table in graph.tables]
+    assert len(names) == len(set(names))
+    assert graph.table("svc_groups").address == SVC_TABLE and graph.table("svc_groups").length == 4 * 24
+    assert graph.table("trunk_groups_high").length == 8 * 16
+    assert graph.table("memlst_svc").address == MEMLST_SVC
+    assert graph.table("spn_head").address == SPN_HEAD and graph.table("spn_head").length == 127
+    assert "pbx_groups" not in graph
+
+    # The pointer to a visited table adds only an edge
+    assert "master_slot_8" not in graph
+    assert [(edge.source, edge.pointer_address) for edge in graph.sources("trunk_groups_high")] == \
+           [("grptbl", GRPTBL_BASE + 9), ("master_table_index", MEMLST_BASE + 12)]
+
+    subtranslators = [table for table in graph.targets("spn_head")]
+    assert [table.name for table in subtranslators] == ["univ_subtranslator_001", "line_subtranslator_003",
+                                                        "misc_subtranslator_005", "univ_subtranslator_007",
+                                                        "line_subtranslator_009", "misc_subtranslator_011"]
+    assert subtranslators[0].address == SPN_HEAD + 127 and all(table.loaded for table in subtranslators)
+    assert [table.name for table in graph.tables_at(SVC_TABLE + 5)] == ["svc_groups"]
+    assert [table.name for table in graph.tables_at(SPTBL_BASE)] == ["master_table_index", "sptbl"]
+
+    filename = str(tmp_path / "graph.json")
+    graph.save(filename)
+    assert TableGraph.load(filename) == graph
+    assert TableGraph.load(filename).table("spn_head") == graph.table("spn_head")
+
+
+def test_saved_graph(tmp_path):
+
+    build_office().write_track(tmp_path)
+    data = Office.load(str(tmp_path), 167, 317).data
+    graph = crawl(data)
+    check_graph(graph, data)
+
+    # A graph whose headers no longer match the office's master table index is refused
+    for name, field, value, message in (("svc_groups", "count", 23, "slot 1"),
+                                        ("spn_head", "address", SPN_HEAD + 1, "slot 9"),
+                                        ("master_table_index", "address", 0o100, "not loaded")):
+        stale = TableGraph.from_json(graph.to_json())
+        setattr(stale.table(name), field, value)
+        with pytest.raises(ValueError, match=message):
+            Office(data, graph=stale)
+
+    # Tables decoded at a saved graph's addresses are cached apart from those of a crawled one
+    cache = TableCache()
+    with_graph = Office.load(str(tmp_path), 167, 317, cache=cache, graph=graph)
+    assert with_graph.cache_key != Office.load(str(tmp_path), 167, 317, cache=cache).cache_key
+    assert with_graph.sptbl.spn_head_table_address == SPN_HEAD
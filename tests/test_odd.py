@@ -0,0 +1,226 @@
+"""Test the table parsers against a synthetic office"""
+
+import pickle
+
+import pytest
+from synthetic import (GRPTBL_BASE, MEMLST_BASE, MEMLST_SVC, MEMLST_TRUNKS_HIGH, SPN_HEAD, SPTBL_BASE, SVC_TABLE,
+                       TRUNK_LOW_TABLE, build_office)
+
+from officedata.bulk import decode_office_trunks, decode_service_members
+from officedata.image_tools import MemoryImage, decode_scanpoint
+from officedata.odd import (GRPTBL, LINE_SUBTRANSLATOR, MEMLST, MEMLST_SVC_GROUP, MISC_SUBTRANSLATOR, SPTBL,
+                            TRUNK_CIRCUIT_MEMBER_LIST_entry, TRUNK_GROUP_entry)
+
+
+def test_parse_uint16_pointers():
+    """Twenty bit pointers must survive uint16 words."""
+
+    data = build_office().range_set()
+
+    grptbl = GRPTBL.parse(GRPTBL_BASE, data)
+    assert grptbl.svc_table.table_address == SVC_TABLE
+    assert grptbl.trunk_table_low_address == TRUNK_LOW_TABLE
+    assert len(grptbl.svc_table.groups) == 24
+    assert type(grptbl.svc_table.groups[0].highest_member) is int
+
+    memlist = MEMLST.parse(data.range_starting_at_address(MEMLST_BASE))
+    assert memlist.memlist_svc.member_list_address == MEMLST_SVC
+
+    sptbl = SPTBL.find(SPTBL_BASE, data)
+    assert sptbl.spn_head_table_address == SPN_HEAD
+
+
+def test_parse_memory_image():
+    """The parsers give the same results on a flat MemoryImage."""
+
+    range_set = build_office().range_set()
+    image = MemoryImage.from_range_set(range_set)
+
+    grptbl_ranges = GRPTBL.parse(GRPTBL_BASE, range_set)
+    grptbl_image = GRPTBL.parse(GRPTBL_BASE, image)
+    assert repr(grptbl_ranges.svc_table.groups) == repr(grptbl_image.svc_table.groups)
+    assert grptbl_ranges.trunk_table_high_entries == grptbl_image.trunk_table_high_entries
+
+    memlist = MEMLST.parse(image.range_starting_at_address(MEMLST_BASE))
+    assert memlist.memlist_trunks_high.member_list_address == MEMLST_TRUNKS_HIGH
+
+    spn_ranges = SPTBL.find(SPTBL_BASE, range_set).spn_head
+    spn_image = SPTBL.find(SPTBL_BASE, image).spn_head
+    for w_index in (1, 3):
+        for x_index in range(64):
+            assert repr(spn_ranges._lookup_entry(w_index, x_index)) == repr(spn_image._lookup_entry(w_index, x_index))
+
+
+def test_lazy_grptbl():
+    """A lazy GRPTBL decodes groups only when they are reached, and then keeps them."""
+
+    data = build_office().range_set()
+    eager = GRPTBL.parse(GRPTBL_BASE, data)
+    lazy = GRPTBL.parse(GRPTBL_BASE, data, lazy=True)
+
+    groups = lazy.svc_table.groups
+    assert len(groups) == 24
+    assert groups.decoded_count == 0
+
+    entry = lazy.service_group(70)
+    assert entry.grp_num == 70
+    assert groups.decoded_count == 1
+    assert groups[6] is entry
+    assert groups[-18] is entry
+    assert repr(entry) == repr(eager.service_group(70))
+
+    assert lazy.trunk_group(130, "high") == eager.trunk_group(130, "high")
+    assert lazy.trunk_table_low_entries.decoded_count == 0
+    with pytest.raises(ValueError):
+        lazy.service_group(63)
+    with pytest.raises(IndexError):
+        groups[24]
+
+    assert repr(list(groups)) == repr(eager.svc_table.groups)
+    assert lazy.trunk_table_low_entries == eager.trunk_table_low_entries
+    assert lazy.trunk_table_high_entries[2:5] == eager.trunk_table_high_entries[2:5]
+
+    unpickled = pickle.loads(pickle.dumps(lazy))
+    assert unpickled.svc_table.groups.decoded_count == 24
+    assert repr(unpickled.service_group(87)) == repr(eager.service_group(87))
+
+
+def test_compact_records():
+    """Parsed entries are slotted and keep their words as ints rather than views."""
+
+    data = build_office().range_set()
+    entry = GRPTBL.parse(GRPTBL_BASE, data).service_group(64)
+    assert not hasattr(entry, "__dict__")
+    assert entry.words == tuple(int(word) for word in data.range_starting_at_address(SVC_TABLE, 4).words)
+    assert entry.data.start_address == SVC_TABLE
+    assert list(entry.data.words) == list(entry.words)
+
+    line = SPTBL.find(SPTBL_BASE, data).spn_head._lookup_entry(3, 0)
+    assert isinstance(line, LINE_SUBTRANSLATOR)
+    assert not hasattr(line, "__dict__")
+    assert line.data.start_address == line.address
+    assert repr(line).endswith(f"data=[0o{line.words[0]:o}, 0o{line.words[1]:o}]")
+
+
+def test_bulk_oe_lookup_matches_scalar():
+
+    def column(value):
+        return -1 if value is None else value
+
+    spn_head = SPTBL.find(SPTBL_BASE, build_office().range_set()).spn_head
+    oes = [f"000{sg:o}{sw:o}{lv:o}" for sg in range(8) for sw in range(8) for lv in range(8)]
+    columns = spn_head.lookup_oe_many(oes)
+    assert len(columns) == len(oes)
+    assert columns.loaded.sum() > 0
+
+    for n, oe in enumerate(oes):
+        if columns.sub_type[n] not in (2, 3):
+            continue
+        entry = spn_head.lookup_oe(oe)
+        assert entry.address == columns.address[n]
+        assert entry.u_type == columns.u_type[n]
+        if isinstance(entry, LINE_SUBTRANSLATOR):
+            assert column(entry.terminal) == columns.terminal[n]
+            assert column(entry.group) == columns.group[n]
+            if entry.scanpoint is not None:
+                assert decode_scanpoint(columns.scanpoint[n]) == entry.scanpoint
+        else:
+            assert column(entry.ten) == columns.ten[n]
+            assert column(entry.mem_number) == columns.mem_number[n]
+            assert column(entry.tone_scanpoint) == columns.tone_scanpoint[n]
+            assert column(entry.supv_scanpoint) == columns.supv_scanpoint[n]
+
+    assert list(spn_head.lookup_oe_many([int(oe, 8) for oe in oes]).address) == list(columns.address)
+
+
+def test_enumerate_spn_translator():
+    """One bulk pass over the whole translator matches the scalar lookups, misc entries included."""
+
+    spn_head = SPTBL.find(SPTBL_BASE, build_office().range_set()).spn_head
+    columns = spn_head.enumerate_entries()
+    assert len(columns) == 6 * 64
+    assert set(columns.w_index.tolist()) == {1, 3, 5, 7, 9, 11}
+    assert columns.loaded.all()
+
+    for n in range(len(columns)):
+        entry = spn_head._lookup_entry(int(columns.w_index[n]), int(columns.x_index[n]))
+        assert entry.address == columns.address[n]
+        if isinstance(entry, MISC_SUBTRANSLATOR):
+            assert columns.sub_type[n] == 1
+            assert entry.word == columns.word0[n]
+
+    oes = spn_head.oe_numbers(columns.w_index, columns.x_index)
+    tens = spn_head.ten_numbers(columns.w_index, columns.x_index)
+    scanner, row, col = spn_head.scanpoint_numbers(columns.w_index, columns.x_index)
+    assert list(spn_head.lookup_oe_many(oes).address) == list(columns.address)
+    assert list(spn_head.lookup_ten_many(tens).address) == list(columns.address)
+    assert list(spn_head.lookup_scanpoint_many(scanner, row, col).address) == list(columns.address)
+    assert spn_head.lookup_oe(f"{oes[70]:06o}").address == columns.address[70]
+
+    assert len(spn_head.enumerate_entries(include_unassigned=True)) == 127 * 64
+
+
+def test_bulk_lookup_validation():
+
+    spn_head = SPTBL.find(SPTBL_BASE, build_office().range_set()).spn_head
+    with pytest.raises(ValueError):
+        spn_head.lookup_ten_many(["12345"])
+    with pytest.raises(ValueError):
+        spn_head.lookup_oe_many(["777777"])
+    with pytest.raises(ValueError, match="Head table index"):
+        spn_head.lookup_oe("777777")
+
+
+def test_decode_service_members():
+    """The bulk decoder agrees with MEMLST_SVC_GROUP for every existing group."""
+
+    data = build_office().range_set()
+    grptbl = GRPTBL.parse(GRPTBL_BASE, data)
+    memlist = MEMLST.parse(data.range_starting_at_address(MEMLST_BASE))
+    members = decode_service_members(data, grptbl, memlist)
+    assert members["loaded"].all()
+
+    # Member lists straddle the synthetic ranges, so read them from a flat image.
+    image = MemoryImage.from_range_set(data)
+
+    expected = []
+    for entry in grptbl.svc_table.groups:
+        if not entry.exists:
+            continue
+        group = MEMLST_SVC_GROUP.parse(entry.highest_member, image.range_starting_at_address(
+            memlist.memlist_svc.member_list_address + entry.member_list_index))
+        for member_n, member in enumerate(group.members):
+            if group.group_format == 1:
+                expected.append((entry.grp_num, member_n, 1, member.ten, -1, -1, -1))
+            else:
+                expected.append((entry.grp_num, member_n, 2, -1, member.scanpoint, member.dta, member.cktcode))
+
+    decoded = [tuple(int(member[field]) for field in ("group", "member", "format", "ten", "scanpoint", "dta", "ckt_code"))
+               for member in members]
+    assert decoded == expected
+
+
+def test_trunk_groups_and_members():
+
+    data = build_office().range_set()
+    grptbl = GRPTBL.parse(GRPTBL_BASE, data)
+    memlist = MEMLST.parse(data.range_starting_at_address(MEMLST_BASE))
+
+    for n, entry in enumerate(grptbl.trunk_table_low_entries):
+        assert entry == TRUNK_GROUP_entry.parse(128 + n, data.range_starting_at_address(TRUNK_LOW_TABLE + 8*n, 8))
+
+    trunk_groups, trunk_members = decode_office_trunks(data, grptbl, memlist)
+    assert len(trunk_groups["high"]) == grptbl.trunk_table_high_entry_count
+    assert trunk_members["loaded"].all()
+
+    high = trunk_members[trunk_members["table"] == 1]
+    expected = []
+    for entry in grptbl.trunk_table_high_entries:
+        if not entry.exists:
+            continue
+        header = memlist.memlist_trunks_high.member_list_address + entry.member_list_index
+        for member_n in range(entry.highest_member + 1):
+            words = data.range_starting_at_address(header + 2*member_n + 1, 2).words
+            member = TRUNK_CIRCUIT_MEMBER_LIST_entry.parse_TRUNK_GROUP_entry(words)
+            expected.append((entry.grp_num, member_n, member.spn, member.ckt_code, member.dta))
+    assert [tuple(int(m[f]) for f in ("group", "member", "spn", "ckt_code", "dta")) for m in high] == expected
@@ -0,0 +1,64 @@
+"""Test writing and memory mapping office images"""
+
+import os
+
+import numpy as np
+import pytest
+from synthetic import GRPTBL_BASE, build_office
+
+from officedata.image_tools import load_track
+from officedata.odd import GRPTBL
+from officedata.office_image import load_office_image, read_office_image_header, write_office_image
+
+
+def test_round_trip(tmp_path):
+
+    office = build_office()
+    blocks = office.write_track(tmp_path)
+    image_filename = str(tmp_path / "office.odi")
+    write_office_image(image_filename, str(tmp_path), start_block=167, end_block=317)
+
+    image = load_office_image(image_filename)
+    assert isinstance(image.words, np.memmap)
+
+    data = load_track(str(tmp_path), start_block=167, end_block=317)
+    for data_range in data.ranges:
+        assert np.array_equal(image.range_starting_at_address(data_range.start_address, data_range.length).words,
+                              data_range.words)
+
+    assert repr(GRPTBL.parse(GRPTBL_BASE, image).svc_table.groups) == repr(GRPTBL.parse(GRPTBL_BASE, data).svc_table.groups)
+
+    header = read_office_image_header(image_filename)
+    assert [status.block for status in header.blocks] == blocks
+    assert all(status.crc_ok for status in header.blocks)
+    assert len(header.ranges) == len(data.ranges)
+
+
+def test_crc_status(tmp_path):
+
+    build_office().write_track(tmp_path)
+    block_filename = tmp_path / "0168.bin"
+    raw = bytearray(block_filename.read_bytes())
+    raw[100] ^= 0xff
+    block_filename.write_bytes(bytes(raw))
+
+    header = write_office_image(str(tmp_path / "office.odi"), str(tmp_path), start_block=167, end_block=317)
+    assert [status.block for status in header.blocks if not status.crc_ok] == [168]
+
+
+def test_interrupted_write(tmp_path, monkeypatch):
+
+    build_office().write_track(tmp_path)
+    image_filename = str(tmp_path / "office.odi")
+    write_office_image(image_filename, str(tmp_path), start_block=167, end_block=317)
+    before = (tmp_path / "office.odi").read_bytes()
+
+    def interrupt(source, destination):
+        raise KeyboardInterrupt
+
+    # An interrupted rewrite leaves the old image whole and no temporary file
+    monkeypatch.setattr(os, "replace", interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        write_office_image(image_filename, str(tmp_path), start_block=167, end_block=316)
+    assert (tmp_path / "office.odi").read_bytes() == before
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
@@ -0,0 +1,125 @@
+"""Test the tape block patcher against a synthetic track"""
+
+import io
+
+import pytest
+from synthetic import SVC_TABLE, build_office
+
+import patch_tape
+from officedata.catalog import BlockCatalog
+from officedata.image_tools import block_crc_ok, load_block, load_track
+from patch_tape import MemoryPatch, main, parse_patch_file, patch_track, write_block
+
+
+def test_parse_patch_file():
+
+    patch_file = io.StringIO("# location, old, new\n"
+                             "421064,1203,1003,167,317,Trunk test panel, access trunk AT1\n"
+                             "\n"
+                             "421065,0,1103\n")
+    patches = parse_patch_file(patch_file)
+    assert patches == [MemoryPatch(0o421064, 0o1203, 0o1003, 167, 317, "Trunk test panel, access trunk AT1"),
+                       MemoryPatch(0o421065, 0, 0o1103)]
+
+
+def test_patch_track(tmp_path):
+
+    office = build_office()
+    blocks = office.write_track(tmp_path)
+
+    # Every fifth word of the office, spread over every block.
+    addresses = sorted(office.memory)[::5]
+    patches = [MemoryPatch(address, office.memory[address], office.memory[address] ^ 0o177777)
+               for address in reversed(addresses)]
+    # Limited to blocks that do not hold the address, so it is not applied.
+    patches.append(MemoryPatch(addresses[0], 0, 1, min_block=0, max_block=blocks[0]))
+
+    results = patch_track(tmp_path, patches, verbose=False)
+    patched_blocks = [result.block_n for result in results if result.patched]
+    assert patched_blocks == blocks
+
+    for block_n in patched_blocks:
+        assert block_crc_ok(load_block(tmp_path / f"{block_n:04d}_patched.bin"))
+        (tmp_path / f"{block_n:04d}.bin").unlink()
+        (tmp_path / f"{block_n:04d}_patched.bin").rename(tmp_path / f"{block_n:04d}.bin")
+
+    words, loaded = load_track(tmp_path, start_block=blocks[0], end_block=blocks[-1] + 1).words_at(addresses)
+    assert loaded.all()
+    assert list(words) == [office.memory[address] ^ 0o177777 for address in addresses]
+
+
+def test_patch_mismatch(tmp_path, capsys):
+    """A block with a mismatched old value is reported and left alone; the other blocks are patched."""
+
+    office = build_office()
+    blocks = office.write_track(tmp_path)
+    last_address = max(office.memory)
+    patches = [MemoryPatch(SVC_TABLE, office.memory[SVC_TABLE] ^ 1, 0),
+               MemoryPatch(last_address, office.memory[last_address], 0)]
+
+    results = patch_track(tmp_path, patches, verbose=False)
+    errors = [result for result in results if result.error]
+    assert len(errors) == 1 and "does not match expected old value" in errors[0].error
+    assert [result.block_n for result in results if result.patched] == [blocks[-1]]
+
+    patch_filename = tmp_path / "patch.csv"
+    patch_filename.write_text("".join(f"{patch.location:o},{patch.old_value:o},{patch.new_value:o}\n" for patch in patches))
+    with pytest.raises(SystemExit) as exit_info:
+        main([str(tmp_path), str(patch_filename), "--jobs", "2"])
+    assert exit_info.value.code == 1
+    assert f"Block {errors[0].block_n}: Old value at {SVC_TABLE:06o}" in capsys.readouterr().out
+    assert [path.name for path in tmp_path.glob("*_patched.bin")] == [f"{blocks[-1]:04d}_patched.bin"]
+    assert not list(tmp_path.glob("*.tmp"))
+
+    with pytest.raises(ValueError):
+        patch_track(tmp_path, [MemoryPatch(SVC_TABLE, 0, 0o200000)], verbose=False)
+
+
+def test_parallel_patch_matches_serial(tmp_path, capsys):
+
+    office = build_office()
+    blocks = office.write_track(tmp_path)
+    addresses = sorted(office.memory)[::7]
+    patches = [MemoryPatch(address, office.memory[address], office.memory[address] ^ 0o7070) for address in addresses]
+    # A block with a bad CRC is reported without stopping the other workers.
+    bad_block = tmp_path / f"{blocks[2]:04d}.bin"
+    block = load_block(bad_block)
+    block[-2] ^= 1
+    write_block(bad_block, block)
+
+    serial = patch_track(tmp_path, patches)
+    serial_output = capsys.readouterr().out
+    serial_files = {path.name: path.read_bytes() for path in tmp_path.glob("*_patched.bin")}
+    for path in tmp_path.glob("*_patched.bin"):
+        path.unlink()
+
+    parallel = patch_track(tmp_path, patches, jobs=3)
+    assert capsys.readouterr().out == serial_output
+    assert parallel == serial
+    assert {path.name: path.read_bytes() for path in tmp_path.glob("*_patched.bin")} == serial_files
+
+    errors = [result for result in parallel if result.error]
+    assert [result.block_n for result in errors] == [blocks[2]]
+    assert not errors[0].crc_ok and "CRC" in errors[0].error
+    assert len(serial_files) == len(blocks) - 1
+
+
+def test_catalog_patch_reads_only_patched_blocks(tmp_path, monkeypatch):
+
+    office = build_office()
+    blocks = office.write_track(tmp_path)
+    last_address = max(office.memory)
+    patches = [MemoryPatch(last_address, office.memory[last_address], 0)]
+
+    uncatalogued = patch_track(tmp_path, patches, verbose=False)
+    expected_file = (tmp_path / f"{blocks[-1]:04d}_patched.bin").read_bytes()
+
+    catalog = BlockCatalog.build(tmp_path, 0, 358)
+    loaded = []
+    original_load_block_data = patch_tape.load_block_data
+    monkeypatch.setattr(patch_tape, "load_block_data", lambda f: loaded.append(f.name) or original_load_block_data(f))
+    catalogued = patch_track(tmp_path, patches, verbose=False, catalog=catalog)
+
+    assert catalogued == uncatalogued
+    assert loaded == [str(tmp_path / f"{blocks[-1]:04d}.bin")]
+    assert (tmp_path / f"{blocks[-1]:04d}_patched.bin").read_bytes() == expected_file
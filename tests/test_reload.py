@@ -0,0 +1,140 @@
+"""Test incremental reload of changed block files"""
+
+import os
+
+import pytest
+from synthetic import MEMLST_TRUNKS_HIGH, SPN_HEAD, block_crc, build_office, write_block_file
+
+from officedata.cache import TableCache
+from officedata.crawl import crawl
+from officedata.image_tools import NOT_RELOADABLE, load_block
+from officedata.office import Office
+from officedata.reload import TrackReloader
+from patch_tape import MemoryPatch, patch_track
+
+
+def change_word(track, office, address, filename=None):
+    """Flip the bits of the word at `address` in the block file that loads it, keeping its CRC valid."""
+    block_n, offset = office.data.provenance.locate(address)
+    block = load_block(os.path.join(track, f"{block_n:04d}.bin"))
+    block[offset] ^= 0o177777
+    block[-2] = block_crc(block)
+    write_block_file(filename or os.path.join(track, f"{block_n:04d}.bin"), block)
+    return block_n
+
+
+def decode_all(office):
+    """Decode every table of the synthetic office, checking that each decoded."""
+    grptbl, sptbl, service_members, (_, trunk_members), xref = office.decode(
+        "grptbl", "sptbl", "service_members", "trunks", "xref")
+    assert len(grptbl.svc_table.groups) == 24
+    assert sptbl.spn_head_table_address == SPN_HEAD
+    assert len(service_members) and len(trunk_members) and len(xref)
+
+
+def test_reload_invalidates_overlapping_tables(tmp_path):
+
+    synthetic = build_office()
+    synthetic.write_track(tmp_path)
+    office = Office.load(str(tmp_path), 167, 317)
+    decode_all(office)
+
+    assert not office.reload()
+
+    os.utime(tmp_path / "0167.bin", ns=(0, 0))
+    assert not office.reload()
+
+    # The last word of the office is in a subtranslator. The translator
+    # reads subtranslators on each lookup, so only the cross-reference built
+    # from them and the table graph, which checks they are loaded, are dropped.
+    address = max(synthetic.memory)
+    block_n = change_word(str(tmp_path), office, address)
+    result = office.reload()
+    assert result.blocks == [block_n]
+    assert any(start <= address < end for start, end in result.spans)
+    assert result.invalidated == ["table_graph", "xref"]
+    assert office.data.words_at([address])[0][0] == synthetic.memory[address] ^ 0o177777
+
+    fresh = Office.load(str(tmp_path), 167, 317)
+    assert repr(office.sptbl.spn_head.enumerate_entries()) == repr(fresh.sptbl.spn_head.enumerate_entries())
+    assert (office.xref.entries == fresh.xref.entries).all()
+
+    # The head table words are decoded with the translator
+    change_word(str(tmp_path), office, SPN_HEAD + 3)
+    result = office.reload()
+    assert {"sptbl", "xref"} <= set(result.invalidated) and "grptbl" not in result.invalidated
+    fresh = Office.load(str(tmp_path), 167, 317)
+    assert (office.sptbl.spn_head.head == fresh.sptbl.spn_head.head).all()
+
+
+def test_reload_saved_graph(tmp_path):
+
+    synthetic = build_office()
+    synthetic.write_track(tmp_path)
+    graph = crawl(Office.load(str(tmp_path), 167, 317).data)
+    office = Office.load(str(tmp_path), 167, 317, graph=graph)
+    decode_all(office)
+
+    # A saved graph is dropped only with the tables it holds, as a crawled one is
+    change_word(str(tmp_path), office, max(synthetic.memory))
+    assert office.reload().invalidated == ["table_graph", "xref"]
+    assert office.table_graph is not graph
+    assert office.table_graph == crawl(Office.load(str(tmp_path), 167, 317).data)
+
+
+def test_reload_patched_blocks(tmp_path):
+
+    synthetic = build_office()
+    synthetic.write_track(tmp_path)
+    office = Office.load(str(tmp_path), 167, 317, prefer_patched=True, cache=TableCache(str(tmp_path / "cache")))
+    plain = Office.load(str(tmp_path), 167, 317)
+    decode_all(office)
+    key = office.cache_key
+
+    # A trunk circuit member, in a block without the group tables
+    address = MEMLST_TRUNKS_HIGH + 0o200
+    patch_track(tmp_path, [MemoryPatch(address, synthetic.memory[address], 0o12345)], verbose=False)
+    assert not plain.reload()
+
+    result = office.reload()
+    assert len(result.blocks) == 1
+    assert {"trunks", "xref"} <= set(result.invalidated)
+    assert not {"grptbl", "memlst", "service_members"} & set(result.invalidated)
+    assert office.cache_key != key
+    assert office.data.words_at([address])[0][0] == 0o12345
+
+    for name in (f"{block_n:04d}_patched.bin" for block_n in result.blocks):
+        (tmp_path / name).unlink()
+    assert office.reload().blocks == result.blocks
+    assert office.data.words_at([address])[0][0] == synthetic.memory[address]
+
+
+def test_reload_memory_image(tmp_path):
+
+    synthetic = build_office()
+    blocks = synthetic.write_track(tmp_path)
+    reloader = TrackReloader(str(tmp_path), 167, 317)
+    image = reloader.load(image=True)
+
+    address = sorted(synthetic.memory)[500]
+    block_n = change_word(str(tmp_path), Office(image), address)
+    assert reloader.reload().blocks == [block_n]
+    assert image.words_at([address])[0][0] == synthetic.memory[address] ^ 0o177777
+
+    (tmp_path / f"{blocks[-1]:04d}.bin").unlink()
+    result = reloader.reload()
+    assert result.blocks == [blocks[-1]]
+    assert not image.words_at([max(synthetic.memory)])[1][0]
+
+
+def test_lazy_and_coalesced_not_reloadable(tmp_path):
+
+    build_office().write_track(tmp_path)
+    for options in ({"lazy": True}, {"coalesce": True}):
+        office = Office.load(str(tmp_path), 167, 317, **options)
+        with pytest.raises(ValueError, match=NOT_RELOADABLE):
+            office.reload()
+
+    lazy = Office.load(str(tmp_path), 167, 317, lazy=True).data
+    with pytest.raises(ValueError, match=NOT_RELOADABLE):
+        lazy.replace_ranges([], [])
@@ -0,0 +1,55 @@
+"""Test the bit field schema compiler"""
+
+import numpy as np
+import pytest
+
+from officedata import figures
+from officedata.schema import Field, TableSchema
+
+SCHEMAS = [figures.SERVICE_GROUP_SCHEMA, figures.TRUNK_GROUP_SCHEMA, figures.SERVICE_MEMBER_LIST_HEADER_SCHEMA,
+           figures.TRUNK_MEMBER_SCHEMA, figures.UNIV_SUBTRANSLATOR_SCHEMA, figures.LINE_SUBTRANSLATOR_SCHEMA]
+
+
+@pytest.mark.parametrize("schema", SCHEMAS, ids=lambda schema: schema.name)
+def test_scalar_matches_vectorized(schema):
+
+    words = np.random.default_rng(0).integers(0, 0x10000, (500, schema.n_words), dtype=np.uint16)
+    decoded = schema.decode_many(words)
+    assert decoded.dtype.names == schema.names
+
+    for entry_words, row in zip(words, decoded):
+        for field, value in zip(schema.fields, schema.decode(entry_words)):
+            assert type(value) in (int, bool, type(None))
+            assert row[field.name] == (-1 if value is None else value), field.name
+
+
+def test_field_layout():
+
+    schema = TableSchema("TEST", 2, [
+        Field("kind", word=0, low=13, width=3),
+        Field("flag", word=0, low=12, width=1, flag=True),
+        Field("low_byte", word=1, low=0, width=8, when=(1, 2)),
+        Field("high_byte", word=1, low=8, width=8, when=(3,)),
+    ], tag="kind")
+
+    assert schema.decode([0o120000 | 0o10000, 0xabcd]) == (5, True, None, None)
+    assert schema.decode([0o020000, 0xabcd]) == (1, False, 0xcd, None)
+    assert schema.decode_dict([0o060000, 0xabcd]) == {"kind": 3, "flag": False, "low_byte": None, "high_byte": 0xab}
+
+    with pytest.raises(ValueError, match="TEST requires 2 words; only 1 provided"):
+        schema.decode([0])
+    with pytest.raises(ValueError):
+        schema.decode_many(np.zeros((4, 1), dtype=np.uint16))
+
+
+@pytest.mark.parametrize("fields, tag", [
+    ([Field("a", word=2)], None),
+    ([Field("a", word=0, low=10, width=8)], None),
+    ([Field("a", word=0), Field("a", word=1)], None),
+    ([Field("a", word=0, low=0, width=2, flag=True)], None),
+    ([Field("a", word=0, when=(1,))], None),
+    ([Field("a", word=0)], "b"),
+])
+def test_invalid_schema(fields, tag):
+    with pytest.raises(ValueError):
+        TableSchema("TEST", 2, fields, tag=tag)
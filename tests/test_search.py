@@ -0,0 +1,52 @@
+"""Test searches over the memory image against brute force over the office's words"""
+
+import numpy as np
+import pytest
+from synthetic import SPN_HEAD, SVC_TABLE, build_office
+
+from officedata.image_tools import twentybit
+from officedata.search import as_memory_image, find_masked, find_pointers, find_sequence, first_matches
+
+
+def addresses(chunks):
+    return [int(address) for matches in chunks for address in matches["address"]]
+
+
+def test_search_matches_brute_force():
+
+    office = build_office()
+    memory = office.memory
+    image = as_memory_image(office.range_set())
+
+    # Small chunks, so matches span several chunks and runs cross chunk edges
+    for value, mask in ((0, 0o177777), (0o100000, 0o100000), (0o5, 0o17)):
+        found = addresses(find_masked(image, value, mask, chunk=0o1000))
+        assert found == sorted(address for address, word in memory.items() if word & mask == value & mask)
+
+    start = sorted(memory)[200]
+    sequence = [memory[start], None, memory[start + 2]]
+    found = addresses(find_sequence(image, sequence, chunk=0o100))
+    expected = sorted(address for address in memory
+                      if address + 1 in memory and address + 2 in memory and
+                      memory[address] == sequence[0] and memory[address + 2] == sequence[2])
+    assert start in found and found == expected
+
+    low, high = SPN_HEAD, SPN_HEAD + 0o10000
+    matches = np.concatenate(list(find_pointers(image, low, high, chunk=0o1000)))
+    expected = sorted(address for address in memory
+                      if address + 1 in memory and low <= twentybit(memory[address], memory[address + 1]) < high)
+    assert matches["address"].tolist() == expected
+    assert all(int(match["target"]) == twentybit(memory[int(match["address"])], memory[int(match["address"]) + 1])
+               for match in matches)
+
+    # Address bounds and limits
+    found = addresses(find_masked(image, 0, 0, start=SVC_TABLE, end=SVC_TABLE + 10))
+    assert found == [address for address in range(SVC_TABLE, SVC_TABLE + 10) if address in memory]
+    assert addresses(first_matches(find_masked(image, 0, 0, chunk=0o100), 150)) == sorted(memory)[:150]
+
+    assert addresses(first_matches(find_masked(image, 0, 0), 0)) == []
+    with pytest.raises(ValueError):
+        list(first_matches(find_masked(image, 0, 0), -1))
+
+    with pytest.raises(ValueError):
+        list(find_sequence(image, []))
@@ -0,0 +1,105 @@
+"""Test the query server and client"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from synthetic import build_office
+from typer.testing import CliRunner
+
+from officedata.cli import main
+from officedata.display import batch_records, spn_dump_records
+from officedata.office import Office
+from officedata.server import QueryClient, QueryServer, remove_stale_socket
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def server(tmp_path):
+    build_office().write_track(tmp_path)
+    query_server = QueryServer(Office.load(str(tmp_path), 167, 317))
+    query_server.warm()
+    socket_path = str(tmp_path / "odd.sock")
+
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(query_server.serve(socket_path))
+    thread = threading.Thread(target=lambda: loop.run_until_complete(asyncio.wait([task])))
+    thread.start()
+    for _ in range(500):
+        if os.path.exists(socket_path):
+            break
+        time.sleep(0.01)
+
+    yield query_server, socket_path
+
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join()
+    loop.close()
+
+
+def test_queries(server):
+
+    query_server, socket_path = server
+    office = query_server.office
+    with QueryClient(socket_path) as client:
+        response = client.query({"op": "lookup", "kind": "oe", "numbers": ["000100", "000600"]})
+        assert response["ok"]
+        assert response["records"] == list(batch_records(office.sptbl.spn_head, [("oe", "000100"), ("oe", "000600")]))
+
+        response = client.query({"op": "group", "group": 65})
+        assert response["ok"] and response["entry"].startswith("SERVICE_GROUP_entry(grp_num=65")
+        assert {member["group"] for member in response["members"]} == {65}
+
+        dta = int(office.trunks[1]["dta"][0])
+        response = client.query({"op": "xref", "kind": "dta", "value": dta})
+        assert response["ok"] and len(response["records"]) == len(office.xref.lookup("dta", dta))
+
+        response = client.query({"op": "dump"})
+        assert response["records"] == list(spn_dump_records(office.sptbl.spn_head.enumerate_entries()))
+
+        errors = client.query_many([{"op": "lookup", "numbers": ["9"]}, {"op": "group", "group": 99999},
+                                    {"op": "nope"}, {"op": "xref", "kind": "oe", "value": 1}])
+        assert [response["ok"] for response in errors] == [False] * 4
+
+        # The connection is still usable after errors
+        assert client.query({"op": "ping"})["ok"]
+
+        assert client.query({"op": "reload"}) == {"ok": True, "blocks": [], "invalidated": []}
+
+
+def test_concurrent_clients(server):
+
+    _, socket_path = server
+    numbers = [f"{n:06o}" for n in range(0o100, 0o300)]
+
+    def lookups(n):
+        with QueryClient(socket_path) as client:
+            return client.query_many([{"op": "lookup", "numbers": [number]} for number in numbers[n::4]] * 10)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lookups, range(4)))
+
+    for n, responses in enumerate(results):
+        assert len(responses) == len(numbers[n::4]) * 10
+        assert [response["records"][0]["number"] for response in responses] == numbers[n::4] * 10
+
+    with pytest.raises(OSError):
+        remove_stale_socket(socket_path)
+
+
+def test_client_command(server):
+
+    _, socket_path = server
+    result = runner.invoke(main, ["client", "--socket", socket_path, json.dumps({"op": "group", "group": 65})])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output)["entry"].startswith("SERVICE_GROUP_entry(grp_num=65")
+
+    result = runner.invoke(main, ["client", "--socket", socket_path],
+                           input=json.dumps({"op": "ping"}) + "\n" + json.dumps({"op": "group", "group": -1}) + "\n")
+    assert result.exit_code == 1
+    assert [json.loads(line)["ok"] for line in result.output.splitlines()] == [True, False]
@@ -1,6 +1,9 @@
 
 import numpy as np
-from officedata.image_tools import DataRange, DataRangeSet
+import pytest
+from synthetic import SPTBL_BASE, build_office
+
+from officedata.image_tools import DataRange, DataRangeSet, LazyTrack, MemoryImage, load_block, load_track
 
 
 def test_merge_ranges():
@@ -53,3 +56,171 @@ def test_address():
     new_range = data_range.subset_at_address(104, 3)
     assert new_range.start_address == 104
     assert new_range.words[0] == 5
+
+def test_load_block(tmp_path):
+    """Blocks are read big-endian into native uint16 words."""
+
+    filename = tmp_path / "0001.bin"
+    filename.write_bytes(bytes([0x12, 0x34, 0xff, 0xfe, 0x00, 0x01]))
+    words = load_block(str(filename))
+    assert words.dtype == np.uint16
+    assert list(words) == [0x1234, 0xfffe, 0x0001]
+
+def test_load_track(tmp_path):
+
+    office = build_office()
+    office.write_track(tmp_path)
+    data = load_track(str(tmp_path), start_block=167, end_block=317)
+
+    assert all(data_range.words.dtype == np.uint16 for data_range in data.ranges)
+    words = data.range_starting_at_address(SPTBL_BASE, 3).words
+    assert list(words) == [office.memory[SPTBL_BASE + n] for n in range(3)]
+
+def test_overlapping_ranges():
+    """Overlap detection names the colliding ranges, in any input order."""
+
+    ranges = [DataRange(200, np.zeros(10, dtype=np.uint16)),
+              DataRange(100, np.zeros(50, dtype=np.uint16)),
+              DataRange(120, np.zeros(5, dtype=np.uint16)),
+              DataRange(150, np.zeros(10, dtype=np.uint16))]
+    with pytest.raises(ValueError, match="Overlapping") as excinfo:
+        DataRangeSet(ranges)
+    message = str(excinfo.value)
+    assert "start_address=0o144" in message and "start_address=0o170" in message
+    assert "start_address=0o226" not in message
+
+    DataRangeSet([DataRange(110, np.zeros(10, dtype=np.uint16)),
+                  DataRange(100, np.zeros(10, dtype=np.uint16))])
+
+    # An exact duplicate is dropped; the same extent with other words collides
+    range_set = DataRangeSet([DataRange(100, np.arange(10, dtype=np.uint16)),
+                              DataRange(100, np.arange(10, dtype=np.uint16))])
+    assert len(range_set.ranges) == 1 and range_set.range_starting_at_address(105, 1).words[0] == 5
+    with pytest.raises(ValueError, match="Overlapping"):
+        DataRangeSet([DataRange(100, np.arange(10, dtype=np.uint16)),
+                      DataRange(100, np.zeros(10, dtype=np.uint16))])
+
+def test_find_range_indices():
+
+    range_set = DataRangeSet([DataRange(110, np.zeros(10, dtype=np.uint16)),
+                              DataRange(100, np.zeros(5, dtype=np.uint16))])
+    assert range_set._find_range(112).start_address == 110
+    assert list(range_set.find_range_indices([99, 100, 104, 105, 119, 120])) == [-1, 0, 0, -1, 1, -1]
+    with pytest.raises(ValueError):
+        range_set._find_range(107)
+
+def test_memory_image():
+
+    range_set = DataRangeSet([DataRange(100, (1 + np.zeros(10, dtype=np.uint16)).astype(np.uint16)),
+                              DataRange(110, (2 + np.zeros(10)).astype(np.uint16)),
+                              DataRange(130, (3 + np.zeros(10)).astype(np.uint16))])
+    image = MemoryImage.from_range_set(range_set)
+
+    new_range = image.range_starting_at_address(105, 10)
+    assert new_range.start_address == 105
+    assert list(new_range.words) == [1]*5 + [2]*5
+    assert np.shares_memory(new_range.words, image.words)
+
+    assert image.range_starting_at_address(105).length == 15
+    assert [(r.start_address, r.length) for r in image.ranges] == [(100, 20), (130, 10)]
+
+    with pytest.raises(ValueError, match="unloaded word 0o170"):
+        image.range_starting_at_address(115, 20)
+    with pytest.raises(ValueError, match="not found"):
+        image.range_starting_at_address(125)
+
+def test_views_alias_safely():
+    """Single range requests are read-only views; copies are independent."""
+
+    words = np.arange(10, dtype=np.uint16)
+    range_set = DataRangeSet([DataRange(100, words), DataRange(110, np.arange(10, dtype=np.uint16))])
+
+    view = range_set.range_starting_at_address(102, 4)
+    assert np.shares_memory(view.words, words)
+    with pytest.raises(ValueError):
+        view.words[0] = 99
+    with pytest.raises(ValueError):
+        view.subset(1, 2).words[0] = 99
+
+    copied = range_set.range_starting_at_address(102, 4, copy=True)
+    copied.words[0] = 99
+    assert words[2] == 2
+    assert not np.shares_memory(copied.words, words)
+
+    # Views see later changes to the loaded data
+    words[3] = 77
+    assert view.words[1] == 77
+
+    stitched = range_set.range_starting_at_address(105, 10)
+    assert not np.shares_memory(stitched.words, words)
+    assert not stitched.words.flags.writeable
+
+def test_lazy_track(tmp_path):
+    """The lazy loader reads only the blocks used and matches the eager loader."""
+
+    office = build_office()
+    block_numbers = office.write_track(tmp_path)
+    eager = load_track(str(tmp_path), start_block=167, end_block=317)
+    lazy = LazyTrack(str(tmp_path), start_block=167, end_block=317, max_resident_blocks=2)
+    assert lazy.blocks_read == 0
+
+    words = lazy.range_starting_at_address(SPTBL_BASE, 3).words
+    assert list(words) == [office.memory[SPTBL_BASE + n] for n in range(3)]
+    assert lazy.blocks_read == 1
+    with pytest.raises(ValueError):
+        words[0] = 1
+
+    # Ranges spanning fragment and block boundaries are stitched
+    boundary = next(end for end in lazy._end_list if end in lazy._start_list)
+    assert list(lazy.range_starting_at_address(boundary - 5, 10).words) == \
+        list(eager.range_starting_at_address(boundary - 5, 10).words)
+
+    addresses = sorted(office.memory)[::7] + [0o7777777]
+    for lazy_array, eager_array in zip(lazy.words_at(addresses), eager.words_at(addresses)):
+        assert lazy_array.tolist() == eager_array.tolist()
+    assert len(lazy.resident_blocks) <= 2
+
+    loaded = {r.start_address + n: int(word) for r in lazy.ranges for n, word in enumerate(r.words)}
+    assert loaded == {r.start_address + n: int(word) for r in eager.ranges for n, word in enumerate(r.words)}
+    assert lazy.blocks_read >= len(block_numbers)
+
+def test_coalesce_track(tmp_path):
+    """Coalesced tracks hold maximal extents and still map addresses back to their blocks."""
+
+    office = build_office()
+    office.write_track(tmp_path)
+    fragments = load_track(str(tmp_path), start_block=167, end_block=317)
+    data = load_track(str(tmp_path), start_block=167, end_block=317, coalesce=True)
+
+    assert [(r.start_address, r.length) for r in data.ranges] == \
+        [(start, len(words)) for start, words in office.extents()]
+    assert data.merged_fragments == len(fragments.ranges) - len(data.ranges) > 0
+    assert fragments.merged_fragments == 0
+
+    start, words = office.extents()[0]
+    assert list(data.range_starting_at_address(start).words) == list(words)
+
+    addresses = sorted(office.memory)[::13]
+    assert data.words_at(addresses)[0].tolist() == fragments.words_at(addresses)[0].tolist()
+
+    blocks, offsets = data.provenance.locate_many(addresses + [0o7777777])
+    assert blocks[-1] == -1 and offsets[-1] == -1
+    for address, block_n, offset in zip(addresses, blocks, offsets):
+        assert load_block(str(tmp_path / f"{block_n:04d}.bin"))[offset] == office.memory[address]
+    assert data.provenance.locate(addresses[0]) == (blocks[0], offsets[0])
+    with pytest.raises(ValueError):
+        data.provenance.locate(0o7777777)
+
+
+def test_read_log():
+    """Each range lookup records the span it returned once; a failed lookup records the span asked for."""
+
+    range_set = DataRangeSet([DataRange(100, np.zeros(10, dtype=np.uint16)),
+                              DataRange(110, np.zeros(10, dtype=np.uint16))])
+    for data in (range_set, MemoryImage.from_range_set(range_set)):
+        data.read_log = []
+        data.range_starting_at_address(105, 10)
+        data.range_starting_at_address(112)
+        with pytest.raises(ValueError):
+            data.range_starting_at_address(118, 5)
+        assert data.read_log == [(105, 115), (112, 120), (118, 123)]
@@ -0,0 +1,57 @@
+"""Test track CRC verification"""
+
+import pytest
+from synthetic import build_office, write_block_file
+
+from officedata import verify
+from officedata.cache import TableCache
+from officedata.image_tools import CorruptBlockError, load_block, load_track
+from officedata.verify import verify_track
+
+
+def corrupt_block(filename):
+    block = load_block(filename)
+    block[10] ^= 0o1000
+    write_block_file(filename, block)
+
+
+def test_load_track_verify(tmp_path):
+
+    office = build_office()
+    blocks = office.write_track(tmp_path)
+    load_track(tmp_path, start_block=blocks[0], end_block=blocks[-1] + 1, verify=True)
+
+    corrupt_block(tmp_path / f"{blocks[1]:04d}.bin")
+    load_track(tmp_path, start_block=blocks[0], end_block=blocks[-1] + 1)
+    with pytest.raises(CorruptBlockError) as error:
+        load_track(tmp_path, start_block=blocks[0], end_block=blocks[-1] + 1, verify=True)
+
+    assert [status.block for status in error.value.blocks] == [blocks[1]]
+    expected_ranges = [(start, len(words)) for start, words in office.blocks()[1]]
+    assert error.value.blocks[0].ranges == expected_ranges
+
+
+def test_verify_track_cache(tmp_path, monkeypatch):
+
+    office = build_office()
+    blocks = office.write_track(tmp_path)
+    corrupt_block(tmp_path / f"{blocks[2]:04d}.bin")
+
+    uncached = verify_track(tmp_path, 167, 317)
+    assert [status.block for status in uncached] == blocks
+    assert [status.block for status in uncached if not status.crc_ok] == [blocks[2]]
+    assert verify_track(tmp_path, 167, 317, jobs=2) == uncached
+
+    cache = TableCache(str(tmp_path / "cache"))
+    assert verify_track(tmp_path, 167, 317, cache=cache) == uncached
+
+    loaded = []
+    original_load_block = verify.load_block
+    monkeypatch.setattr(verify, "load_block", lambda filename: loaded.append(filename) or original_load_block(filename))
+    assert verify_track(tmp_path, 167, 317, cache=TableCache(str(tmp_path / "cache"))) == uncached
+    assert loaded == []
+
+    corrupt_block(tmp_path / f"{blocks[0]:04d}.bin")
+    statuses = verify_track(tmp_path, 167, 317, cache=TableCache(str(tmp_path / "cache")))
+    assert [status.block for status in statuses if not status.crc_ok] == blocks[:1] + blocks[2:3]
+    assert len(loaded) == 1
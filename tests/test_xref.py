@@ -0,0 +1,90 @@
+"""Test the reverse cross-reference index"""
+
+import numpy as np
+import pytest
+from synthetic import build_office
+
+from officedata.office import Office
+from officedata.xref import KINDS, SOURCES, CrossReference
+
+
+def owners(entries):
+    return {(SOURCES[entry["source"]], int(entry["group"]), int(entry["member"]), int(entry["address"]))
+            for entry in entries}
+
+
+def test_xref_matches_brute_force():
+
+    office = Office(build_office().range_set())
+    cross_reference = office.xref
+    service_members = office.service_members
+    trunk_members = office.trunks[1]
+
+    assert (np.diff(cross_reference._keys) >= 0).all()
+
+    for member in service_members[service_members["format"] == 2][:20]:
+        found = owners(cross_reference.lookup("dta", int(member["dta"])))
+        expected = {("service", int(other["group"]), int(other["member"]), int(other["address"]))
+                    for other in service_members[(service_members["format"] == 2) & (service_members["dta"] == member["dta"])]}
+        expected |= {("trunk", int(other["group"]), int(other["member"]), int(other["address"]))
+                     for other in trunk_members[trunk_members["dta"] == member["dta"]]}
+        assert found == expected
+
+    for member in trunk_members[:20]:
+        found = owners(cross_reference.lookup("scanpoint", int(member["spn"])))
+        assert ("trunk", int(member["group"]), int(member["member"]), int(member["address"])) in found
+
+    columns = office.sptbl.spn_head.enumerate_entries()
+    line = np.flatnonzero(columns.scanpoint >= 0)[0]
+    found = owners(cross_reference.lookup("scanpoint", int(columns.scanpoint[line])))
+    assert ("line", int(columns.w_index[line]), int(columns.x_index[line]), int(columns.address[line])) in found
+
+    assert len(cross_reference.lookup("ten", 0o7777 + 1)) == 0
+    with pytest.raises(ValueError):
+        cross_reference.lookup("oe", 1)
+
+
+def test_xref_scanpoint_encodings():
+
+    office = build_office()
+    decoded = Office(office.range_set())
+    columns = decoded.sptbl.spn_head.enumerate_entries()
+    line = np.flatnonzero(columns.scanpoint >= 0)[0]
+    scanpoint = int(columns.scanpoint[line])
+
+    # Give a trunk member the line entry's scan point: both are the same physical point
+    trunk_member = decoded.trunks[1][0]
+    office.put(int(trunk_member["address"]), [scanpoint])
+    decoded = Office(office.range_set())
+    cross_reference = decoded.xref
+
+    found = owners(cross_reference.lookup("scanpoint", scanpoint))
+    assert ("line", int(columns.w_index[line]), int(columns.x_index[line]), int(columns.address[line])) in found
+    assert ("trunk", int(trunk_member["group"]), int(trunk_member["member"]), int(trunk_member["address"])) in found
+
+    # Service bytes and universal fields are other encodings, and never match packed scan points
+    service_members = decoded.service_members
+    member = service_members[(service_members["format"] == 2) & service_members["loaded"]][0]
+    found = cross_reference.lookup("svc_scanpoint", int(member["scanpoint"]))
+    assert ("service", int(member["group"]), int(member["member"]), int(member["address"])) in owners(found)
+    assert not any(SOURCES[entry["source"]] == "service"
+                   for entry in cross_reference.lookup("scanpoint", int(member["scanpoint"])))
+    universal = columns.tone_scanpoint[columns.tone_scanpoint >= 0]
+    assert len(cross_reference.lookup("univ_scanpoint", int(universal[0]))) > 0
+    assert not any(SOURCES[entry["source"]] == "universal" for entry in cross_reference.entries
+                   if KINDS[entry["kind"]] == "scanpoint")
+
+
+def test_xref_lookup_many_and_save(tmp_path):
+
+    cross_reference = Office(build_office().range_set()).xref
+    values = cross_reference.entries["value"][cross_reference.entries["kind"] == KINDS.index("dta")][::7]
+
+    starts, ends = cross_reference.lookup_many("dta", values)
+    for value, start, end in zip(values, starts, ends):
+        assert (cross_reference.entries[start:end] == cross_reference.lookup("dta", int(value))).all()
+
+    filename = tmp_path / "xref.npy"
+    cross_reference.save(filename)
+    loaded = CrossReference.load(filename)
+    assert (loaded.entries == cross_reference.entries).all()